@@ -1,6 +1,17 @@
-"""Puutarhapäiväkirjan admin-konfiguraatio."""
+"""Puutarhapäiväkirjan admin-konfiguraatio.
+
+Muutoslistat hakevat liitetyt rivit samalla kyselyllä, järjestyvät
+indeksin mukaan ja hakevat etuliitteillä (LIKE 'x%' NOCASE-indeksiä
+vasten) tai havaintojen FTS5-indeksistä. Suurten taulujen rivimäärä
+arvioidaan ``COUNT(*)``in sijaan.
+"""
 from django.contrib import admin
-from .models import PlantSpecies, MyGarden, GardenNote
+from django.db.models import Q
+from django.utils import timezone
+
+from . import haku
+from .models import PlantSpecies, MyGarden, GardenNote, Kuva, Mittaus, Tyo
+from .pagination import ArvioivaPaginator
 
 
 class GardenNoteInline(admin.TabularInline):
@@ -14,7 +25,9 @@ class GardenNoteInline(admin.TabularInline):
 class PlantSpeciesAdmin(admin.ModelAdmin):
     list_display = ('nimi', 'lajike', 'kategoria', 'kasvupaikka', 'kylvo_alku_kk', 'kylvo_loppu_kk')
     list_filter = ('kategoria', 'kasvupaikka')
-    search_fields = ('nimi', 'lajike', 'kategoria')
+    # Kategoria rajataan suodattimella; haku etuliitteinä NOCASE-indekseistä
+    search_fields = ('^nimi', '^lajike')
+    ordering = ('kategoria', 'nimi', 'id')
     fieldsets = (
         ('Perustiedot', {
             'fields': ('nimi', 'lajike', 'kategoria', 'kuvaus', 'kasvatusohje')
@@ -38,18 +51,109 @@ class PlantSpeciesAdmin(admin.ModelAdmin):
 
 @admin.register(MyGarden)
 class MyGardenAdmin(admin.ModelAdmin):
-    list_display = ('kasvilaji', 'kasvupaikka', 'tila', 'kylvopaiva', 'lisatty')
+    list_display = (
+        'kasvilaji', 'kasvupaikka', 'tila', 'kylvopaiva', 'arvioitu_sato', 'lisatty',
+        'havaintoja', 'viimeisin_havainto',
+    )
     list_filter = ('tila',)
-    search_fields = ('kasvilaji__nimi', 'kasvupaikka')
+    list_select_related = ('kasvilaji',)
+    search_fields = ('^kasvilaji__nimi', '^kasvupaikka')
+    autocomplete_fields = ('kasvilaji',)
+    ordering = ('-lisatty', '-id')
+    paginator = ArvioivaPaginator
+    show_full_result_count = False
     inlines = [GardenNoteInline]
 
+    def get_queryset(self, request):
+        # Myös havaintojen automaattitäydennys näyttää viljelyt lajin nimellä
+        return super().get_queryset(request).select_related('kasvilaji')
+
+    def get_search_results(self, request, queryset, search_term):
+        """Jokainen sana osuu lajin nimen tai kasvupaikan alkuun.
+
+        Lajit haetaan alikyselynä, jotta ehto pysyy yhden taulun OR:na ja
+        SQLite voi käyttää molempia indeksejä (liitoksen yli se ei voi).
+        """
+        for sana in search_term.split():
+            lajit = PlantSpecies.objects.filter(nimi__istartswith=sana).values('pk')
+            queryset = queryset.filter(Q(kasvilaji__in=lajit) | Q(kasvupaikka__istartswith=sana))
+        return queryset, False
+
 
 @admin.register(GardenNote)
 class GardenNoteAdmin(admin.ModelAdmin):
     list_display = ('kasvi', 'paivamaara', 'havainto_lyhyt')
     list_filter = ('paivamaara',)
+    list_select_related = ('kasvi__kasvilaji',)
     search_fields = ('havainto',)
+    autocomplete_fields = ('kasvi', 'kuvat')
+    ordering = ('-paivamaara', '-id')
+    paginator = ArvioivaPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        """Haku havaintojen FTS5-indeksistä (etuliitteet, taivutusmuodot)."""
+        return queryset.filter(haku.osuma_ehto('garden_gardennote_fts', search_term)), False
 
     def havainto_lyhyt(self, obj):
         return obj.havainto[:80] + '...' if len(obj.havainto) > 80 else obj.havainto
     havainto_lyhyt.short_description = 'Havainto'
+
+
+@admin.register(Mittaus)
+class MittausAdmin(admin.ModelAdmin):
+    list_display = ('viljely', 'suure', 'paivamaara', 'arvo')
+    list_filter = ('suure',)
+    list_select_related = ('viljely__kasvilaji',)
+    autocomplete_fields = ('viljely',)
+    date_hierarchy = 'paivamaara'
+    ordering = ('-id',)
+    paginator = ArvioivaPaginator
+    show_full_result_count = False
+
+
+@admin.register(Tyo)
+class TyoAdmin(admin.ModelAdmin):
+    """Taustatyöt ja niiden edistyminen; töitä lisätään vain koodista."""
+    list_display = (
+        'id', 'tehtava', 'tila', 'edistyminen_naytto', 'viesti',
+        'yritykset', 'ajoaika', 'aloitettu', 'valmistunut',
+    )
+    list_filter = ('tila', 'tehtava')
+    ordering = ('-id',)
+    actions = ['palauta_jonoon']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def edistyminen_naytto(self, obj):
+        if obj.prosentti is not None:
+            return f'{obj.prosentti} % ({obj.edistyminen}/{obj.kokonaismaara})'
+        return obj.edistyminen or '–'
+    edistyminen_naytto.short_description = 'Edistyminen'
+
+    @admin.action(description='Palauta valitut jonoon')
+    def palauta_jonoon(self, request, queryset):
+        maara = queryset.exclude(tila=Tyo.KAYNNISSA).update(
+            tila=Tyo.JONOSSA, ajoaika=timezone.now(), yritykset=0, virhe='',
+            edistyminen=0, kokonaismaara=None, viesti='',
+        )
+        self.message_user(request, f'{maara} työtä palautettu jonoon.')
+
+
+@admin.register(Kuva)
+class KuvaAdmin(admin.ModelAdmin):
+    """Havaintojen kuvat; kuvia lisätään havaintolomakkeelta."""
+    list_display = ('__str__', 'muoto', 'koko', 'leveys', 'korkeus', 'tila', 'luotu')
+    list_filter = ('tila', 'muoto')
+    search_fields = ('^tiiviste',)
+    ordering = ('-id',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,253 @@
+"""Vain luku -JSON-rajapinta kasvilajeille, viljelyille ja havainnoille.
+
+Jokainen lista tukee ``?fields=``-osajoukkoa (kysely tehdään ``values()``-
+muodossa vain pyydetyille kentille), keyset-sivutusta (``?jalkeen=`` /
+``?ennen=``), vahvoja ETageja ja gzip-pakkausta. ETag lasketaan taulun
+muutoslaskurista ja pyynnön parametreista, joten 304-vastaus ei aja
+yhtään listakyselyä eikä sarjallista runkoa.
+
+``KasvilajiEhdotusView`` palvelee viljelylomakkeen lajivalitsinta ja
+``MittauskaavioView`` viljelysivun mittauskaaviota.
+"""
+from datetime import date
+from itertools import groupby
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import JsonResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+from django.views import View
+
+from . import mittaukset
+from .models import GardenNote, Mittaus, MyGarden, PlantSpecies
+from .pagination import keyset_sivu
+from .versiot import tietoversiot, versio_etag
+
+
+# Pakkaus tehdään ennen ETagin asettamista, jotta ETag pysyy vahvana
+_gzip = GZipMiddleware(lambda request: None)
+
+
+class ApiVirhe(Exception):
+    """Virheellinen pyyntö; palautetaan 400-vastauksena."""
+
+
+class ApiListaView(View):
+    """Yhteinen pohja rajapinnan listanäkymille."""
+    model = None
+    kentat = []
+    jarjestys = []
+    # GET-parametri -> kyselyn ehto
+    suodattimet = {}
+    sivun_koko = 50
+    sivun_koko_max = 500
+
+    def get(self, request):
+        try:
+            kentat = self.pyydetyt_kentat(request)
+            koko = self.pyydetty_koko(request)
+            ehdot = self.pyydetyt_suodattimet(request)
+        except ApiVirhe as e:
+            return JsonResponse({'virhe': str(e)}, status=400)
+
+        etag = quote_etag(self.etag(request))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = self.vastaus(request, kentat, koko, ehdot)
+            response = _gzip.process_response(request, response)
+        response.headers['ETag'] = etag
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    def etag(self, request):
+        """Vahva ETag: muutoslaskuri, parametrit ja pakkaus."""
+        parametrit = sorted(request.GET.lists())
+        gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+        return versio_etag(
+            request.path, parametrit, gzip, tietoversiot(self.model),
+        )
+
+    def pyydetyt_kentat(self, request):
+        pyydetyt = request.GET.get('fields')
+        if not pyydetyt:
+            return list(self.kentat)
+        kentat = [k.strip() for k in pyydetyt.split(',') if k.strip()]
+        tuntemattomat = [k for k in kentat if k not in self.kentat]
+        if tuntemattomat:
+            raise ApiVirhe(f"Tuntemattomat kentät: {', '.join(tuntemattomat)}")
+        return kentat
+
+    def pyydetty_koko(self, request):
+        try:
+            koko = int(request.GET.get('koko', self.sivun_koko))
+        except ValueError:
+            raise ApiVirhe('koko pitää olla kokonaisluku.')
+        return max(1, min(koko, self.sivun_koko_max))
+
+    def pyydetyt_suodattimet(self, request):
+        """Muuntaa suodatinparametrit kenttien tyypeiksi (esim. pk:t luvuiksi)."""
+        ehdot = {}
+        for parametri, ehto in self.suodattimet.items():
+            arvo = request.GET.get(parametri)
+            if not arvo:
+                continue
+            try:
+                ehdot[ehto] = self.model._meta.get_field(ehto).to_python(arvo)
+            except ValidationError:
+                raise ApiVirhe(f'{parametri}: virheellinen arvo.')
+        return ehdot
+
+    def get_queryset(self, request, ehdot):
+        return self.model.objects.filter(**ehdot)
+
+    def vastaus(self, request, kentat, koko, ehdot):
+        avaimet = [k.lstrip('-') for k in self.jarjestys]
+        haettavat = list(dict.fromkeys(kentat + avaimet))
+        sivu = keyset_sivu(
+            self.get_queryset(request, ehdot).values(*haettavat), self.jarjestys, koko,
+            jalkeen=request.GET.get('jalkeen'), ennen=request.GET.get('ennen'),
+        )
+        tulokset = sivu.rivit
+        if len(haettavat) != len(kentat):
+            tulokset = [{k: rivi[k] for k in kentat} for rivi in tulokset]
+        return JsonResponse({
+            'tulokset': tulokset,
+            'seuraava': sivu.seuraava,
+            'edellinen': sivu.edellinen,
+        })
+
+
+class KasvilajiApiView(ApiListaView):
+    model = PlantSpecies
+    kentat = [
+        'id', 'nelson_garden_id', 'nimi', 'lajike', 'kategoria', 'kuvaus',
+        'kasvatusohje', 'kylvo_alku_kk', 'kylvo_loppu_kk', 'sato_alku_kk',
+        'sato_loppu_kk', 'itamisaika_min_pv', 'itamisaika_max_pv', 'korkeus_cm',
+        'kasvupaikka', 'siemenia_pakkauksessa', 'nelson_garden_url',
+    ]
+    jarjestys = ['kategoria', 'nimi', 'id']
+    suodattimet = {'kategoria': 'kategoria'}
+
+
+class ViljelyApiView(ApiListaView):
+    model = MyGarden
+    kentat = [
+        'id', 'kasvilaji', 'kasvupaikka', 'tila', 'kylvopaiva',
+        'muistiinpanot', 'lisatty', 'arvioitu_sato', 'havaintoja', 'viimeisin_havainto',
+    ]
+    jarjestys = ['-lisatty', '-id']
+    suodattimet = {'tila': 'tila', 'kasvilaji': 'kasvilaji_id'}
+
+
+class HavaintoApiView(ApiListaView):
+    model = GardenNote
+    kentat = ['id', 'kasvi', 'paivamaara', 'havainto']
+    jarjestys = ['-paivamaara', '-id']
+    suodattimet = {'viljely': 'kasvi_id'}
+
+
+def _lajin_nimi(rivi):
+    """Kuten ``PlantSpecies.__str__``, mutta values()-riville."""
+    if rivi['lajike']:
+        return f"{rivi['nimi']} '{rivi['lajike']}'"
+    return rivi['nimi']
+
+
+class KasvilajiEhdotusView(View):
+    """Lajivalitsimen ehdotukset: ``?q=`` nimen tai lajikkeen alusta.
+
+    Jokaisen sanan on osuttava nimen tai lajikkeen alkuun; haku käyttää
+    NOCASE-indeksejä. Tulokset rajataan ``enintaan``-määrään ja
+    ryhmitellään kategorioittain.
+    """
+    enintaan = 20
+
+    def get(self, request):
+        etag = quote_etag(versio_etag(
+            request.path, sorted(request.GET.lists()), tietoversiot(PlantSpecies),
+        ))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = JsonResponse({'ryhmat': self.ryhmat(request.GET.get('q', ''))})
+        response.headers['ETag'] = etag
+        return response
+
+    def ryhmat(self, kysely):
+        sanat = kysely.split()
+        if not sanat:
+            return []
+        qs = PlantSpecies.objects.all()
+        for sana in sanat:
+            qs = qs.filter(Q(nimi__istartswith=sana) | Q(lajike__istartswith=sana))
+        rivit = qs.order_by('kategoria', 'nimi', 'lajike').values(
+            'id', 'nimi', 'lajike', 'kategoria',
+        )[:self.enintaan]
+        return [
+            {
+                'kategoria': kategoria,
+                'lajit': [{'id': rivi['id'], 'teksti': _lajin_nimi(rivi)} for rivi in lajit],
+            }
+            for kategoria, lajit in groupby(rivit, key=lambda rivi: rivi['kategoria'])
+        ]
+
+
+class MittauskaavioView(View):
+    """Viljelyn mittaussarja kaaviota varten: ``?suure=korkeus``.
+
+    Valinnaiset ``alku``/``loppu`` (VVVV-KK-PP) ja ``pisteita``. Pisteet
+    luetaan päivä-, viikko- tai kausikoosteista (``garden.mittaukset``),
+    ei koskaan raakamittauksista.
+    """
+
+    def get(self, request, pk):
+        try:
+            tunniste, suure, yksikko, kooste = self.pyydetty_suure(request)
+            alku = self.pyydetty_paiva(request, 'alku')
+            loppu = self.pyydetty_paiva(request, 'loppu')
+            pisteita = self.pyydetyt_pisteet(request)
+        except ApiVirhe as e:
+            return JsonResponse({'virhe': str(e)}, status=400)
+
+        gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+        etag = quote_etag(versio_etag(
+            request.path, sorted(request.GET.lists()), gzip, tietoversiot(Mittaus),
+        ))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            taso, pisteet = mittaukset.kaaviodata(pk, suure, alku, loppu, pisteita)
+            for piste in pisteet:
+                piste['arvo'] = piste[kooste]
+            response = JsonResponse({
+                'suure': tunniste,
+                'yksikko': yksikko,
+                'taso': mittaukset.TASOT[taso],
+                'pisteet': pisteet,
+            })
+            response = _gzip.process_response(request, response)
+        response.headers['ETag'] = etag
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    def pyydetty_suure(self, request):
+        tunniste = request.GET.get('suure', '')
+        if tunniste not in mittaukset.SUUREET:
+            raise ApiVirhe(f"suure pitää olla jokin seuraavista: {', '.join(mittaukset.SUUREET)}")
+        return (tunniste, *mittaukset.SUUREET[tunniste])
+
+    def pyydetty_paiva(self, request, nimi):
+        arvo = request.GET.get(nimi)
+        if not arvo:
+            return None
+        try:
+            return date.fromisoformat(arvo)
+        except ValueError:
+            raise ApiVirhe(f'{nimi} pitää olla muotoa VVVV-KK-PP.')
+
+    def pyydetyt_pisteet(self, request):
+        try:
+            pisteita = int(request.GET.get('pisteita', mittaukset.PISTEITA))
+        except ValueError:
+            raise ApiVirhe('pisteita pitää olla kokonaisluku.')
+        return max(2, min(pisteita, mittaukset.PISTEITA_MAX))
@@ -5,3 +5,7 @@ class GardenConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'garden'
     verbose_name = 'Puutarhapäiväkirja'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from . import tehtavat  # noqa: F401
@@ -0,0 +1,110 @@
+"""Puutarhapäiväkirjan asynkroniset näkymät ASGI-käyttöön.
+
+Samat sivut kuin ``garden.views``, mutta tietokantahaut tehdään async-
+ORMilla (``aget``, ``async for``, ``acount``) eikä pyyntö vaadi
+säiesiirtoa ASGI-palvelimella. Toisistaan riippumattomat kyselyt
+käynnistetään rinnakkain ``asyncio.gather``illa. Viljelysivun lomakkeet
+käsittelee sama ``views.viljelyn_lomake`` kuin sync-näkymässä.
+"""
+import asyncio
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404, redirect, render
+from django.views import View
+
+from . import mittaukset
+from .forms import GardenNoteForm, MittausForm, TilaForm
+from .models import MyGarden, PlantSpecies
+from .pagination import akeyset_sivu
+from .views import (
+    HAVAINNOT_JARJESTYS,
+    HAVAINNOT_SIVU,
+    EtusivuView as SyncEtusivuView,
+    KasvilistaView as SyncKasvilistaView,
+    etusivu_konteksti,
+    etusivun_viljelyt,
+    kasvilista_suodattimet,
+    kategoriat_kysely,
+    suodata_kasvilajit,
+    viljelyn_lomake,
+)
+
+
+class EtusivuView(View):
+    """Etusivu: kasvukalenteri ja viljelylista (async)."""
+    sivun_koko = SyncEtusivuView.sivun_koko
+
+    async def get(self, request):
+        qs, jarjestys, valittu = etusivun_viljelyt(request)
+        omat_viljelyt = await akeyset_sivu(
+            qs, jarjestys, self.sivun_koko,
+            jalkeen=request.GET.get('jalkeen'), ennen=request.GET.get('ennen'),
+        )
+        return render(
+            request, 'garden/etusivu.html',
+            etusivu_konteksti(omat_viljelyt, date.today().month, valittu),
+        )
+
+
+class KasvilistaView(View):
+    """Kasvilista (async): sivu ja kategoriat haetaan rinnakkain."""
+    sivun_koko = SyncKasvilistaView.sivun_koko
+    jarjestys = SyncKasvilistaView.jarjestys
+
+    async def get(self, request):
+        sivu, kategoriat = await asyncio.gather(
+            akeyset_sivu(
+                suodata_kasvilajit(PlantSpecies.objects.all(), request),
+                self.jarjestys, self.sivun_koko,
+                jalkeen=request.GET.get('jalkeen'), ennen=request.GET.get('ennen'),
+            ),
+            _listaksi(kategoriat_kysely()),
+        )
+        return render(request, 'garden/kasvilista.html', {
+            'kasvit': sivu.rivit,
+            'object_list': sivu.rivit,
+            'sivu': sivu,
+            'kategoriat': kategoriat,
+            **kasvilista_suodattimet(request),
+        })
+
+
+class ViljelyDetailView(View):
+    """Viljelymerkinnän yksityiskohdat + havainnot (async)."""
+
+    async def get(self, request, pk):
+        viljely = await aget_object_or_404(
+            MyGarden.objects.select_related('kasvilaji'), pk=pk
+        )
+        havainnot = await akeyset_sivu(
+            viljely.havainnot.prefetch_related('kuvat'), HAVAINNOT_JARJESTYS, HAVAINNOT_SIVU
+        )
+        return render(request, 'garden/viljely_detail.html', {
+            'viljely': viljely,
+            'havainnot': havainnot,
+            'note_form': GardenNoteForm(initial={'paivamaara': date.today()}),
+            'tila_form': TilaForm(instance=viljely),
+            'mittaus_form': MittausForm(prefix='mittaus', initial={'paivamaara': date.today()}),
+            'mittaussuureet': mittaukset.SUUREVALINNAT,
+        })
+
+    async def post(self, request, pk):
+        # Lomakkeiden validointi ja tallennus (myös kuvat ja mittaukset)
+        # ovat synkronista koodia, joten ajetaan sync-näkymän käsittelijä
+        return await sync_to_async(viljelyn_lomake)(request, pk, 'async_viljely_detail')
+
+
+class VaihdaTilaView(View):
+    """Tilan vaihto etusivulta (async)."""
+
+    async def post(self, request, pk):
+        viljely = await aget_object_or_404(MyGarden, pk=pk)
+        tila_form = TilaForm(request.POST, instance=viljely)
+        if tila_form.is_valid():
+            await viljely.asave(update_fields=['tila'])
+        return redirect('async_etusivu')
+
+
+async def _listaksi(qs):
+    return [rivi async for rivi in qs]
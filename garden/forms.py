@@ -1,6 +1,55 @@
 """Puutarhapäiväkirjan lomakkeet."""
 from django import forms
-from .models import MyGarden, GardenNote, PlantSpecies
+from django.urls import reverse
+from . import kuvat
+from .models import MyGarden, GardenNote, Mittaus, PlantSpecies
+
+
+class KasvilajiHaku(forms.Widget):
+    """Kasvilajin valinta hakukentällä koko lajiluettelon ``<select>``in sijaan.
+
+    Lomakkeelle renderöidään vain valittu laji; ehdotukset haetaan
+    kirjoitettaessa ``api_kasvilaji_ehdotukset``-rajapinnasta.
+    """
+    template_name = 'garden/widgets/kasvilaji_haku.html'
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        laji = None
+        if value not in (None, ''):
+            try:
+                laji = PlantSpecies.objects.filter(pk=value).first()
+            except (TypeError, ValueError):
+                pass
+        context['widget']['laji'] = laji
+        context['widget']['ehdotukset_url'] = reverse('api_kasvilaji_ehdotukset')
+        return context
+
+
+class UseitaKuvia(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class KuvatField(forms.FileField):
+    """Nolla tai useampi kuvatiedosto; muoto tarkistetaan tiedoston alusta."""
+    widget = UseitaKuvia(attrs={'accept': 'image/jpeg,image/png,image/gif,image/webp'})
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('required', False)
+        super().__init__(**kwargs)
+
+    def clean(self, data, initial=None):
+        yksi = super().clean
+        tiedostot = data if isinstance(data, (list, tuple)) else [data]
+        tiedostot = [yksi(tiedosto, initial) for tiedosto in tiedostot if tiedosto]
+        if len(tiedostot) > kuvat.ENINTAAN_KUVIA:
+            raise forms.ValidationError(f'Enintään {kuvat.ENINTAAN_KUVIA} kuvaa kerralla.')
+        for tiedosto in tiedostot:
+            try:
+                kuvat.tarkista(tiedosto)
+            except kuvat.KuvaVirhe as e:
+                raise forms.ValidationError(str(e))
+        return tiedostot
 
 
 class MyGardenForm(forms.ModelForm):
@@ -10,6 +59,7 @@ class MyGardenForm(forms.ModelForm):
         model = MyGarden
         fields = ['kasvilaji', 'kasvupaikka', 'tila', 'kylvopaiva', 'muistiinpanot']
         widgets = {
+            'kasvilaji': KasvilajiHaku,
             'kylvopaiva': forms.DateInput(attrs={'type': 'date'}),
             'muistiinpanot': forms.Textarea(attrs={'rows': 3}),
         }
@@ -25,6 +75,7 @@ class TilaForm(forms.ModelForm):
 
 class GardenNoteForm(forms.ModelForm):
     """Lomake uuden havainnon lisäämiseen."""
+    kuvat = KuvatField(label='Kuvat')
 
     class Meta:
         model = GardenNote
@@ -35,6 +86,18 @@ class GardenNoteForm(forms.ModelForm):
         }
 
 
+class MittausForm(forms.ModelForm):
+    """Lomake mittauksen lisäämiseen viljelysivulla."""
+
+    class Meta:
+        model = Mittaus
+        fields = ['suure', 'paivamaara', 'arvo']
+        widgets = {
+            'paivamaara': forms.DateInput(attrs={'type': 'date'}),
+            'arvo': forms.NumberInput(attrs={'step': 'any', 'min': 0}),
+        }
+
+
 class PlantSpeciesForm(forms.ModelForm):
     """Lomake uuden kasvilajin lisäämiseen."""
 
@@ -0,0 +1,181 @@
+"""Kokotekstihaku SQLiten FTS5-indekseillä.
+
+Indeksit ovat ulkoisen sisällön FTS5-tauluja (``content=``), joten teksti
+tallennetaan vain kerran. Tietokantatriggerit pitävät ne ajan tasalla
+jokaisessa lisäyksessä, muutoksessa ja poistossa, myös ``bulk_create``-
+ja ``update``-poluilla. ``rakenna_hakuindeksi`` rakentaa ne alusta.
+"""
+import re
+from datetime import date
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+
+# unicode61 + diakriittien poisto: "paivamaara" löytää "päivämäärä".
+# prefix-indeksit nopeuttavat lyhyitä etuliitehakuja.
+TOKENISOINTI = "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4'"
+
+INDEKSIT = {
+    'garden_plantspecies_fts': {
+        'taulu': 'garden_plantspecies',
+        'sarakkeet': ['nimi', 'lajike', 'kuvaus', 'kasvatusohje'],
+    },
+    'garden_gardennote_fts': {
+        'taulu': 'garden_gardennote',
+        'sarakkeet': ['havainto'],
+    },
+}
+
+# Painot bm25:lle sarakejärjestyksessä: nimi osuu vahvimmin
+KASVILAJI_PAINOT = (10.0, 5.0, 1.0, 1.0)
+
+# Pienin sanan pituus, josta taivutuspääte typistetään ennen etuliitehakua
+TYPISTYS_PITUUS = 6
+
+_SANA = re.compile(r'\w+', re.UNICODE)
+
+KOROSTUS_ALKU = '\x02'
+KOROSTUS_LOPPU = '\x03'
+
+
+def luo_indeksit_sql():
+    """Palauttaa FTS5-taulujen ja synkronointitriggerien luontilauseet."""
+    lauseet = []
+    for fts, maaritys in INDEKSIT.items():
+        lauseet.append(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            f"{', '.join(maaritys['sarakkeet'])}, content = '{maaritys['taulu']}', "
+            f"content_rowid = 'id', {TOKENISOINTI})"
+        )
+    lauseet += luo_triggerit_sql()
+    lauseet += [f"INSERT INTO {fts}({fts}) VALUES ('rebuild')" for fts in INDEKSIT]
+    return lauseet
+
+
+def luo_triggerit_sql():
+    """Palauttaa synkronointitriggerien luontilauseet (idempotentit).
+
+    SQLite hävittää taulun triggerit, kun migraatio rakentaa taulun
+    uudelleen, joten ne luodaan uudelleen jokaisen migraation jälkeen.
+    """
+    lauseet = []
+    for fts, maaritys in INDEKSIT.items():
+        taulu = maaritys['taulu']
+        sarakkeet = ', '.join(maaritys['sarakkeet'])
+        uudet = ', '.join(f'new.{s}' for s in maaritys['sarakkeet'])
+        vanhat = ', '.join(f'old.{s}' for s in maaritys['sarakkeet'])
+        lauseet += [
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {taulu} BEGIN "
+            f"INSERT INTO {fts}(rowid, {sarakkeet}) VALUES (new.id, {uudet}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {taulu} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {sarakkeet}) VALUES ('delete', old.id, {vanhat}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {sarakkeet} ON {taulu} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {sarakkeet}) VALUES ('delete', old.id, {vanhat}); "
+            f"INSERT INTO {fts}(rowid, {sarakkeet}) VALUES (new.id, {uudet}); END",
+        ]
+    return lauseet
+
+
+def poista_indeksit_sql():
+    """Palauttaa FTS5-taulujen ja triggerien poistolauseet."""
+    lauseet = []
+    for fts in INDEKSIT:
+        lauseet += [f'DROP TRIGGER IF EXISTS {fts}_{t}' for t in ('ai', 'ad', 'au')]
+        lauseet.append(f'DROP TABLE IF EXISTS {fts}')
+    return lauseet
+
+
+def rakenna_indeksit():
+    """Rakentaa kaikki hakuindeksit uudelleen sisältötauluista."""
+    with connection.cursor() as cursor:
+        for fts in INDEKSIT:
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('optimize')")
+
+
+def fts_kysely(teksti):
+    """Muuntaa käyttäjän hakutekstin FTS5-kyselyksi.
+
+    Jokainen sana haetaan etuliitteenä, ja pitkistä sanoista typistetään
+    kaksi viimeistä merkkiä, jotta suomen taivutusmuodot osuvat
+    ("tomaatit" → ``"tomaat"*`` löytää myös "tomaatin" ja "tomaatteja").
+    Sanat yhdistetään AND-ehdolla. Palauttaa tyhjän merkkijonon, jos
+    hakusanoja ei ole.
+    """
+    termit = []
+    for sana in _SANA.findall(teksti.lower()):
+        if len(sana) >= TYPISTYS_PITUUS:
+            sana = sana[:-2]
+        termit.append(f'"{sana}"*')
+    return ' '.join(termit)
+
+
+def osuma_ehto(fts, teksti):
+    """Q-ehto "rivi osuu hakuun ``teksti`` indeksissä ``fts``" querysetille.
+
+    Tyhjä haku ei rajaa mitään.
+    """
+    kysely = fts_kysely(teksti)
+    if not kysely:
+        return Q()
+    return Q(pk__in=RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [kysely]))
+
+
+def _korosta(katkelma):
+    """Escapoi katkelman ja muuttaa korostusmerkit <mark>-tageiksi."""
+    return (
+        escape(katkelma)
+        .replace(KOROSTUS_ALKU, '<mark>')
+        .replace(KOROSTUS_LOPPU, '</mark>')
+    )
+
+
+def _snippet(fts, sarake):
+    return (
+        f"snippet({fts}, {sarake}, '{KOROSTUS_ALKU}', '{KOROSTUS_LOPPU}', '…', 12)"
+    )
+
+
+def hae_kasvilajit(teksti, raja=20):
+    """Hakee kasvilajit osuvuusjärjestyksessä katkelmineen."""
+    kysely = fts_kysely(teksti)
+    if not kysely:
+        return []
+    fts = 'garden_plantspecies_fts'
+    painot = ', '.join(str(p) for p in KASVILAJI_PAINOT)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT p.id, p.nimi, p.lajike, p.kategoria, {_snippet(fts, -1)} "
+            f"FROM {fts} JOIN garden_plantspecies p ON p.id = {fts}.rowid "
+            f"WHERE {fts} MATCH %s ORDER BY bm25({fts}, {painot}) LIMIT %s",
+            [kysely, raja],
+        )
+        return [
+            {'id': pk, 'nimi': nimi, 'lajike': lajike, 'kategoria': kategoria,
+             'katkelma': _korosta(katkelma)}
+            for pk, nimi, lajike, kategoria, katkelma in cursor.fetchall()
+        ]
+
+
+def hae_havainnot(teksti, raja=20):
+    """Hakee havainnot osuvuusjärjestyksessä katkelmineen."""
+    kysely = fts_kysely(teksti)
+    if not kysely:
+        return []
+    fts = 'garden_gardennote_fts'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT n.id, n.kasvi_id, n.paivamaara, p.nimi, p.lajike, {_snippet(fts, 0)} "
+            f"FROM {fts} JOIN garden_gardennote n ON n.id = {fts}.rowid "
+            f"JOIN garden_mygarden g ON g.id = n.kasvi_id "
+            f"JOIN garden_plantspecies p ON p.id = g.kasvilaji_id "
+            f"WHERE {fts} MATCH %s ORDER BY bm25({fts}) LIMIT %s",
+            [kysely, raja],
+        )
+        return [
+            {'id': pk, 'viljely_id': viljely_id, 'paivamaara': date.fromisoformat(str(paivamaara)),
+             'nimi': nimi, 'lajike': lajike, 'katkelma': _korosta(katkelma)}
+            for pk, viljely_id, paivamaara, nimi, lajike, katkelma in cursor.fetchall()
+        ]
@@ -0,0 +1,133 @@
+"""Kylvö-, itämis- ja satoikkunat iCalendar-muodossa (RFC 5545).
+
+Kalenteri kootaan rivi kerrallaan generaattorista, jotta näkymä voi
+suoratoistaa sen ``StreamingHttpResponse``lla. Kaikki tapahtumat ovat
+koko päivän tapahtumia; ``DTEND`` on ensimmäinen päivä tapahtuman jälkeen.
+"""
+from datetime import date, timedelta, timezone
+
+PRODID = '-//gardenlog//Puutarhapäiväkirja//FI'
+UID_DOMAIN = 'gardenlog'
+
+# Rivin enimmäispituus oktetteina ennen taittoa
+RIVIN_PITUUS = 75
+
+# Kentät, jotka ``viljelyn_tapahtumat`` tarvitsee (values()-rivinä)
+KENTAT = [
+    'pk', 'kylvopaiva', 'kasvupaikka',
+    'kasvilaji__nimi', 'kasvilaji__lajike',
+    'kasvilaji__kylvo_alku_kk', 'kasvilaji__kylvo_loppu_kk',
+    'kasvilaji__sato_alku_kk', 'kasvilaji__sato_loppu_kk',
+    'kasvilaji__itamisaika_min_pv', 'kasvilaji__itamisaika_max_pv',
+]
+
+
+def _escape(teksti):
+    return (
+        teksti.replace('\\', '\\\\').replace(';', '\\;')
+        .replace(',', '\\,').replace('\n', '\\n')
+    )
+
+
+def taita(rivi):
+    """Taittaa rivin 75 oktetin osiin ja päättää sen CRLF:llä.
+
+    Jatkorivit alkavat välilyönnillä; UTF-8-merkkejä ei katkaista.
+    """
+    osat = []
+    nykyinen, pituus = [], 0
+    for merkki in rivi:
+        koko = len(merkki.encode())
+        if pituus + koko > RIVIN_PITUUS:
+            osat.append(''.join(nykyinen))
+            nykyinen, pituus = [' '], 1
+        nykyinen.append(merkki)
+        pituus += koko
+    osat.append(''.join(nykyinen))
+    return '\r\n'.join(osat) + '\r\n'
+
+
+def _pvm(paiva):
+    return paiva.strftime('%Y%m%d')
+
+
+def _kuukauden_alku(vuosi, kk):
+    """Kuukauden ensimmäinen päivä; kk > 12 siirtyy seuraavalle vuodelle."""
+    return date(vuosi + (kk - 1) // 12, (kk - 1) % 12 + 1, 1)
+
+
+def kuukausivali(vuosi, alku_kk, loppu_kk):
+    """Palauttaa kuukausivälin (alku, loppu+1 pv); vuodenvaihde kiertää."""
+    if loppu_kk < alku_kk:
+        loppu_kk += 12
+    return _kuukauden_alku(vuosi, alku_kk), _kuukauden_alku(vuosi, loppu_kk + 1)
+
+
+def tapahtuma(uid, alku, loppu, otsikko, leima, kuvaus=''):
+    """Palauttaa yhden koko päivän VEVENTin taitetut rivit."""
+    rivit = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}@{UID_DOMAIN}',
+        f'DTSTAMP:{leima.astimezone(timezone.utc):%Y%m%dT%H%M%SZ}',
+        f'DTSTART;VALUE=DATE:{_pvm(alku)}',
+        f'DTEND;VALUE=DATE:{_pvm(loppu)}',
+        f'SUMMARY:{_escape(otsikko)}',
+    ]
+    if kuvaus:
+        rivit.append(f'DESCRIPTION:{_escape(kuvaus)}')
+    rivit.append('END:VEVENT')
+    return ''.join(taita(rivi) for rivi in rivit)
+
+
+def viljelyn_tapahtumat(viljely, vuosi, leima):
+    """Viljelyrivin (ks. ``KENTAT``) kylvö-, itämis- ja satotapahtumat.
+
+    Ilman kylvöpäivää ikkunat sijoitetaan vuodelle ``vuosi``. Jos sato
+    alkaa kalenterivuodessa ennen kylvöä, se osuu seuraavalle vuodelle.
+    """
+    pk, kylvopaiva = viljely['pk'], viljely['kylvopaiva']
+    nimi = viljely['kasvilaji__nimi']
+    if viljely['kasvilaji__lajike']:
+        nimi = f"{nimi} '{viljely['kasvilaji__lajike']}'"
+    paikka = viljely['kasvupaikka']
+    if kylvopaiva:
+        vuosi = kylvopaiva.year
+
+    kylvo_alku, kylvo_loppu = kuukausivali(
+        vuosi, viljely['kasvilaji__kylvo_alku_kk'], viljely['kasvilaji__kylvo_loppu_kk'],
+    )
+    yield tapahtuma(
+        f'{pk}-kylvo', kylvo_alku, kylvo_loppu, f'Kylvöaika: {nimi}', leima, paikka,
+    )
+
+    if kylvopaiva:
+        yield tapahtuma(
+            f'{pk}-itaminen',
+            kylvopaiva + timedelta(days=viljely['kasvilaji__itamisaika_min_pv']),
+            kylvopaiva + timedelta(days=viljely['kasvilaji__itamisaika_max_pv'] + 1),
+            f'Itäminen: {nimi}', leima, paikka,
+        )
+
+    sato_alku_kk = viljely['kasvilaji__sato_alku_kk']
+    sato_vuosi = vuosi + 1 if sato_alku_kk < viljely['kasvilaji__kylvo_alku_kk'] else vuosi
+    sato_alku, sato_loppu = kuukausivali(
+        sato_vuosi, sato_alku_kk, viljely['kasvilaji__sato_loppu_kk'],
+    )
+    yield tapahtuma(
+        f'{pk}-sato', sato_alku, sato_loppu, f'Sadonkorjuu: {nimi}', leima, paikka,
+    )
+
+
+def kalenteri(viljelyt, vuosi, leima, nimi='Puutarhapäiväkirja'):
+    """Generaattori, joka tuottaa koko VCALENDARin paloina."""
+    yield ''.join(taita(rivi) for rivi in [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(nimi)}',
+    ])
+    for viljely in viljelyt:
+        yield from viljelyn_tapahtumat(viljely, vuosi, leima)
+    yield taita('END:VCALENDAR')
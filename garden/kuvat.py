@@ -0,0 +1,169 @@
+"""Havaintojen kuvaliitteet: sisältöosoitteinen tallennus ja valmiit koot.
+
+Alkuperäinen tiedosto tallennetaan oletustallennustilaan nimellä
+``kuvat/ab/<sha256>``, joten sama kuva tallentuu vain kerran. Lataus ei
+pura kuvaa: muoto tunnistetaan tiedoston alusta ja pienennetyt versiot
+(``VERSIOT``) tekee taustatyö ``tee_kuvaversiot``. Myös versioiden nimissä
+on niiden oman sisällön tiiviste (``Kuva.versiot``), joten uudelleen tehty
+versio saa uuden osoitteen. Sivut viittaavat vain versioihin, ja
+``KuvaView`` palvelee ne vuoden immutable-välimuistilla, koska
+tiivisteellisen nimen sisältö ei koskaan muutu.
+
+Versioiden tekeminen vaatii Pillow-kirjaston.
+"""
+import hashlib
+from io import BytesIO
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .models import Kuva
+from .tyot import lisaa_jonoon
+
+try:
+    from PIL import ExifTags, Image, ImageOps
+except ImportError:
+    ExifTags = Image = ImageOps = None
+
+# Versio → pidemmän sivun enimmäispituus pikseleinä
+VERSIOT = {
+    'esikatselu': 1280,
+    'pikku': 320,
+}
+JPEG_LAATU = 82
+
+ENIMMAISKOKO = 20 * 1024 * 1024
+ENINTAAN_KUVIA = 8
+
+# EXIF-suunnat, joissa kuva on kierretty 90° (leveys ja korkeus vaihtavat paikkaa)
+_KIERRETYT = {5, 6, 7, 8}
+
+# Tiedoston alku → muoto (WebP: RIFF....WEBP)
+_TUNNISTEET = [
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+]
+
+
+class KuvaVirhe(ValueError):
+    """Tiedosto ei ole tuettu kuva."""
+
+
+def tunnista_muoto(alku):
+    """Palauttaa kuvan muodon tiedoston ensimmäisistä tavuista tai None."""
+    for tunniste, muoto in _TUNNISTEET:
+        if alku.startswith(tunniste):
+            return muoto
+    if alku[:4] == b'RIFF' and alku[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def tarkista(tiedosto):
+    """Tarkistaa ladatun tiedoston koon ja muodon purkamatta kuvaa."""
+    if tiedosto.size > ENIMMAISKOKO:
+        raise KuvaVirhe(f'{tiedosto.name}: kuva on liian suuri (enintään 20 Mt).')
+    tiedosto.seek(0)
+    muoto = tunnista_muoto(tiedosto.read(12))
+    tiedosto.seek(0)
+    if muoto is None:
+        raise KuvaVirhe(f'{tiedosto.name}: vain JPEG-, PNG-, GIF- ja WebP-kuvat kelpaavat.')
+    return muoto
+
+
+def tallennusnimi(tiiviste, versio=None, tunniste=None):
+    """Alkuperäisen tai version (``tunniste`` = version tiiviste) nimi tallennustilassa."""
+    pohja = f'kuvat/{tiiviste[:2]}/{tiiviste}'
+    return pohja if versio is None else f'{pohja}-{versio}.{tunniste}.jpg'
+
+
+def version_tunniste(sisalto):
+    return hashlib.sha256(sisalto).hexdigest()[:16]
+
+
+def tallenna(tiedosto):
+    """Tallentaa ladatun kuvan (ellei sama sisältö ole jo tallessa).
+
+    Palauttaa ``Kuva``-rivin. Uudelle kuvalle lisätään samassa
+    transaktiossa versioiden tekotyö jonoon.
+    """
+    muoto = tarkista(tiedosto)
+    tiiviste = hashlib.sha256()
+    for pala in tiedosto.chunks():
+        tiiviste.update(pala)
+    tiiviste = tiiviste.hexdigest()
+
+    kuva = Kuva.objects.filter(tiiviste=tiiviste).first()
+    if kuva is not None:
+        return kuva
+    nimi = tallennusnimi(tiiviste)
+    if not default_storage.exists(nimi):
+        tiedosto.seek(0)
+        tallennettu = default_storage.save(nimi, tiedosto)
+        if tallennettu != nimi:
+            # Rinnakkainen lataus ehti tallentaa saman sisällön
+            default_storage.delete(tallennettu)
+    with transaction.atomic():
+        kuva, luotu = Kuva.objects.get_or_create(
+            tiiviste=tiiviste, defaults={'muoto': muoto, 'koko': tiedosto.size},
+        )
+        if luotu:
+            lisaa_jonoon('tee_kuvaversiot', kuva=kuva.pk)
+    return kuva
+
+
+def _rgb(kuva):
+    """JPEG ei tue läpinäkyvyyttä: läpinäkyvä tausta korvataan valkoisella."""
+    if kuva.mode in ('RGB', 'L'):
+        return kuva
+    kuva = kuva.convert('RGBA')
+    tausta = Image.new('RGB', kuva.size, 'white')
+    tausta.paste(kuva, mask=kuva.getchannel('A'))
+    return tausta
+
+
+def tee_versiot(kuva):
+    """Tekee kuvan pienennetyt versiot ja merkitsee kuvan valmiiksi.
+
+    Purkamaton tiedosto merkitään virheelliseksi. Palauttaa kuvan tilan.
+    """
+    if Image is None:
+        raise ImproperlyConfigured('Kuvaversioiden tekeminen vaatii Pillow-kirjaston.')
+    suurin = max(VERSIOT.values())
+    try:
+        with default_storage.open(tallennusnimi(kuva.tiiviste)) as tiedosto, \
+                Image.open(tiedosto) as alkuperainen:
+            leveys, korkeus = alkuperainen.size
+            if alkuperainen.getexif().get(ExifTags.Base.Orientation) in _KIERRETYT:
+                leveys, korkeus = korkeus, leveys
+            # JPEGin voi purkaa suoraan pienempänä (1/2…1/8), mikä on
+            # kameran kuvilla moninkertaisesti nopeampaa kuin täysi purku
+            alkuperainen.draft('RGB', (suurin, suurin))
+            pienennetty = _rgb(ImageOps.exif_transpose(alkuperainen))
+    except (OSError, ValueError, Image.DecompressionBombError):
+        Kuva.objects.filter(pk=kuva.pk).update(tila=Kuva.VIRHEELLINEN)
+        return Kuva.VIRHEELLINEN
+
+    # Suurimmasta pienimpään: jokainen versio pienennetään edellisestä
+    versiot = {}
+    for versio, raja in sorted(VERSIOT.items(), key=lambda v: -v[1]):
+        pienennetty.thumbnail((raja, raja), Image.Resampling.LANCZOS)
+        puskuri = BytesIO()
+        pienennetty.save(puskuri, 'JPEG', quality=JPEG_LAATU, optimize=True, progressive=True)
+        versiot[versio] = version_tunniste(puskuri.getvalue())
+        nimi = tallennusnimi(kuva.tiiviste, versio, versiot[versio])
+        if not default_storage.exists(nimi):
+            default_storage.save(nimi, ContentFile(puskuri.getvalue()))
+
+    Kuva.objects.filter(pk=kuva.pk).update(
+        tila=Kuva.VALMIS, leveys=leveys, korkeus=korkeus, versiot=versiot,
+    )
+    # Korvatut versiot poistetaan vasta, kun sivut viittaavat uusiin
+    for versio, tunniste in kuva.versiot.items():
+        if versiot.get(versio) != tunniste:
+            default_storage.delete(tallennusnimi(kuva.tiiviste, versio, tunniste))
+    return Kuva.VALMIS
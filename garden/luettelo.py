@@ -0,0 +1,272 @@
+"""Nelson Gardenin tuotesyötteen inkrementaalinen synkronointi.
+
+Syöte on paikallinen tiedosto tai HTTP-osoite. Se on joko JSONL-muotoinen
+tuotelista (rivi = ``lataa_kasvit``in kentät, ``nelson_garden_id``
+pakollinen) tai hakemisto ``{"sivut": [...]}``, jonka sivut haetaan
+rinnakkain rajatussa säiepoolissa. Suhteelliset sivuosoitteet ratkaistaan
+hakemiston osoitteesta.
+
+Tuotteet täsmätään ``nelson_garden_id``:llä. Syötteen rivin tiivistettä
+verrataan edellisellä synkronoinnilla tallennettuun
+(``PlantSpecies.sisalto_tiiviste``), joten ennallaan olevia tuotteita ei
+validoida eikä kirjoiteta; uudet ja muuttuneet lajit kirjoitetaan erissä.
+Paikallinen muokkaus tyhjentää tiivisteen, jolloin syötteen tiedot
+palautetaan seuraavalla ajolla. Syötteestä puuttuvia lajeja ei poisteta,
+koska niihin voi liittyä viljelyjä.
+"""
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+from urllib.request import Request, url2pathname, urlopen
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .models import MyGarden, PlantSpecies
+from .tuonti import PAIVITETTAVAT, rakenna_laji
+
+SAIKEET = 4
+ERAKOKO = 1000
+AIKAKATKAISU = 30
+
+# Olemassa olevalle lajille kirjoitetaan myös avainkentät
+SYNKRONOITAVAT = ['nimi', 'lajike'] + PAIVITETTAVAT
+
+
+class SyoteVirhe(Exception):
+    """Syötettä tai sen sivua ei voi lukea."""
+
+
+def on_url(lahde):
+    return urlsplit(str(lahde)).scheme in ('http', 'https')
+
+
+def lue(lahde, aikakatkaisu=AIKAKATKAISU):
+    """Lukee tiedoston tai HTTP-osoitteen sisällön tavuina."""
+    try:
+        if on_url(lahde):
+            pyynto = Request(lahde, headers={'Accept': 'application/json, application/x-ndjson'})
+            with urlopen(pyynto, timeout=aikakatkaisu) as vastaus:
+                return vastaus.read()
+        return Path(lahde).read_bytes()
+    except OSError as e:
+        raise SyoteVirhe(f'{lahde}: {e}')
+
+
+def jasenna(sisalto, lahde):
+    """Jäsentää JSONL-sivun tuotteiksi (tyhjät rivit ohitetaan)."""
+    tuotteet = []
+    for rivinro, rivi in enumerate(sisalto.decode('utf-8-sig').splitlines(), start=1):
+        if not rivi.strip():
+            continue
+        try:
+            tuotteet.append(json.loads(rivi))
+        except ValueError as e:
+            raise SyoteVirhe(f'{lahde}, rivi {rivinro}: virheellinen JSON: {e}')
+    return tuotteet
+
+
+def tuotteen_tiiviste(data):
+    """Syötteen rivin SHA-256-tiiviste; kenttien järjestyksellä ei ole väliä."""
+    sisalto = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(sisalto.encode()).hexdigest()
+
+
+def _hae_sivu(lahde, aikakatkaisu):
+    return lahde, jasenna(lue(lahde, aikakatkaisu), lahde)
+
+
+def _sivut(lahde, aikakatkaisu):
+    """Palauttaa (sivujen osoitteet, jo luettu sisältö tai None)."""
+    sisalto = lue(lahde, aikakatkaisu)
+    try:
+        hakemisto = json.loads(sisalto)
+    except ValueError:
+        return [lahde], sisalto
+    if not isinstance(hakemisto, dict) or 'sivut' not in hakemisto:
+        return [lahde], sisalto
+    pohja = lahde if on_url(lahde) else Path(lahde).resolve().as_uri()
+    sivut = []
+    for sivu in hakemisto['sivut']:
+        osoite = urljoin(pohja, sivu)
+        sivut.append(osoite if on_url(osoite) else url2pathname(urlsplit(osoite).path))
+    return sivut, None
+
+
+class Synkronointi:
+    """Yksi synkronointiajo; ``tilasto`` kertoo, mitä tehtiin."""
+
+    def __init__(self, saikeet=SAIKEET, erakoko=ERAKOKO, aikakatkaisu=AIKAKATKAISU,
+                 kuivaharjoitus=False, raportoi=None):
+        self.saikeet = saikeet
+        self.erakoko = erakoko
+        self.aikakatkaisu = aikakatkaisu
+        self.kuivaharjoitus = kuivaharjoitus
+        self.raportoi = raportoi or (lambda viesti: None)
+        self.tilasto = {'sivuja': 0, 'tuotteita': 0, 'uusia': 0, 'muuttuneita': 0,
+                        'ennallaan': 0, 'virheita': 0}
+        self.virheet = []
+
+    def aja(self, lahde):
+        """Hakee syötteen sivut rinnakkain ja sovittaa ne tietokantaan."""
+        sivut, sisalto = _sivut(lahde, self.aikakatkaisu)
+        if sisalto is not None:
+            self.kasittele(lahde, jasenna(sisalto, lahde))
+            return self.tilasto
+        # Haut säikeissä, tietokantatyö tässä säikeessä sivu kerrallaan
+        with ThreadPoolExecutor(self.saikeet) as pooli:
+            haut = [pooli.submit(_hae_sivu, sivu, self.aikakatkaisu) for sivu in sivut]
+            for haku in as_completed(haut):
+                try:
+                    sivu, tuotteet = haku.result()
+                except SyoteVirhe as e:
+                    # Muut sivut sovitetaan; puuttuva sivu tulee seuraavalla ajolla
+                    self.virhe(str(e))
+                    continue
+                self.kasittele(sivu, tuotteet)
+        return self.tilasto
+
+    def kasittele(self, lahde, tuotteet):
+        self.tilasto['sivuja'] += 1
+        era = {}
+        for rivinro, data in enumerate(tuotteet, start=1):
+            self.tilasto['tuotteita'] += 1
+            tunniste = data.get('nelson_garden_id') if isinstance(data, dict) else None
+            if not isinstance(tunniste, str) or not tunniste.strip():
+                self.virhe(f'{lahde}, tuote {rivinro}: nelson_garden_id puuttuu.')
+                continue
+            era[tunniste] = (f'{lahde}, tuote {rivinro}', data)
+            if len(era) >= self.erakoko:
+                self.sovita(era)
+                era = {}
+        self.sovita(era)
+        self.raportoi(
+            f"{lahde}: {self.tilasto['uusia']} uutta, {self.tilasto['muuttuneita']} "
+            f"muuttunutta, {self.tilasto['ennallaan']} ennallaan"
+        )
+
+    def virhe(self, viesti):
+        self.tilasto['virheita'] += 1
+        self.virheet.append(viesti)
+
+    def sovita(self, era):
+        """Validoi ja kirjoittaa erästä vain uudet ja muuttuneet tuotteet."""
+        if not era:
+            return
+        # exclude toistaa osittaisen yksilöllisen indeksin ehdon, jotta SQLite
+        # käyttää indeksiä eikä käy koko taulua läpi jokaiselle erälle
+        tallennetut = {
+            tunniste: (pk, tiiviste)
+            for tunniste, pk, tiiviste in PlantSpecies.objects
+            .filter(nelson_garden_id__in=era).exclude(nelson_garden_id='')
+            .values_list('nelson_garden_id', 'pk', 'sisalto_tiiviste')
+        }
+        uudet, muuttuneet = [], []
+        for tunniste, (kohta, data) in era.items():
+            tiiviste = tuotteen_tiiviste(data)
+            pk, tallennettu = tallennetut.get(tunniste, (None, None))
+            if tiiviste == tallennettu:
+                self.tilasto['ennallaan'] += 1
+                continue
+            try:
+                laji = rakenna_laji(data)
+            except ValidationError as e:
+                self.virhe(f'{kohta}: {"; ".join(e.messages)}')
+                continue
+            laji.sisalto_tiiviste = tiiviste
+            if pk is None:
+                uudet.append(laji)
+            else:
+                laji.pk = pk
+                muuttuneet.append(laji)
+        uudet = self.yhdista_nimella(uudet, muuttuneet)
+        muuttuneet = self.ohita_nimiristiriidat(uudet, muuttuneet)
+
+        self.tilasto['uusia'] += len(uudet)
+        self.tilasto['muuttuneita'] += len(muuttuneet)
+        if self.kuivaharjoitus:
+            return
+        with transaction.atomic():
+            PlantSpecies.objects.bulk_create(uudet)
+            # Rivikohtaiset UPDATEt yhdessä transaktiossa: bulk_update rakentaisi
+            # jokaiselle kentälle CASE-lausekkeen ja on moninkertaisesti hitaampi
+            for laji in muuttuneet:
+                PlantSpecies.objects.filter(pk=laji.pk).update(
+                    **{kentta: getattr(laji, kentta) for kentta in SYNKRONOITAVAT}
+                )
+            if muuttuneet:
+                # update() ohittaa save()n: kasvuaika on voinut muuttua
+                MyGarden.objects.filter(
+                    kasvilaji__in=[laji.pk for laji in muuttuneet],
+                ).exclude(kylvopaiva=None).paivita_satoarviot()
+
+    def ohita_nimiristiriidat(self, uudet, muuttuneet):
+        """Ohittaa muuttuneet lajit, joiden (nimi, lajike) on jo toisella lajilla.
+
+        Muuten rivikohtainen UPDATE kaatuisi yksilöllisyysehtoon ja peruisi
+        koko erän. Ohitetun lajin tiiviste jää ennalleen, joten se yritetään
+        uudelleen seuraavalla ajolla.
+        """
+        if not muuttuneet:
+            return muuttuneet
+        varatut = {
+            (nimi, lajike): pk
+            for pk, nimi, lajike in PlantSpecies.objects.filter(
+                nimi__in={laji.nimi for laji in muuttuneet},
+            ).values_list('pk', 'nimi', 'lajike')
+        }
+        # Samassa erässä lisättävät varaavat nimensä ennen päivityksiä
+        for laji in uudet:
+            varatut[(laji.nimi, laji.lajike)] = None
+        jaljelle = []
+        for laji in muuttuneet:
+            avain = (laji.nimi, laji.lajike)
+            if varatut.setdefault(avain, laji.pk) != laji.pk:
+                self.virhe(
+                    f'{laji}: nimi on jo toisella lajilla, ohitetaan {laji.nelson_garden_id}'
+                )
+                continue
+            jaljelle.append(laji)
+        return jaljelle
+
+    def yhdista_nimella(self, uudet, muuttuneet):
+        """Liittää tunnisteen olemassa olevaan samannimiseen lajiin.
+
+        Käsin lisätyillä lajeilla ei ole tunnistetta; (nimi, lajike) on
+        yksilöllinen, joten sama laji päivitetään eikä sitä lisätä uudelleen.
+        """
+        if not uudet:
+            return uudet
+        tallennetut = {
+            (nimi, lajike): (pk, tunniste)
+            for pk, nimi, lajike, tunniste in PlantSpecies.objects.filter(
+                nimi__in={laji.nimi for laji in uudet},
+            ).values_list('pk', 'nimi', 'lajike', 'nelson_garden_id')
+        }
+        jaljelle, nahdyt = [], set()
+        for laji in uudet:
+            avain = (laji.nimi, laji.lajike)
+            osuma = tallennetut.get(avain)
+            if osuma is None and avain not in nahdyt:
+                nahdyt.add(avain)
+                jaljelle.append(laji)
+            elif osuma is None:
+                self.virhe(f'{laji}: nimi toistuu syötteessä, ohitetaan {laji.nelson_garden_id}')
+            elif osuma[1]:
+                self.virhe(
+                    f'{laji}: sama nimi on jo tunnisteella {osuma[1]}, '
+                    f'ohitetaan {laji.nelson_garden_id}'
+                )
+            else:
+                laji.pk = osuma[0]
+                muuttuneet.append(laji)
+        return jaljelle
+
+
+def synkronoi(lahde, **asetukset):
+    """Synkronoi syötteen ``lahde``; palauttaa ``Synkronointi``-olion."""
+    synkronointi = Synkronointi(**asetukset)
+    synkronointi.aja(lahde)
+    return synkronointi
@@ -1,199 +1,168 @@
-"""Lataa esimerkkikasvit tietokantaan."""
-from django.core.management.base import BaseCommand
-from garden.models import PlantSpecies
-
-
-KASVIT = [
-    {
-        'nelson_garden_id': '91706',
-        'nimi': 'Kirsikkatomaatti',
-        'lajike': 'Sungold F1',
-        'kategoria': 'Tomaatti',
-        'kuvaus': 'Testien mukaan maailman makein kirsikkatomaatti. Tuottaa runsaasti pieniä, oransseja ja meheviä hedelmiä.',
-        'kasvatusohje': 'Esikasvatus sisätiloissa ruukuissa helmikuusta alkaen. Istuta ulos kasvihuoneeseen tai lämpimälle paikalle toukokuussa.',
-        'kylvo_alku_kk': 2, 'kylvo_loppu_kk': 4,
-        'sato_alku_kk': 7, 'sato_loppu_kk': 9,
-        'itamisaika_min_pv': 5, 'itamisaika_max_pv': 15,
-        'korkeus_cm': 150, 'kasvupaikka': 'aurinko',
-        'siemenia_pakkauksessa': 7,
-    },
-    {
-        'nelson_garden_id': '91503',
-        'nimi': 'Tomaatti',
-        'lajike': 'Black Cherry',
-        'kategoria': 'Tomaatti',
-        'kuvaus': 'Tummanpunainen, lähes musta kirsikkatomaatti. Runsas ja makea sato.',
-        'kasvatusohje': 'Esikasvatus sisällä. Vaatii tuennan kasvaessaan.',
-        'kylvo_alku_kk': 2, 'kylvo_loppu_kk': 4,
-        'sato_alku_kk': 7, 'sato_loppu_kk': 9,
-        'itamisaika_min_pv': 7, 'itamisaika_max_pv': 14,
-        'korkeus_cm': 180, 'kasvupaikka': 'aurinko',
-        'siemenia_pakkauksessa': 8,
-    },
-    {
-        'nimi': 'Basilika',
-        'lajike': 'Genovese',
-        'kategoria': 'Yrtit',
-        'kuvaus': 'Klassinen italialainen basilika, tuuheakasvuinen ja aromaattinen.',
-        'kasvatusohje': 'Kylvä sisälle tai suoraan maahan toukokuun jälkeen. Nypitään kukkavarret pois.',
-        'kylvo_alku_kk': 3, 'kylvo_loppu_kk': 5,
-        'sato_alku_kk': 6, 'sato_loppu_kk': 9,
-        'itamisaika_min_pv': 5, 'itamisaika_max_pv': 10,
-        'korkeus_cm': 40, 'kasvupaikka': 'aurinko',
-        'siemenia_pakkauksessa': 600,
-    },
-    {
-        'nimi': 'Tilli',
-        'lajike': '',
-        'kategoria': 'Yrtit',
-        'kuvaus': 'Suosittu suomalainen yrtti kalalle ja perunoille. Helppokasvatteinen.',
-        'kasvatusohje': 'Kylvä suoraan maahan keväällä. Viihtyy aurinkoisella paikalla.',
-        'kylvo_alku_kk': 4, 'kylvo_loppu_kk': 6,
-        'sato_alku_kk': 6, 'sato_loppu_kk': 9,
-        'itamisaika_min_pv': 10, 'itamisaika_max_pv': 18,
-        'korkeus_cm': 60, 'kasvupaikka': 'aurinko',
-        'siemenia_pakkauksessa': 1000,
-    },
-    {
-        'nimi': 'Persilja',
-        'lajike': 'Moss Curled',
-        'kategoria': 'Yrtit',
-        'kuvaus': 'Kihara persilja, monipuolinen mausteyrtti.',
-        'kasvatusohje': 'Kylvä sisälle aikaisin keväällä tai suoraan maahan. Itää hitaasti.',
-        'kylvo_alku_kk': 3, 'kylvo_loppu_kk': 5,
-        'sato_alku_kk': 6, 'sato_loppu_kk': 10,
-        'itamisaika_min_pv': 14, 'itamisaika_max_pv': 28,
-        'korkeus_cm': 30, 'kasvupaikka': 'puolivarjo',
-        'siemenia_pakkauksessa': 800,
-    },
-    {
-        'nimi': 'Salaatti',
-        'lajike': 'Frillice',
-        'kategoria': 'Salaatti',
-        'kuvaus': 'Rapea ja kestävä jäävuorityyppinen salaatti, erinomainen parvekeviljelyyn.',
-        'kasvatusohje': 'Kylvä suoraan ruukkuun tai penkkiin. Viihtyy viileämmässäkin säässä.',
-        'kylvo_alku_kk': 4, 'kylvo_loppu_kk': 7,
-        'sato_alku_kk': 6, 'sato_loppu_kk': 9,
-        'itamisaika_min_pv': 5, 'itamisaika_max_pv': 10,
-        'korkeus_cm': 25, 'kasvupaikka': 'puolivarjo',
-        'siemenia_pakkauksessa': 500,
-    },
-    {
-        'nimi': 'Rucolasalaatti',
-        'lajike': '',
-        'kategoria': 'Salaatti',
-        'kuvaus': 'Pippurinen ja maukas salaattikasvi. Nopea kasvuinen.',
-        'kasvatusohje': 'Kylvä suoraan maahan tai ruukkuun. Kerää lehtiä sitä mukaa kun ne kasvavat.',
-        'kylvo_alku_kk': 4, 'kylvo_loppu_kk': 8,
-        'sato_alku_kk': 5, 'sato_loppu_kk': 10,
-        'itamisaika_min_pv': 3, 'itamisaika_max_pv': 7,
-        'korkeus_cm': 20, 'kasvupaikka': 'puolivarjo',
-        'siemenia_pakkauksessa': 700,
-    },
-    {
-        'nimi': 'Kurkku',
-        'lajike': 'Marketmore',
-        'kategoria': 'Vihannekset',
-        'kuvaus': 'Perinteinen avomaan kurkku. Tuottaa runsaasti tummia, rapeita kurkkuja.',
-        'kasvatusohje': 'Esikasvatus sisätiloissa huhtikuussa. Istuta ulos lämpimän sään alettua.',
-        'kylvo_alku_kk': 4, 'kylvo_loppu_kk': 5,
-        'sato_alku_kk': 7, 'sato_loppu_kk': 9,
-        'itamisaika_min_pv': 5, 'itamisaika_max_pv': 10,
-        'korkeus_cm': 200, 'kasvupaikka': 'aurinko',
-        'siemenia_pakkauksessa': 25,
-    },
-    {
-        'nimi': 'Kesäkurpitsa',
-        'lajike': 'Black Beauty',
-        'kategoria': 'Vihannekset',
-        'kuvaus': 'Klassinen tummanvihreä kesäkurpitsa eli zucchini. Erittäin satoisa.',
-        'kasvatusohje': 'Esikasvatus sisällä tai kylvö suoraan maahan kesäkuun alussa.',
-        'kylvo_alku_kk': 4, 'kylvo_loppu_kk': 6,
-        'sato_alku_kk': 7, 'sato_loppu_kk': 9,
-        'itamisaika_min_pv': 5, 'itamisaika_max_pv': 10,
-        'korkeus_cm': 60, 'kasvupaikka': 'aurinko',
-        'siemenia_pakkauksessa': 15,
-    },
-    {
-        'nimi': 'Porkkana',
-        'lajike': 'Nantes',
-        'kategoria': 'Juurekset',
-        'kuvaus': 'Makea ja rapea porkkana. Sopii hyvin Suomen oloihin.',
-        'kasvatusohje': 'Kylvä suoraan penkkiin keväällä. Vaatii kuohkean maan.',
-        'kylvo_alku_kk': 5, 'kylvo_loppu_kk': 6,
-        'sato_alku_kk': 8, 'sato_loppu_kk': 10,
-        'itamisaika_min_pv': 10, 'itamisaika_max_pv': 21,
-        'korkeus_cm': 30, 'kasvupaikka': 'aurinko',
-        'siemenia_pakkauksessa': 2000,
-    },
-    {
-        'nimi': 'Retiisi',
-        'lajike': 'Cherry Belle',
-        'kategoria': 'Juurekset',
-        'kuvaus': 'Nopea ja helppo juureksi. Valmis 3-4 viikossa kylvöstä.',
-        'kasvatusohje': 'Kylvä suoraan maahan tai ruukkuun. Pidä maa kosteana.',
-        'kylvo_alku_kk': 4, 'kylvo_loppu_kk': 8,
-        'sato_alku_kk': 5, 'sato_loppu_kk': 9,
-        'itamisaika_min_pv': 3, 'itamisaika_max_pv': 7,
-        'korkeus_cm': 15, 'kasvupaikka': 'aurinko',
-        'siemenia_pakkauksessa': 500,
-    },
-    {
-        'nimi': 'Chili',
-        'lajike': 'Jalapeño',
-        'kategoria': 'Chili',
-        'kuvaus': 'Keskivahva chili, sopii tulisiin ruokiin ja säilöntään. 2500-8000 SHU.',
-        'kasvatusohje': 'Aloita esikasvatus jo tammikuussa. Vaatii lämpöä ja valoa.',
-        'kylvo_alku_kk': 1, 'kylvo_loppu_kk': 3,
-        'sato_alku_kk': 7, 'sato_loppu_kk': 10,
-        'itamisaika_min_pv': 10, 'itamisaika_max_pv': 21,
-        'korkeus_cm': 70, 'kasvupaikka': 'aurinko',
-        'siemenia_pakkauksessa': 20,
-    },
-    {
-        'nimi': 'Mansikka',
-        'lajike': 'Alexandria',
-        'kategoria': 'Marjat',
-        'kuvaus': 'Ahomansikka, pienikokoinen mutta erittäin maukas. Sopii ruukkuviljelyyn.',
-        'kasvatusohje': 'Kylvä sisällä aikaisin keväällä. Siemenet tarvitsevat valoa itääkseen.',
-        'kylvo_alku_kk': 2, 'kylvo_loppu_kk': 4,
-        'sato_alku_kk': 7, 'sato_loppu_kk': 9,
-        'itamisaika_min_pv': 14, 'itamisaika_max_pv': 30,
-        'korkeus_cm': 20, 'kasvupaikka': 'aurinko',
-        'siemenia_pakkauksessa': 100,
-    },
-    {
-        'nimi': 'Herne',
-        'lajike': 'Kelvedon Wonder',
-        'kategoria': 'Palkokasvit',
-        'kuvaus': 'Perinteinen puutarhaherne, makea ja rapea. Matalakasvuinen.',
-        'kasvatusohje': 'Kylvä suoraan maahan toukokuussa. Tarvitsee tukiverkon.',
-        'kylvo_alku_kk': 5, 'kylvo_loppu_kk': 6,
-        'sato_alku_kk': 7, 'sato_loppu_kk': 8,
-        'itamisaika_min_pv': 7, 'itamisaika_max_pv': 14,
-        'korkeus_cm': 50, 'kasvupaikka': 'aurinko',
-        'siemenia_pakkauksessa': 75,
-    },
-]
+"""Lataa kasvilajit tietokantaan esimerkeistä tai CSV/JSONL-tiedostoista."""
+import csv
+import json
+import time
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from garden.esimerkkikasvit import KASVIT
+from garden.models import MyGarden, PlantSpecies
+from garden.tuonti import AVAINKENTAT, paivitettavat, rakenna_laji
+from garden.tyot import lisaa_jonoon
+
+
+def lue_csv(tiedosto):
+    """Lukee CSV-rivit sanakirjoina (otsikkorivi = kenttien nimet)."""
+    yield from csv.DictReader(tiedosto)
+
+
+def lue_jsonl(tiedosto):
+    """Lukee JSONL-rivit; tyhjät rivit ohitetaan."""
+    for rivinro, rivi in enumerate(tiedosto, start=1):
+        if not rivi.strip():
+            continue
+        try:
+            yield json.loads(rivi)
+        except ValueError as e:
+            raise CommandError(f'Virheellinen JSON rivillä {rivinro}: {e}')
+
+
+LUKIJAT = {'.csv': lue_csv, '.jsonl': lue_jsonl, '.ndjson': lue_jsonl}
 
 
 class Command(BaseCommand):
-    help = 'Lataa esimerkkikasvit tietokantaan'
+    help = (
+        'Lataa kasvilajit tietokantaan. Ilman tiedostoja ladataan esimerkkikasvit, '
+        'muuten CSV- tai JSONL-tiedostot luetaan virtana ja päivitetään erissä.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tiedostot', nargs='*',
+            help='CSV- tai JSONL-tiedostot (.csv, .jsonl, .ndjson)',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Rivejä per tietokantaerä ja transaktio (oletus 2000)',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Validoi rivit kirjoittamatta tietokantaan',
+        )
+        parser.add_argument(
+            '--taustalla', action='store_true',
+            help='Lisää tuonti taustajonoon (manage.py tyojono) ja palaa heti',
+        )
 
     def handle(self, *args, **options):
-        created_count = 0
-        for data in KASVIT:
-            obj, created = PlantSpecies.objects.get_or_create(
-                nimi=data['nimi'],
-                lajike=data.get('lajike', ''),
-                defaults=data,
+        self.batch_size = options['batch_size']
+        self.dry_run = options['dry_run']
+        if self.batch_size < 1:
+            raise CommandError('--batch-size pitää olla vähintään 1.')
+
+        if options['taustalla']:
+            tyo = lisaa_jonoon(
+                'lataa_kasvit',
+                tiedostot=[str(Path(polku).resolve()) for polku in options['tiedostot']],
+                batch_size=self.batch_size, dry_run=self.dry_run,
             )
-            if created:
-                created_count += 1
-                self.stdout.write(self.style.SUCCESS(f'  ✅ {obj}'))
-            else:
-                self.stdout.write(f'  ⏭️  {obj} (oli jo)')
+            self.stdout.write(self.style.SUCCESS(f'Tuonti lisätty jonoon: työ #{tyo.pk}.'))
+            return
 
+        if not options['tiedostot']:
+            self.tuo(iter(KASVIT), 'esimerkkikasvit')
+        else:
+            for polku in options['tiedostot']:
+                lukija = LUKIJAT.get(Path(polku).suffix.lower())
+                if lukija is None:
+                    raise CommandError(f'Tuntematon tiedostomuoto: {polku}')
+                try:
+                    with open(polku, encoding='utf-8-sig', newline='') as tiedosto:
+                        self.tuo(lukija(tiedosto), polku)
+                except OSError as e:
+                    raise CommandError(f'Tiedostoa ei voi lukea: {e}')
+
+        if not self.dry_run:
+            # Upsert ohittaa save()n: lajien kasvuajat ovat voineet muuttua
+            paivitetty = MyGarden.objects.exclude(kylvopaiva=None).paivita_satoarviot()
+            self.stdout.write(f'Satoarviot päivitetty {paivitetty} viljelylle.')
+
+    def tuo(self, rivit, lahde):
+        """Validoi ja tallentaa rivit erissä, raportoi edistymisen."""
+        alku = time.monotonic()
+        kasitelty = virheita = 0
+        era = {}
+        for rivinro, data in enumerate(rivit, start=1):
+            try:
+                laji = rakenna_laji(data)
+            except ValidationError as e:
+                virheita += 1
+                self.stderr.write(f'  {lahde}, rivi {rivinro}: {"; ".join(e.messages)}')
+                continue
+            # Sama (nimi, lajike) samassa erässä: viimeinen rivi voittaa
+            era[(laji.nimi, laji.lajike)] = (rivinro, laji, frozenset(data))
+            if len(era) >= self.batch_size:
+                tallennettu, hylatty = self.tallenna(era, lahde)
+                kasitelty += tallennettu
+                virheita += hylatty
+                era = {}
+                self.raportoi(lahde, kasitelty, alku)
+        tallennettu, hylatty = self.tallenna(era, lahde)
+        kasitelty += tallennettu
+        virheita += hylatty
+
+        kesto = time.monotonic() - alku
+        tila = ' (kuivaharjoitus, ei tallennettu)' if self.dry_run else ''
         self.stdout.write(self.style.SUCCESS(
-            f'\nValmis! Lisätty {created_count} uutta kasvilajia.'
+            f'Valmis: {lahde}: {kasitelty} kasvilajia, {virheita} virheellistä riviä, '
+            f'{kesto:.2f} s ({kasitelty / kesto if kesto else 0:.0f} riviä/s){tila}'
         ))
+
+    def tallenna(self, era, lahde):
+        """Upserttaa erän; palauttaa (tallennetut, hylätyt).
+
+        Olemassa olevalle lajille kirjoitetaan vain rivillä olleet
+        sarakkeet, joten erä jaetaan sarakejoukon mukaan.
+        """
+        if not era or self.dry_run:
+            return len(era), 0
+        ryhmat = {}
+        for rivinro, laji, kentat in era.values():
+            ryhmat.setdefault(kentat, []).append((rivinro, laji))
+        tallennettu = hylatty = 0
+        for kentat, rivit in ryhmat.items():
+            try:
+                self.upsert([laji for _, laji in rivit], kentat)
+                tallennettu += len(rivit)
+                continue
+            except IntegrityError:
+                pass
+            # Erässä on muuhun lajiin törmäävä rivi (esim. sama nelson_garden_id):
+            # haetaan se rivi kerrallaan ja raportoidaan kuten muut virheet
+            for rivinro, laji in rivit:
+                try:
+                    self.upsert([laji], kentat)
+                    tallennettu += 1
+                except IntegrityError as e:
+                    hylatty += 1
+                    self.stderr.write(
+                        f'  {lahde}, rivi {rivinro}: arvo on jo toisella kasvilajilla ({e})'
+                    )
+        return tallennettu, hylatty
+
+    def upsert(self, lajit, kentat):
+        with transaction.atomic():
+            PlantSpecies.objects.bulk_create(
+                lajit,
+                update_conflicts=True,
+                unique_fields=AVAINKENTAT,
+                update_fields=paivitettavat(kentat),
+            )
+
+    def raportoi(self, lahde, kasitelty, alku):
+        kesto = time.monotonic() - alku
+        self.stdout.write(
+            f'  {lahde}: {kasitelty} riviä, {kasitelty / kesto if kesto else 0:.0f} riviä/s'
+        )
@@ -0,0 +1,156 @@
+"""Mittaa SQLite-profiilien kestävyyttä rinnakkaisilla kirjoittajilla.
+
+Jokaiselle profiilille (asetusmoduulille) luodaan oma väliaikainen
+tietokanta, johon käynnistetään ``--tyontekijat`` erillistä prosessia
+kuten WSGI-palvelimen workerit. Jokainen prosessi lähettää sekakuormaa
+(viljelysivun lukuja, tilan vaihtoja ja havaintojen lisäyksiä) ja raportoi
+läpäisyn, viiveet ja "database is locked" -virheet.
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from garden.models import MyGarden
+
+PROFIILIT = {
+    'kehitys': 'gardenlog.settings',
+    'tuotanto': 'gardenlog.settings_tuotanto',
+}
+
+# Kuorman osuudet: luku, tilan vaihto, havainnon lisäys
+KUORMA = [('lue', 0.5), ('tila', 0.25), ('havainto', 0.25)]
+
+
+def _persentiili(arvot, p):
+    if not arvot:
+        return 0.0
+    arvot = sorted(arvot)
+    return arvot[min(len(arvot) - 1, int(len(arvot) * p))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Vertaa SQLite-profiilien (kehitys/tuotanto) läpäisyä ja lukitusvirheitä '
+        'rinnakkaisilla worker-prosesseilla'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tyontekijat', type=int, default=8,
+                            help='Rinnakkaisia worker-prosesseja (oletus 8)')
+        parser.add_argument('--toistot', type=int, default=200,
+                            help='Pyyntöjä per worker (oletus 200)')
+        parser.add_argument('--profiilit', default='kehitys,tuotanto',
+                            help='Pilkuilla eroteltu lista: ' + ', '.join(PROFIILIT))
+        # Sisäinen: ajetaan yksittäisenä worker-prosessina
+        parser.add_argument('--tyontekija', type=int, help='(sisäinen)')
+
+    def handle(self, *args, **options):
+        if options['tyontekija'] is not None:
+            self.aja_tyontekija(options['tyontekija'], options['toistot'])
+            return
+
+        profiilit = [p.strip() for p in options['profiilit'].split(',') if p.strip()]
+        tuntemattomat = set(profiilit) - set(PROFIILIT)
+        if tuntemattomat:
+            raise CommandError(f"Tuntematon profiili: {', '.join(sorted(tuntemattomat))}")
+
+        self.stdout.write(
+            f"{'profiili':<10}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+            f"{'lukittu':>9}{'muut':>7}"
+        )
+        for profiili in profiilit:
+            tulos = self.mittaa(PROFIILIT[profiili], options['tyontekijat'], options['toistot'])
+            self.stdout.write(
+                f"{profiili:<10}{tulos['req_s']:>9.1f}{tulos['p50']:>9.1f}"
+                f"{tulos['p95']:>9.1f}{tulos['lukittu']:>9}{tulos['muut']:>7}"
+            )
+
+    def mittaa(self, moduuli, tyontekijat, toistot):
+        with tempfile.TemporaryDirectory() as hakemisto:
+            ymparisto = {
+                **os.environ,
+                'DJANGO_SETTINGS_MODULE': moduuli,
+                'GARDENLOG_DB': str(Path(hakemisto) / 'kilpailu.sqlite3'),
+                'GARDENLOG_STATIC_ROOT': str(Path(hakemisto) / 'static'),
+                'DJANGO_SECRET_KEY': 'mittaa-kilpailu',
+                'DJANGO_ALLOWED_HOSTS': 'testserver',
+            }
+            manage = [sys.executable, str(Path(settings.BASE_DIR) / 'manage.py')]
+            for komento in (['migrate', '-v0'], ['collectstatic', '--noinput', '-v0'],
+                            ['siemenna', '--lajit', '50', '--viljelyt', '200',
+                             '--havainnot', '2000']):
+                subprocess.run(manage + komento, env=ymparisto, check=True,
+                               stdout=subprocess.DEVNULL)
+
+            alku = time.perf_counter()
+            prosessit = [
+                subprocess.Popen(
+                    manage + ['mittaa_kilpailu', '--tyontekija', str(i),
+                              '--toistot', str(toistot)],
+                    env=ymparisto, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                    text=True,
+                )
+                for i in range(tyontekijat)
+            ]
+            tulokset = [json.loads(p.communicate()[0]) for p in prosessit]
+            kesto = time.perf_counter() - alku
+
+        viiveet = [v for t in tulokset for v in t['viiveet']]
+        return {
+            'req_s': len(viiveet) / kesto,
+            'p50': _persentiili(viiveet, 0.5),
+            'p95': _persentiili(viiveet, 0.95),
+            'lukittu': sum(t['lukittu'] for t in tulokset),
+            'muut': sum(t['muut'] for t in tulokset),
+        }
+
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def aja_tyontekija(self, numero, toistot):
+        """Ajaa sekakuorman ja tulostaa tuloksen JSONina."""
+        satunnainen = random.Random(numero)
+        viljely_idt = list(MyGarden.objects.values_list('pk', flat=True))
+        tilat = [tila for tila, _ in MyGarden.TILA_CHOICES if tila != 'paattynyt']
+        toiminnot, painot = zip(*KUORMA)
+        client = Client()
+        viiveet, lukittu, muut = [], 0, 0
+        for _ in range(toistot):
+            toiminto = satunnainen.choices(toiminnot, painot)[0]
+            pk = satunnainen.choice(viljely_idt)
+            alku = time.perf_counter()
+            try:
+                if toiminto == 'lue':
+                    response = client.get(reverse('viljely_detail', args=[pk]))
+                elif toiminto == 'tila':
+                    response = client.post(
+                        reverse('vaihda_tila', args=[pk]),
+                        {'tila': satunnainen.choice(tilat)},
+                        HTTP_X_REQUESTED_WITH='fetch',
+                    )
+                else:
+                    response = client.post(reverse('viljely_detail', args=[pk]), {
+                        'lisaa_havainto': '1', 'paivamaara': '2026-05-01',
+                        'havainto': f'Worker {numero}',
+                    })
+                if response.status_code >= 400:
+                    muut += 1
+                    continue
+            except OperationalError as e:
+                if 'locked' in str(e):
+                    lukittu += 1
+                else:
+                    muut += 1
+                continue
+            viiveet.append((time.perf_counter() - alku) * 1000)
+        self.stdout.write(json.dumps({'viiveet': viiveet, 'lukittu': lukittu, 'muut': muut}))
@@ -0,0 +1,147 @@
+"""Mittaa näkymien skaalautumista datamäärän kasvaessa."""
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from garden.middleware import KyselySeuranta
+from garden.models import MyGarden, PlantSpecies
+from garden.siemennys import siemenna
+
+OLETUSSKAALAT = '100:100:1000,1000:1000:10000,5000:5000:50000'
+
+
+def _nakymat(viljely_id):
+    """Mitattavat sivut: nimi -> (polku, GET-parametrit)."""
+    return {
+        'etusivu': (reverse('etusivu'), {}),
+        'kasvilista': (reverse('kasvilista'), {}),
+        'kasvilista_kylvo': (reverse('kasvilista'), {'kylvo': 4}),
+        'viljely_detail': (reverse('viljely_detail', args=[viljely_id]), {}),
+    }
+
+
+def _jasenna_skaalat(teksti):
+    try:
+        return [
+            tuple(int(osa) for osa in skaala.split(':'))
+            for skaala in teksti.split(',')
+        ]
+    except ValueError:
+        raise CommandError('Skaalat muodossa lajit:viljelyt:havainnot,...')
+
+
+class Command(BaseCommand):
+    help = (
+        'Ajaa etusivun, kasvilistan ja viljelyn sivun eri datamäärillä '
+        'erillisessä testitietokannassa ja tallentaa ajat, kyselymäärät '
+        'ja muistihuiput JSON-tiedostoon'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--skaalat', default=OLETUSSKAALAT,
+            help=f'lajit:viljelyt:havainnot pilkuilla eroteltuna (oletus {OLETUSSKAALAT})',
+        )
+        parser.add_argument('--toistot', type=int, default=10)
+        parser.add_argument('--tulos', default='bench_output.json',
+                            help='Tulostiedosto (oletus bench_output.json)')
+        parser.add_argument('--perustaso', help='Aiempi tulostiedosto vertailuun')
+        parser.add_argument(
+            '--kynnys', type=float, default=0.25,
+            help='Sallittu suhteellinen hidastuminen perustasoon nähden (oletus 0.25)',
+        )
+
+    def handle(self, *args, **options):
+        skaalat = _jasenna_skaalat(options['skaalat'])
+        vanha_nimi = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                tulokset = {
+                    f'{lajit}:{viljelyt}:{havainnot}': self.mittaa_skaala(
+                        lajit, viljelyt, havainnot, options['toistot'],
+                    )
+                    for lajit, viljelyt, havainnot in skaalat
+                }
+        finally:
+            connection.creation.destroy_test_db(vanha_nimi, verbosity=0)
+
+        with open(options['tulos'], 'w', encoding='utf-8') as tiedosto:
+            json.dump(tulokset, tiedosto, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f"Tulokset tallennettu: {options['tulos']}"))
+
+        if options['perustaso']:
+            self.vertaa(tulokset, options['perustaso'], options['kynnys'])
+
+    def mittaa_skaala(self, lajit, viljelyt, havainnot, toistot):
+        PlantSpecies.objects.all().delete()
+        siemenna(lajit, viljelyt, havainnot)
+        # Eniten havaintoja saanut viljely on ensimmäinen (tasajako)
+        viljely_id = MyGarden.objects.order_by('pk').values_list('pk', flat=True).first()
+        client = Client()
+        tulokset = {}
+        for nimi, (polku, parametrit) in _nakymat(viljely_id).items():
+            client.get(polku, parametrit)  # lämmittely
+            ajat = []
+            for _ in range(toistot):
+                # Yhteys suljetaan pyyntöjen välissä, joten kyselyt lasketaan
+                # execute_wrapperilla eikä connection.queries-lokista
+                kyselyt = KyselySeuranta()
+                with connection.execute_wrapper(kyselyt):
+                    alku = time.perf_counter()
+                    response = client.get(polku, parametrit)
+                    ajat.append(time.perf_counter() - alku)
+                if response.status_code != 200:
+                    raise CommandError(f'{nimi}: HTTP {response.status_code}')
+            tracemalloc.start()
+            client.get(polku, parametrit)
+            _, huippu = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            tulokset[nimi] = {
+                'aika_ms': round(statistics.median(ajat) * 1000, 2),
+                'kyselyt': kyselyt.maara,
+                'muisti_kt': round(huippu / 1024, 1),
+                'koko_kt': round(len(response.content) / 1024, 1),
+            }
+            self.stdout.write(
+                f'{lajit}:{viljelyt}:{havainnot} {nimi:<18} '
+                f"{tulokset[nimi]['aika_ms']:>8.2f} ms {tulokset[nimi]['kyselyt']:>3} kyselyä "
+                f"{tulokset[nimi]['muisti_kt']:>9.1f} kt"
+            )
+        return tulokset
+
+    def vertaa(self, tulokset, polku, kynnys):
+        try:
+            with open(polku, encoding='utf-8') as tiedosto:
+                perustaso = json.load(tiedosto)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Perustasoa ei voi lukea: {e}')
+
+        ylitykset = []
+        for skaala, nakymat in tulokset.items():
+            for nimi, tulos in nakymat.items():
+                vanha = perustaso.get(skaala, {}).get(nimi)
+                if vanha is None:
+                    continue
+                if tulos['aika_ms'] > vanha['aika_ms'] * (1 + kynnys):
+                    ylitykset.append(
+                        f"{skaala} {nimi}: {tulos['aika_ms']} ms > {vanha['aika_ms']} ms"
+                    )
+                if tulos['kyselyt'] > vanha['kyselyt']:
+                    ylitykset.append(
+                        f"{skaala} {nimi}: {tulos['kyselyt']} kyselyä > {vanha['kyselyt']}"
+                    )
+                if tulos['muisti_kt'] > vanha['muisti_kt'] * (1 + kynnys):
+                    ylitykset.append(
+                        f"{skaala} {nimi}: {tulos['muisti_kt']} kt > {vanha['muisti_kt']} kt"
+                    )
+        if ylitykset:
+            raise CommandError('Perustaso ylittyi:\n  ' + '\n  '.join(ylitykset))
+        self.stdout.write(self.style.SUCCESS('Perustaso alittui kaikissa mittauksissa.'))
@@ -0,0 +1,14 @@
+"""Rakentaa kokotekstihaun FTS5-indeksit uudelleen."""
+from django.core.management.base import BaseCommand
+
+from garden.haku import INDEKSIT, rakenna_indeksit
+
+
+class Command(BaseCommand):
+    help = 'Rakentaa kasvilajien ja havaintojen hakuindeksit alusta'
+
+    def handle(self, *args, **options):
+        rakenna_indeksit()
+        self.stdout.write(self.style.SUCCESS(
+            f"Valmis! Rakennettu {len(INDEKSIT)} hakuindeksiä."
+        ))
@@ -0,0 +1,15 @@
+"""Laskee mittausten päivä-, viikko- ja kausikoosteet uudelleen."""
+from django.core.management.base import BaseCommand
+
+from garden.mittaukset import rakenna_koosteet
+
+
+class Command(BaseCommand):
+    help = (
+        'Laskee mittauskoosteet raakamittauksista uudelleen. Triggerit pitävät '
+        'koosteet ajan tasalla; komento on korjaukseen ja tuontien jälkeen.'
+    )
+
+    def handle(self, *args, **options):
+        maara = rakenna_koosteet()
+        self.stdout.write(self.style.SUCCESS(f'Valmis: {maara} koosteriviä.'))
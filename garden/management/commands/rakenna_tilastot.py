@@ -0,0 +1,15 @@
+"""Laskee tilastosivun yhteenvetotaulun uudelleen."""
+from django.core.management.base import BaseCommand
+
+from garden.tilastot import rakenna_tilastot
+
+
+class Command(BaseCommand):
+    help = (
+        'Laskee viljelytilastot viljelyistä uudelleen. Triggerit pitävät '
+        'tilastot ajan tasalla; komento on korjaukseen ja tuontien jälkeen.'
+    )
+
+    def handle(self, *args, **options):
+        maara = rakenna_tilastot()
+        self.stdout.write(self.style.SUCCESS(f'Valmis: {maara} tilastoriviä.'))
@@ -0,0 +1,39 @@
+"""Luo deterministisen testiaineiston suorituskykymittauksia varten."""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from garden.models import PlantSpecies
+from garden.siemennys import siemenna
+
+
+class Command(BaseCommand):
+    help = 'Luo N kasvilajia, M viljelyä ja K havaintoa (sama siemen = sama data)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lajit', type=int, default=1000)
+        parser.add_argument('--viljelyt', type=int, default=1000)
+        parser.add_argument('--havainnot', type=int, default=10000)
+        parser.add_argument('--siemen', type=int, default=0)
+        parser.add_argument(
+            '--tyhjenna', action='store_true',
+            help='Poista olemassa olevat kasvilajit, viljelyt ja havainnot ensin',
+        )
+
+    def handle(self, *args, **options):
+        alku = time.monotonic()
+        with transaction.atomic():
+            if options['tyhjenna']:
+                PlantSpecies.objects.all().delete()
+            elif PlantSpecies.objects.exists():
+                # Lajien nimet toistuvat ajosta toiseen ja (nimi, lajike) on uniikki
+                raise CommandError('Tietokannassa on jo kasvilajeja; käytä --tyhjenna.')
+            siemenna(
+                options['lajit'], options['viljelyt'], options['havainnot'],
+                siemen=options['siemen'],
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Valmis! Luotu {options['lajit']} kasvilajia, {options['viljelyt']} viljelyä "
+            f"ja {options['havainnot']} havaintoa ({time.monotonic() - alku:.1f} s)."
+        ))
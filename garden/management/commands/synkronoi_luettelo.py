@@ -0,0 +1,63 @@
+"""Synkronoi kasvilajit Nelson Gardenin tuotesyötteestä."""
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from garden.luettelo import AIKAKATKAISU, ERAKOKO, SAIKEET, SyoteVirhe, on_url, synkronoi
+from garden.tyot import lisaa_jonoon
+
+
+class Command(BaseCommand):
+    help = (
+        'Synkronoi kasvilajit tuotesyötteestä (tiedosto tai HTTP-osoite). Vain '
+        'uudet ja muuttuneet tuotteet kirjoitetaan; sivut haetaan rinnakkain.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('lahde', help='Syötteen polku tai http(s)-osoite')
+        parser.add_argument('--saikeet', type=int, default=SAIKEET,
+                            help=f'Rinnakkaisia sivuhakuja (oletus {SAIKEET})')
+        parser.add_argument('--batch-size', type=int, default=ERAKOKO,
+                            help=f'Tuotteita per tietokantaerä (oletus {ERAKOKO})')
+        parser.add_argument('--aikakatkaisu', type=float, default=AIKAKATKAISU,
+                            help=f'HTTP-haun aikakatkaisu sekunteina (oletus {AIKAKATKAISU})')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Raportoi muutokset kirjoittamatta tietokantaan')
+        parser.add_argument('--taustalla', action='store_true',
+                            help='Lisää synkronointi taustajonoon (manage.py tyojono)')
+
+    def handle(self, *args, **options):
+        if options['saikeet'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--saikeet ja --batch-size pitää olla vähintään 1.')
+        asetukset = {
+            'saikeet': options['saikeet'],
+            'erakoko': options['batch_size'],
+            'aikakatkaisu': options['aikakatkaisu'],
+            'kuivaharjoitus': options['dry_run'],
+        }
+        if options['taustalla']:
+            lahde = options['lahde']
+            if not on_url(lahde):
+                lahde = str(Path(lahde).resolve())
+            tyo = lisaa_jonoon('synkronoi_luettelo', lahde=lahde, **asetukset)
+            self.stdout.write(self.style.SUCCESS(f'Synkronointi lisätty jonoon: työ #{tyo.pk}.'))
+            return
+
+        alku = time.monotonic()
+        try:
+            synkronointi = synkronoi(
+                options['lahde'], raportoi=lambda viesti: self.stdout.write(f'  {viesti}'),
+                **asetukset,
+            )
+        except SyoteVirhe as e:
+            raise CommandError(str(e))
+        for virhe in synkronointi.virheet[:20]:
+            self.stderr.write(f'  {virhe}')
+        t = synkronointi.tilasto
+        tila = ' (kuivaharjoitus, ei tallennettu)' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"Valmis: {t['tuotteita']} tuotetta {t['sivuja']} sivulta: {t['uusia']} uutta, "
+            f"{t['muuttuneita']} muuttunutta, {t['ennallaan']} ennallaan, "
+            f"{t['virheita']} virhettä, {time.monotonic() - alku:.2f} s{tila}"
+        ))
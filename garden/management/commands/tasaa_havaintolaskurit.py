@@ -0,0 +1,47 @@
+"""Korjaa viljelyjen havaintolaskurit vastaamaan havaintoja."""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max
+
+from garden.models import GardenNote, MyGarden
+
+ERAKOKO = 500
+
+
+class Command(BaseCommand):
+    help = 'Vertaa viljelyjen havaintolaskureita havaintoihin ja korjaa erot'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Raportoi erot muuttamatta tietokantaa',
+        )
+
+    def handle(self, *args, **options):
+        todelliset = {
+            rivi['kasvi']: (rivi['n'], rivi['m'])
+            for rivi in GardenNote.objects.order_by().values('kasvi')
+            .annotate(n=Count('pk'), m=Max('paivamaara'))
+        }
+        poikkeavat = [
+            pk for pk, havaintoja, viimeisin in MyGarden.objects.order_by('pk')
+            .values_list('pk', 'havaintoja', 'viimeisin_havainto').iterator()
+            if todelliset.get(pk, (0, None)) != (havaintoja, viimeisin)
+        ]
+        for pk in poikkeavat[:20]:
+            n, m = todelliset.get(pk, (0, None))
+            self.stdout.write(f"  Viljely {pk}: oikea määrä {n}, viimeisin {m or '-'}")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f"Kuivaharjoitus: {len(poikkeavat)} viljelyn laskurit poikkeavat."
+            ))
+            return
+        with transaction.atomic():
+            for alku in range(0, len(poikkeavat), ERAKOKO):
+                MyGarden.objects.filter(
+                    pk__in=poikkeavat[alku:alku + ERAKOKO]
+                ).tasaa_havaintolaskurit()
+        self.stdout.write(self.style.SUCCESS(
+            f"Valmis! Korjattu {len(poikkeavat)} viljelyn havaintolaskurit."
+        ))
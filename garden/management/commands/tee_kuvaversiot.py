@@ -0,0 +1,31 @@
+"""Tekee havaintokuvien pienennetyt versiot."""
+from django.core.management.base import BaseCommand
+
+from garden.models import Kuva
+from garden.tehtavat import tee_kuvaversiot
+from garden.tyot import lisaa_jonoon
+
+
+class Command(BaseCommand):
+    help = (
+        'Tekee käsittelemättömien havaintokuvien pienennetyt versiot. Uusille '
+        'kuville ne tekee taustatyö automaattisesti; komento on paikkaukseen '
+        'ja kokojen muuttamiseen.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kaikki', action='store_true',
+                            help='Tee versiot uudelleen kaikille kuville')
+        parser.add_argument('--taustalla', action='store_true',
+                            help='Lisää työ taustajonoon (manage.py tyojono)')
+
+    def handle(self, *args, **options):
+        if options['taustalla']:
+            tyo = lisaa_jonoon('tee_kuvaversiot', kaikki=options['kaikki'])
+            self.stdout.write(self.style.SUCCESS(f'Kuvaversiot lisätty jonoon: työ #{tyo.pk}.'))
+            return
+        tilat = tee_kuvaversiot(lambda *args, **kwargs: None, kaikki=options['kaikki'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Valmis: {tilat.get(Kuva.VALMIS, 0)} kuvaa käsitelty, '
+            f'{tilat.get(Kuva.VIRHEELLINEN, 0)} virheellistä.'
+        ))
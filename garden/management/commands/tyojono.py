@@ -0,0 +1,113 @@
+"""Ajaa tietokantajonon taustatöitä prosessi- tai säiepoolissa."""
+import time
+import traceback
+from concurrent.futures import (
+    FIRST_COMPLETED, BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor, wait,
+)
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from garden import tyot
+from garden.models import Tyo
+
+
+def _alusta_prosessi():
+    # spawn-käynnistyksessä lapsiprosessi aloittaa tyhjästä
+    django.setup()
+
+
+def _prosessipooli(koko):
+    pooli = ProcessPoolExecutor(koko, initializer=_alusta_prosessi)
+    # Käynnistää lapsiprosessit heti, kun tietokantayhteyksiä ei ole auki:
+    # forkattu prosessi ei saa periä avointa SQLite-yhteyttä
+    pooli.submit(int).result()
+    return pooli
+
+
+POOLIT = {
+    'prosessi': _prosessipooli,
+    'saie': ThreadPoolExecutor,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Varaa jonossa olevia taustatöitä ja ajaa ne rinnakkain. Jono on '
+        'tietokannassa, joten erillistä välittäjää ei tarvita.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rinnakkaisuus', type=int, default=2,
+                            help='Yhtä aikaa ajettavia töitä (oletus 2)')
+        parser.add_argument('--pooli', choices=sorted(POOLIT), default='prosessi',
+                            help='Ajetaanko työt prosesseissa vai säikeissä (oletus prosessi)')
+        parser.add_argument('--odotus', type=float, default=1.0,
+                            help='Jonon tarkistusväli sekunteina, kun töitä ei ole (oletus 1)')
+        parser.add_argument('--kerran', action='store_true',
+                            help='Aja ajettavissa olevat työt ja lopeta, kun jono on tyhjä')
+
+    def handle(self, *args, **options):
+        rinnakkaisuus = options['rinnakkaisuus']
+        if rinnakkaisuus < 1:
+            raise CommandError('--rinnakkaisuus pitää olla vähintään 1.')
+        nimi = tyot.tyontekijan_nimi()
+        connections.close_all()
+        with POOLIT[options['pooli']](rinnakkaisuus) as pooli:
+            try:
+                onnistui, epaonnistui = self.aja(
+                    pooli, nimi, rinnakkaisuus, options['odotus'], options['kerran'],
+                )
+            except KeyboardInterrupt:
+                self.stdout.write('Keskeytetty; odotetaan käynnissä olevia töitä...')
+                return
+        self.stdout.write(self.style.SUCCESS(
+            f'Valmis: {onnistui} työtä onnistui, {epaonnistui} epäonnistui.'
+        ))
+
+    def aja(self, pooli, nimi, rinnakkaisuus, odotus, kerran):
+        kaynnissa = {}
+        onnistui = epaonnistui = 0
+        while True:
+            tyot.palauta_jumittuneet()
+            while len(kaynnissa) < rinnakkaisuus:
+                pk = tyot.varaa_seuraava(nimi)
+                if pk is None:
+                    break
+                self.stdout.write(f'  Aloitetaan työ #{pk}')
+                kaynnissa[pooli.submit(tyot.suorita, pk)] = pk
+
+            if not kaynnissa:
+                if kerran:
+                    return onnistui, epaonnistui
+                time.sleep(odotus)
+                continue
+
+            valmiit, _ = wait(kaynnissa, timeout=odotus, return_when=FIRST_COMPLETED)
+            pooli_kaatui = False
+            for tulos in valmiit:
+                pk = kaynnissa.pop(tulos)
+                try:
+                    valmis = tulos.result()
+                except Exception as e:
+                    # Pooli kaatui tai suorita ei saanut tallennettua tulosta;
+                    # työ ei saa jäädä käynnissä-tilaan
+                    tyot.kirjaa_virhe(Tyo.objects.get(pk=pk), traceback.format_exc())
+                    pooli_kaatui |= isinstance(e, BrokenExecutor)
+                    valmis = False
+                if valmis:
+                    onnistui += 1
+                    self.stdout.write(f'  Työ #{pk} valmis')
+                else:
+                    epaonnistui += 1
+                    self.stdout.write(self.style.WARNING(f'  Työ #{pk} epäonnistui'))
+            if pooli_kaatui:
+                # Rikkinäiseen pooliin ei voi lähettää töitä; loput palautetaan
+                # jonoon ja työntekijä käynnistetään uudelleen
+                for pk in kaynnissa.values():
+                    tyot.kirjaa_virhe(Tyo.objects.get(pk=pk), 'Työpooli kaatui.')
+                raise CommandError(
+                    f'Työpooli kaatui; {onnistui} työtä onnistui, {epaonnistui} epäonnistui.'
+                )
+            tyot.pidetaan_elossa(list(kaynnissa.values()))
@@ -0,0 +1,106 @@
+"""Vertaa synkronisten ja asynkronisten näkymien läpäisyä ASGI:n alla."""
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from garden.models import MyGarden
+
+
+async def _pyynto(sovellus, polku):
+    """Ajaa yhden GET-pyynnön suoraan ASGI-sovellukselle."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': polku,
+        'raw_path': polku.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    runko_luettu = False
+    katkaisu = asyncio.Event()
+    status = None
+
+    async def receive():
+        nonlocal runko_luettu
+        if not runko_luettu:
+            runko_luettu = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await katkaisu.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(viesti):
+        nonlocal status
+        if viesti['type'] == 'http.response.start':
+            status = viesti['status']
+
+    await sovellus(scope, receive, send)
+    return status
+
+
+async def _kuormita(sovellus, polku, pyynnot, rinnakkaisuus):
+    jono = iter(range(pyynnot))
+    virheet = []
+
+    async def tyontekija():
+        for _ in jono:
+            status = await _pyynto(sovellus, polku)
+            if status != 200:
+                virheet.append(status)
+
+    alku = time.perf_counter()
+    await asyncio.gather(*(tyontekija() for _ in range(rinnakkaisuus)))
+    kesto = time.perf_counter() - alku
+    if virheet:
+        raise CommandError(f'{polku}: {len(virheet)} epäonnistunutta pyyntöä ({virheet[0]})')
+    return pyynnot / kesto
+
+
+class Command(BaseCommand):
+    help = (
+        'Mittaa samojen sivujen synkronisen ja asynkronisen version '
+        'läpäisyn (pyyntöä/s) gardenlog.asgi-sovelluksella'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pyynnot', type=int, default=200,
+                            help='Pyyntöjä per sivu (oletus 200)')
+        parser.add_argument('--rinnakkaisuus', type=int, default=20,
+                            help='Samanaikaisia pyyntöjä (oletus 20)')
+
+    def handle(self, *args, **options):
+        from gardenlog.asgi import application
+
+        sivut = [
+            ('etusivu', reverse('etusivu'), reverse('async_etusivu')),
+            ('kasvilista', reverse('kasvilista'), reverse('async_kasvilista')),
+        ]
+        viljely = MyGarden.objects.order_by('pk').first()
+        if viljely:
+            sivut.append((
+                'viljely_detail',
+                reverse('viljely_detail', args=[viljely.pk]),
+                reverse('async_viljely_detail', args=[viljely.pk]),
+            ))
+
+        self.stdout.write(f"{'sivu':<16}{'sync req/s':>12}{'async req/s':>13}{'suhde':>8}")
+        with override_settings(ALLOWED_HOSTS=['localhost']):
+            for nimi, sync_polku, async_polku in sivut:
+                tulokset = [
+                    asyncio.run(_kuormita(
+                        application, polku, options['pyynnot'], options['rinnakkaisuus'],
+                    ))
+                    for polku in (sync_polku, async_polku)
+                ]
+                self.stdout.write(
+                    f'{nimi:<16}{tulokset[0]:>12.1f}{tulokset[1]:>13.1f}'
+                    f'{tulokset[1] / tulokset[0]:>7.2f}x'
+                )
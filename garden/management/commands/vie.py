@@ -0,0 +1,53 @@
+"""Vie viljelyt tai havainnot CSV- tai JSONL-tiedostoon."""
+from django.core.management.base import BaseCommand, CommandError
+
+from garden.vienti import KIRJOITTAJAT, OTSIKKORIVIT, VIENNIT, VientiVirhe, vie
+
+
+class Command(BaseCommand):
+    help = (
+        'Vie viljelyt tai havainnot CSV- tai JSONL-muodossa. Rivit luetaan '
+        'erissä ja kirjoitetaan virtana, joten muistinkäyttö pysyy vakiona.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('laji', choices=sorted(VIENNIT))
+        parser.add_argument('--muoto', choices=sorted(KIRJOITTAJAT), default='csv')
+        parser.add_argument('--kausi', help='Vain tämän vuoden kylvöt / havainnot')
+        parser.add_argument('--kategoria', help='Vain tämän kategorian kasvit')
+        parser.add_argument('--tila', help='Vain viljelyt tässä tilassa')
+        parser.add_argument(
+            '--tiedosto', '-o',
+            help='Kohdetiedosto (oletus: vakiotuloste)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            palat = vie(
+                options['laji'], options['muoto'],
+                kausi=options['kausi'],
+                kategoria=options['kategoria'],
+                tila=options['tila'],
+            )
+        except VientiVirhe as e:
+            raise CommandError(str(e))
+
+        if not options['tiedosto']:
+            self.kirjoita(palat, self.stdout)
+            return
+        try:
+            with open(options['tiedosto'], 'w', encoding='utf-8', newline='') as tiedosto:
+                rivit = self.kirjoita(palat, tiedosto) - OTSIKKORIVIT[options['muoto']]
+        except OSError as e:
+            raise CommandError(f'Tiedostoon ei voi kirjoittaa: {e}')
+        # Yhteenveto stderriin, jotta stdout-vienti pysyy puhtaana
+        self.stderr.write(self.style.SUCCESS(
+            f"Valmis! {rivit} riviä → {options['tiedosto']}"
+        ))
+
+    def kirjoita(self, palat, kohde):
+        rivit = 0
+        for pala in palat:
+            kohde.write(pala)
+            rivit += 1
+        return rivit
@@ -0,0 +1,70 @@
+"""Puutarhapäiväkirjan middlewaret."""
+import logging
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+logger = logging.getLogger('garden.kyselyt')
+
+
+class KyselySeuranta:
+    """``execute_wrapper``, joka kirjaa pyynnön kyselyt ja niiden keston."""
+
+    def __init__(self):
+        self.kyselyt = Counter()
+        self.kesto = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        alku = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.kesto += time.perf_counter() - alku
+            self.kyselyt[(sql, repr(params))] += 1
+
+    @property
+    def maara(self):
+        return sum(self.kyselyt.values())
+
+    @property
+    def kaksoiskappaleet(self):
+        return sum(n - 1 for n in self.kyselyt.values() if n > 1)
+
+
+class KyselyBudjettiMiddleware:
+    """Kirjaa pyynnön kyselymäärän, kokonaiskeston ja toistuvat kyselyt.
+
+    Käytössä vain, kun ``GARDEN_KYSELYSEURANTA = True``. Tulokset lisätään
+    vastausotsakkeisiin ``X-Kyselyt``, ``X-Kyselyaika-ms`` ja
+    ``X-Kaksoiskyselyt`` sekä lokiin ``garden.kyselyt``. Jos
+    ``GARDEN_KYSELYBUDJETTI`` on asetettu ja ylittyy, kirjataan varoitus.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'GARDEN_KYSELYSEURANTA', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.budjetti = getattr(settings, 'GARDEN_KYSELYBUDJETTI', None)
+
+    def __call__(self, request):
+        seuranta = KyselySeuranta()
+        with connection.execute_wrapper(seuranta):
+            response = self.get_response(request)
+
+        response.headers['X-Kyselyt'] = str(seuranta.maara)
+        response.headers['X-Kyselyaika-ms'] = f'{seuranta.kesto * 1000:.1f}'
+        response.headers['X-Kaksoiskyselyt'] = str(seuranta.kaksoiskappaleet)
+
+        viesti = '%s %s: %d kyselyä, %.1f ms, %d toistoa'
+        args = (
+            request.method, request.path, seuranta.maara,
+            seuranta.kesto * 1000, seuranta.kaksoiskappaleet,
+        )
+        if self.budjetti is not None and seuranta.maara > self.budjetti:
+            logger.warning(viesti + ' (budjetti %d ylittyi)', *args, self.budjetti)
+        else:
+            logger.debug(viesti, *args)
+        return response
@@ -0,0 +1,66 @@
+# Generated by Django 6.0.2 on 2026-10-18 05:24
+
+from django.db import migrations, models
+
+
+# garden.models-moduulin maskifunktiot tällä versiolla (jäädytetty)
+def kuukausimaski(alku, loppu):
+    """Palauttaa kuukausivälin 12-bittisenä maskina (bitti 0 = tammikuu).
+
+    Vuodenvaihteen yli menevä väli (esim. 11–2) kiertää tammikuuhun.
+    """
+    if not alku or not loppu:
+        return 0
+    if alku <= loppu:
+        kuukaudet = range(alku, loppu + 1)
+    else:
+        kuukaudet = list(range(alku, 13)) + list(range(1, loppu + 1))
+    maski = 0
+    for kk in kuukaudet:
+        maski |= 1 << (kk - 1)
+    return maski
+
+
+def kasvumaski(kylvo_loppu, sato_alku):
+    """Palauttaa kylvön ja sadon väliin jäävien kasvukuukausien maskin."""
+    if not kylvo_loppu or not sato_alku or kylvo_loppu + 1 >= sato_alku:
+        return 0
+    return kuukausimaski(kylvo_loppu + 1, sato_alku - 1)
+
+
+def laske_maskit(apps, schema_editor):
+    PlantSpecies = apps.get_model('garden', 'PlantSpecies')
+    lajit = list(PlantSpecies.objects.all())
+    for laji in lajit:
+        laji.kylvo_maski = kuukausimaski(laji.kylvo_alku_kk, laji.kylvo_loppu_kk)
+        laji.kasvu_maski = kasvumaski(laji.kylvo_loppu_kk, laji.sato_alku_kk)
+        laji.sato_maski = kuukausimaski(laji.sato_alku_kk, laji.sato_loppu_kk)
+    PlantSpecies.objects.bulk_update(
+        lajit, ['kylvo_maski', 'kasvu_maski', 'sato_maski'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garden', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plantspecies',
+            name='kasvu_maski',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Kasvukuukaudet'),
+        ),
+        migrations.AddField(
+            model_name='plantspecies',
+            name='kylvo_maski',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Kylvökuukaudet'),
+        ),
+        migrations.AddField(
+            model_name='plantspecies',
+            name='sato_maski',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Satokuukaudet'),
+        ),
+        migrations.RunPython(laske_maskit, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 6.0.2 on 2026-10-18 05:26
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def yhdista_kaksoiskappaleet(apps, schema_editor):
+    """Yhdistää samannimiset lajit ennen (nimi, lajike)-yksilöllisyysehtoa.
+
+    Säilytetään pienin id ja siirretään muiden viljelyt sille.
+    """
+    PlantSpecies = apps.get_model('garden', 'PlantSpecies')
+    MyGarden = apps.get_model('garden', 'MyGarden')
+    kaksoiskappaleet = (
+        PlantSpecies.objects.values('nimi', 'lajike')
+        .annotate(maara=Count('id'), sailyta=Min('id'))
+        .filter(maara__gt=1)
+    )
+    for rivi in kaksoiskappaleet:
+        ylimaaraiset = PlantSpecies.objects.filter(
+            nimi=rivi['nimi'], lajike=rivi['lajike'],
+        ).exclude(pk=rivi['sailyta'])
+        MyGarden.objects.filter(kasvilaji__in=ylimaaraiset).update(kasvilaji_id=rivi['sailyta'])
+        ylimaaraiset.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garden', '0002_kuukausimaskit'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gardennote',
+            index=models.Index(fields=['kasvi', '-paivamaara', '-id'], name='havainto_kasvi_pvm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mygarden',
+            index=models.Index(condition=models.Q(('tila', 'paattynyt'), _negated=True), fields=['-lisatty', '-id'], name='viljely_aktiiviset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plantspecies',
+            index=models.Index(fields=['kategoria', 'nimi', 'id'], name='kasvilaji_kategoria_idx'),
+        ),
+        migrations.RunPython(yhdista_kaksoiskappaleet, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='plantspecies',
+            constraint=models.UniqueConstraint(fields=('nimi', 'lajike'), name='kasvilaji_nimi_lajike_uniq'),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 6.0.2 on 2026-10-18 06:02
+
+from django.db import migrations
+
+# garden.haku-moduulin tuottamat lauseet tällä versiolla (jäädytetty)
+LUO = [
+    (
+        "CREATE VIRTUAL TABLE garden_plantspecies_fts USING fts5(nimi, lajike, kuvaus, kasvatusohje, "
+        "content = 'garden_plantspecies', content_rowid = 'id', tokenize = 'unicode61 "
+        "remove_diacritics 2', prefix = '2 3 4')"
+    ),
+    (
+        "CREATE TRIGGER garden_plantspecies_fts_ai AFTER INSERT ON garden_plantspecies BEGIN INSERT "
+        "INTO garden_plantspecies_fts(rowid, nimi, lajike, kuvaus, kasvatusohje) VALUES (new.id, "
+        "new.nimi, new.lajike, new.kuvaus, new.kasvatusohje); END"
+    ),
+    (
+        "CREATE TRIGGER garden_plantspecies_fts_ad AFTER DELETE ON garden_plantspecies BEGIN INSERT "
+        "INTO garden_plantspecies_fts(garden_plantspecies_fts, rowid, nimi, lajike, kuvaus, "
+        "kasvatusohje) VALUES ('delete', old.id, old.nimi, old.lajike, old.kuvaus, old.kasvatusohje);"
+        " END"
+    ),
+    (
+        "CREATE TRIGGER garden_plantspecies_fts_au AFTER UPDATE OF nimi, lajike, kuvaus, kasvatusohje"
+        " ON garden_plantspecies BEGIN INSERT INTO garden_plantspecies_fts(garden_plantspecies_fts, "
+        "rowid, nimi, lajike, kuvaus, kasvatusohje) VALUES ('delete', old.id, old.nimi, old.lajike, "
+        "old.kuvaus, old.kasvatusohje); INSERT INTO garden_plantspecies_fts(rowid, nimi, lajike, "
+        "kuvaus, kasvatusohje) VALUES (new.id, new.nimi, new.lajike, new.kuvaus, new.kasvatusohje); "
+        "END"
+    ),
+    "INSERT INTO garden_plantspecies_fts(garden_plantspecies_fts) VALUES ('rebuild')",
+    (
+        "CREATE VIRTUAL TABLE garden_gardennote_fts USING fts5(havainto, content = "
+        "'garden_gardennote', content_rowid = 'id', tokenize = 'unicode61 remove_diacritics 2', "
+        "prefix = '2 3 4')"
+    ),
+    (
+        "CREATE TRIGGER garden_gardennote_fts_ai AFTER INSERT ON garden_gardennote BEGIN INSERT INTO "
+        "garden_gardennote_fts(rowid, havainto) VALUES (new.id, new.havainto); END"
+    ),
+    (
+        "CREATE TRIGGER garden_gardennote_fts_ad AFTER DELETE ON garden_gardennote BEGIN INSERT INTO "
+        "garden_gardennote_fts(garden_gardennote_fts, rowid, havainto) VALUES ('delete', old.id, "
+        "old.havainto); END"
+    ),
+    (
+        "CREATE TRIGGER garden_gardennote_fts_au AFTER UPDATE OF havainto ON garden_gardennote BEGIN "
+        "INSERT INTO garden_gardennote_fts(garden_gardennote_fts, rowid, havainto) VALUES ('delete', "
+        "old.id, old.havainto); INSERT INTO garden_gardennote_fts(rowid, havainto) VALUES (new.id, "
+        "new.havainto); END"
+    ),
+    "INSERT INTO garden_gardennote_fts(garden_gardennote_fts) VALUES ('rebuild')",
+]
+
+POISTA = [
+    "DROP TRIGGER IF EXISTS garden_plantspecies_fts_ai",
+    "DROP TRIGGER IF EXISTS garden_plantspecies_fts_ad",
+    "DROP TRIGGER IF EXISTS garden_plantspecies_fts_au",
+    "DROP TABLE IF EXISTS garden_plantspecies_fts",
+    "DROP TRIGGER IF EXISTS garden_gardennote_fts_ai",
+    "DROP TRIGGER IF EXISTS garden_gardennote_fts_ad",
+    "DROP TRIGGER IF EXISTS garden_gardennote_fts_au",
+    "DROP TABLE IF EXISTS garden_gardennote_fts",
+]
+
+
+def luo_indeksit(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for lause in LUO:
+        schema_editor.execute(lause)
+
+
+def poista_indeksit(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for lause in POISTA:
+        schema_editor.execute(lause)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garden', '0003_indeksit'),
+    ]
+
+    operations = [
+        migrations.RunPython(luo_indeksit, poista_indeksit),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 6.0.2 on 2026-10-18 06:31
+
+from django.db import migrations, models
+
+# garden.versiot-moduulin tuottamat lauseet tällä versiolla (jäädytetty)
+LUO = [
+    (
+        "CREATE TRIGGER garden_plantspecies_versio_ai AFTER INSERT ON garden_plantspecies BEGIN "
+        "INSERT INTO garden_tietoversio(taulu, versio) VALUES ('garden_plantspecies', 1) ON "
+        "CONFLICT(taulu) DO UPDATE SET versio = versio + 1; END"
+    ),
+    (
+        "CREATE TRIGGER garden_plantspecies_versio_au AFTER UPDATE ON garden_plantspecies BEGIN "
+        "INSERT INTO garden_tietoversio(taulu, versio) VALUES ('garden_plantspecies', 1) ON "
+        "CONFLICT(taulu) DO UPDATE SET versio = versio + 1; END"
+    ),
+    (
+        "CREATE TRIGGER garden_plantspecies_versio_ad AFTER DELETE ON garden_plantspecies BEGIN "
+        "INSERT INTO garden_tietoversio(taulu, versio) VALUES ('garden_plantspecies', 1) ON "
+        "CONFLICT(taulu) DO UPDATE SET versio = versio + 1; END"
+    ),
+    (
+        "CREATE TRIGGER garden_mygarden_versio_ai AFTER INSERT ON garden_mygarden BEGIN INSERT INTO "
+        "garden_tietoversio(taulu, versio) VALUES ('garden_mygarden', 1) ON CONFLICT(taulu) DO UPDATE"
+        " SET versio = versio + 1; END"
+    ),
+    (
+        "CREATE TRIGGER garden_mygarden_versio_au AFTER UPDATE ON garden_mygarden BEGIN INSERT INTO "
+        "garden_tietoversio(taulu, versio) VALUES ('garden_mygarden', 1) ON CONFLICT(taulu) DO UPDATE"
+        " SET versio = versio + 1; END"
+    ),
+    (
+        "CREATE TRIGGER garden_mygarden_versio_ad AFTER DELETE ON garden_mygarden BEGIN INSERT INTO "
+        "garden_tietoversio(taulu, versio) VALUES ('garden_mygarden', 1) ON CONFLICT(taulu) DO UPDATE"
+        " SET versio = versio + 1; END"
+    ),
+    (
+        "CREATE TRIGGER garden_gardennote_versio_ai AFTER INSERT ON garden_gardennote BEGIN INSERT "
+        "INTO garden_tietoversio(taulu, versio) VALUES ('garden_gardennote', 1) ON CONFLICT(taulu) DO"
+        " UPDATE SET versio = versio + 1; END"
+    ),
+    (
+        "CREATE TRIGGER garden_gardennote_versio_au AFTER UPDATE ON garden_gardennote BEGIN INSERT "
+        "INTO garden_tietoversio(taulu, versio) VALUES ('garden_gardennote', 1) ON CONFLICT(taulu) DO"
+        " UPDATE SET versio = versio + 1; END"
+    ),
+    (
+        "CREATE TRIGGER garden_gardennote_versio_ad AFTER DELETE ON garden_gardennote BEGIN INSERT "
+        "INTO garden_tietoversio(taulu, versio) VALUES ('garden_gardennote', 1) ON CONFLICT(taulu) DO"
+        " UPDATE SET versio = versio + 1; END"
+    ),
+]
+
+POISTA = [
+    "DROP TRIGGER IF EXISTS garden_plantspecies_versio_ai",
+    "DROP TRIGGER IF EXISTS garden_plantspecies_versio_au",
+    "DROP TRIGGER IF EXISTS garden_plantspecies_versio_ad",
+    "DROP TRIGGER IF EXISTS garden_mygarden_versio_ai",
+    "DROP TRIGGER IF EXISTS garden_mygarden_versio_au",
+    "DROP TRIGGER IF EXISTS garden_mygarden_versio_ad",
+    "DROP TRIGGER IF EXISTS garden_gardennote_versio_ai",
+    "DROP TRIGGER IF EXISTS garden_gardennote_versio_au",
+    "DROP TRIGGER IF EXISTS garden_gardennote_versio_ad",
+]
+
+
+def luo_triggerit(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for lause in LUO:
+        schema_editor.execute(lause)
+
+
+def poista_triggerit(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for lause in POISTA:
+        schema_editor.execute(lause)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garden', '0004_hakuindeksi'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TietoVersio',
+            fields=[
+                ('taulu', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Taulu')),
+                ('versio', models.PositiveBigIntegerField(default=0, verbose_name='Versio')),
+            ],
+            options={
+                'verbose_name': 'Tietoversio',
+                'verbose_name_plural': 'Tietoversiot',
+            },
+        ),
+        migrations.RunPython(luo_triggerit, poista_triggerit),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.2 on 2026-10-18 07:12
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def laske_laskurit(apps, schema_editor):
+    MyGarden = apps.get_model('garden', 'MyGarden')
+    GardenNote = apps.get_model('garden', 'GardenNote')
+    havainnot = GardenNote.objects.filter(kasvi=OuterRef('pk')).order_by().values('kasvi')
+    MyGarden.objects.update(
+        havaintoja=Coalesce(Subquery(havainnot.annotate(n=Count('pk')).values('n')), 0),
+        viimeisin_havainto=Subquery(havainnot.annotate(m=Max('paivamaara')).values('m')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garden', '0005_tietoversiot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mygarden',
+            name='havaintoja',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Havaintoja'),
+        ),
+        migrations.AddField(
+            model_name='mygarden',
+            name='viimeisin_havainto',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Viimeisin havainto'),
+        ),
+        migrations.RunPython(laske_laskurit, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='mygarden',
+            index=models.Index(fields=['-viimeisin_havainto', '-id'], name='viljely_aktiivisuus_idx'),
+        ),
+    ]
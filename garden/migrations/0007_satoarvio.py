@@ -0,0 +1,55 @@
+# Generated by Django 6.0.2 on 2026-10-18 08:03
+
+import datetime
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Cast
+
+
+# garden.models.kasvuaika tällä versiolla (jäädytetty)
+def kasvuaika(kylvo_alku, sato_alku):
+    """Arvioitu kasvuaika kylvöstä sadon alkuun (30 pv/kk, oletus 90 pv)."""
+    if not kylvo_alku or not sato_alku or sato_alku <= kylvo_alku:
+        return datetime.timedelta(days=90)
+    return datetime.timedelta(days=(sato_alku - kylvo_alku) * 30)
+
+
+def laske_satoarviot(apps, schema_editor):
+    PlantSpecies = apps.get_model('garden', 'PlantSpecies')
+    MyGarden = apps.get_model('garden', 'MyGarden')
+    lajit = list(PlantSpecies.objects.all())
+    for laji in lajit:
+        laji.kasvuaika = kasvuaika(laji.kylvo_alku_kk, laji.sato_alku_kk)
+    PlantSpecies.objects.bulk_update(lajit, ['kasvuaika'], batch_size=1000)
+    lajin_kasvuaika = Subquery(
+        PlantSpecies.objects.filter(pk=OuterRef('kasvilaji_id')).values('kasvuaika')
+    )
+    MyGarden.objects.update(
+        arvioitu_sato=Cast(F('kylvopaiva') + lajin_kasvuaika, models.DateField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garden', '0006_havaintolaskurit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mygarden',
+            name='arvioitu_sato',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Arvioitu sato'),
+        ),
+        migrations.AddField(
+            model_name='plantspecies',
+            name='kasvuaika',
+            field=models.DurationField(default=datetime.timedelta(days=90), editable=False, verbose_name='Kasvuaika'),
+        ),
+        migrations.RunPython(laske_satoarviot, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='mygarden',
+            index=models.Index(condition=models.Q(('tila', 'paattynyt'), _negated=True), fields=['arvioitu_sato', 'id'], name='viljely_satoarvio_idx'),
+        ),
+    ]
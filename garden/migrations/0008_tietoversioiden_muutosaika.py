@@ -0,0 +1,97 @@
+# Generated by Django 6.0.2 on 2026-10-18 08:47
+
+from django.db import migrations, models
+
+# garden.versiot-moduulin tuottamat lauseet tällä versiolla (jäädytetty)
+POISTA = [
+    "DROP TRIGGER IF EXISTS garden_plantspecies_versio_ai",
+    "DROP TRIGGER IF EXISTS garden_plantspecies_versio_au",
+    "DROP TRIGGER IF EXISTS garden_plantspecies_versio_ad",
+    "DROP TRIGGER IF EXISTS garden_mygarden_versio_ai",
+    "DROP TRIGGER IF EXISTS garden_mygarden_versio_au",
+    "DROP TRIGGER IF EXISTS garden_mygarden_versio_ad",
+    "DROP TRIGGER IF EXISTS garden_gardennote_versio_ai",
+    "DROP TRIGGER IF EXISTS garden_gardennote_versio_au",
+    "DROP TRIGGER IF EXISTS garden_gardennote_versio_ad",
+]
+
+LUO = [
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_plantspecies_versio_ai AFTER INSERT ON "
+        "garden_plantspecies BEGIN INSERT INTO garden_tietoversio(taulu, versio, muutettu) VALUES "
+        "('garden_plantspecies', 1, CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = "
+        "versio + 1, muutettu = CURRENT_TIMESTAMP; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_plantspecies_versio_au AFTER UPDATE ON "
+        "garden_plantspecies BEGIN INSERT INTO garden_tietoversio(taulu, versio, muutettu) VALUES "
+        "('garden_plantspecies', 1, CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = "
+        "versio + 1, muutettu = CURRENT_TIMESTAMP; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_plantspecies_versio_ad AFTER DELETE ON "
+        "garden_plantspecies BEGIN INSERT INTO garden_tietoversio(taulu, versio, muutettu) VALUES "
+        "('garden_plantspecies', 1, CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = "
+        "versio + 1, muutettu = CURRENT_TIMESTAMP; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_mygarden_versio_ai AFTER INSERT ON garden_mygarden BEGIN"
+        " INSERT INTO garden_tietoversio(taulu, versio, muutettu) VALUES ('garden_mygarden', 1, "
+        "CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = versio + 1, muutettu = "
+        "CURRENT_TIMESTAMP; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_mygarden_versio_au AFTER UPDATE ON garden_mygarden BEGIN"
+        " INSERT INTO garden_tietoversio(taulu, versio, muutettu) VALUES ('garden_mygarden', 1, "
+        "CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = versio + 1, muutettu = "
+        "CURRENT_TIMESTAMP; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_mygarden_versio_ad AFTER DELETE ON garden_mygarden BEGIN"
+        " INSERT INTO garden_tietoversio(taulu, versio, muutettu) VALUES ('garden_mygarden', 1, "
+        "CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = versio + 1, muutettu = "
+        "CURRENT_TIMESTAMP; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_gardennote_versio_ai AFTER INSERT ON garden_gardennote "
+        "BEGIN INSERT INTO garden_tietoversio(taulu, versio, muutettu) VALUES ('garden_gardennote', "
+        "1, CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = versio + 1, muutettu = "
+        "CURRENT_TIMESTAMP; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_gardennote_versio_au AFTER UPDATE ON garden_gardennote "
+        "BEGIN INSERT INTO garden_tietoversio(taulu, versio, muutettu) VALUES ('garden_gardennote', "
+        "1, CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = versio + 1, muutettu = "
+        "CURRENT_TIMESTAMP; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_gardennote_versio_ad AFTER DELETE ON garden_gardennote "
+        "BEGIN INSERT INTO garden_tietoversio(taulu, versio, muutettu) VALUES ('garden_gardennote', "
+        "1, CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = versio + 1, muutettu = "
+        "CURRENT_TIMESTAMP; END"
+    ),
+]
+
+
+def vaihda_triggerit(apps, schema_editor):
+    """Korvaa versiotriggerit versioilla, jotka päivittävät myös muutosajan."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for lause in POISTA + LUO:
+        schema_editor.execute(lause)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garden', '0007_satoarvio'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tietoversio',
+            name='muutettu',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Muutettu'),
+        ),
+        migrations.RunPython(vaihda_triggerit, migrations.RunPython.noop),
+    ]
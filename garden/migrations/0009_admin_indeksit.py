@@ -0,0 +1,34 @@
+# Generated by Django 6.0.2 on 2026-10-18 09:12
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garden', '0008_tietoversioiden_muutosaika'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gardennote',
+            index=models.Index(fields=['-paivamaara', '-id'], name='havainto_pvm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mygarden',
+            index=models.Index(fields=['-lisatty', '-id'], name='viljely_lisatty_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mygarden',
+            index=models.Index(django.db.models.functions.comparison.Collate('kasvupaikka', 'NOCASE'), name='viljely_kasvupaikka_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plantspecies',
+            index=models.Index(django.db.models.functions.comparison.Collate('nimi', 'NOCASE'), name='kasvilaji_nimi_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plantspecies',
+            index=models.Index(django.db.models.functions.comparison.Collate('lajike', 'NOCASE'), name='kasvilaji_lajike_nocase_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garden', '0009_admin_indeksit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tyo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tehtava', models.CharField(max_length=100, verbose_name='Tehtävä')),
+                ('parametrit', models.JSONField(blank=True, default=dict, verbose_name='Parametrit')),
+                ('tila', models.CharField(choices=[('jonossa', 'Jonossa'), ('kaynnissa', 'Käynnissä'), ('valmis', 'Valmis'), ('epaonnistui', 'Epäonnistui')], default='jonossa', max_length=20, verbose_name='Tila')),
+                ('ajoaika', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Ajetaan aikaisintaan')),
+                ('yritykset', models.PositiveSmallIntegerField(default=0, verbose_name='Yrityksiä')),
+                ('enimmaisyritykset', models.PositiveSmallIntegerField(default=3, verbose_name='Yrityksiä enintään')),
+                ('edistyminen', models.PositiveIntegerField(default=0, verbose_name='Tehty')),
+                ('kokonaismaara', models.PositiveIntegerField(blank=True, null=True, verbose_name='Yhteensä')),
+                ('viesti', models.CharField(blank=True, default='', max_length=255, verbose_name='Viesti')),
+                ('tulos', models.JSONField(blank=True, null=True, verbose_name='Tulos')),
+                ('virhe', models.TextField(blank=True, default='', verbose_name='Virhe')),
+                ('tyontekija', models.CharField(blank=True, default='', max_length=100, verbose_name='Työntekijä')),
+                ('luotu', models.DateTimeField(auto_now_add=True, verbose_name='Luotu')),
+                ('aloitettu', models.DateTimeField(blank=True, null=True, verbose_name='Aloitettu')),
+                ('valmistunut', models.DateTimeField(blank=True, null=True, verbose_name='Valmistunut')),
+                ('elossa', models.DateTimeField(blank=True, null=True, verbose_name='Viimeksi elossa')),
+            ],
+            options={
+                'verbose_name': 'Taustatyö',
+                'verbose_name_plural': 'Taustatyöt',
+                'ordering': ['-id'],
+                'indexes': [models.Index(condition=models.Q(('tila', 'jonossa')), fields=['ajoaika', 'id'], name='tyo_jono_idx'), models.Index(condition=models.Q(('tila', 'kaynnissa')), fields=['elossa'], name='tyo_kaynnissa_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:20
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def poista_kaksoistunnisteet(apps, schema_editor):
+    """Jättää saman Nelson Garden -tunnisteen vain pienimmän id:n lajille."""
+    PlantSpecies = apps.get_model('garden', 'PlantSpecies')
+    kaksoiskappaleet = (
+        PlantSpecies.objects.exclude(nelson_garden_id='').values('nelson_garden_id')
+        .annotate(maara=Count('id'), sailyta=Min('id'))
+        .filter(maara__gt=1)
+    )
+    for rivi in kaksoiskappaleet:
+        PlantSpecies.objects.filter(nelson_garden_id=rivi['nelson_garden_id']).exclude(
+            pk=rivi['sailyta'],
+        ).update(nelson_garden_id='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garden', '0010_tyojono'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plantspecies',
+            name='sisalto_tiiviste',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64, verbose_name='Sisällön tiiviste'),
+        ),
+        migrations.RunPython(poista_kaksoistunnisteet, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='plantspecies',
+            constraint=models.UniqueConstraint(condition=models.Q(('nelson_garden_id', ''), _negated=True), fields=('nelson_garden_id',), name='kasvilaji_nelson_garden_id_uniq'),
+        ),
+    ]
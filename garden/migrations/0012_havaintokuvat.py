@@ -0,0 +1,78 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+# garden.versiot-moduulin tuottamat lauseet tällä versiolla (jäädytetty)
+LUO = [
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_kuva_versio_ai AFTER INSERT ON garden_kuva BEGIN INSERT "
+        "INTO garden_tietoversio(taulu, versio, muutettu) VALUES ('garden_kuva', 1, "
+        "CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = versio + 1, muutettu = "
+        "CURRENT_TIMESTAMP; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_kuva_versio_au AFTER UPDATE ON garden_kuva BEGIN INSERT "
+        "INTO garden_tietoversio(taulu, versio, muutettu) VALUES ('garden_kuva', 1, "
+        "CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = versio + 1, muutettu = "
+        "CURRENT_TIMESTAMP; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_kuva_versio_ad AFTER DELETE ON garden_kuva BEGIN INSERT "
+        "INTO garden_tietoversio(taulu, versio, muutettu) VALUES ('garden_kuva', 1, "
+        "CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = versio + 1, muutettu = "
+        "CURRENT_TIMESTAMP; END"
+    ),
+]
+
+POISTA = [
+    "DROP TRIGGER IF EXISTS garden_kuva_versio_ai",
+    "DROP TRIGGER IF EXISTS garden_kuva_versio_au",
+    "DROP TRIGGER IF EXISTS garden_kuva_versio_ad",
+]
+
+
+def luo_triggerit(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for lause in LUO:
+        schema_editor.execute(lause)
+
+
+def poista_triggerit(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for lause in POISTA:
+        schema_editor.execute(lause)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garden', '0011_luettelon_synkronointi'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Kuva',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tiiviste', models.CharField(max_length=64, unique=True, verbose_name='SHA-256-tiiviste')),
+                ('muoto', models.CharField(max_length=10, verbose_name='Muoto')),
+                ('koko', models.PositiveIntegerField(verbose_name='Koko (tavua)')),
+                ('leveys', models.PositiveIntegerField(blank=True, null=True, verbose_name='Leveys')),
+                ('korkeus', models.PositiveIntegerField(blank=True, null=True, verbose_name='Korkeus')),
+                ('tila', models.CharField(choices=[('kasittelematta', 'Käsittelemättä'), ('valmis', 'Valmis'), ('virheellinen', 'Virheellinen')], default='kasittelematta', max_length=20, verbose_name='Tila')),
+                ('luotu', models.DateTimeField(auto_now_add=True, verbose_name='Luotu')),
+            ],
+            options={
+                'verbose_name': 'Kuva',
+                'verbose_name_plural': 'Kuvat',
+            },
+        ),
+        migrations.AddField(
+            model_name='gardennote',
+            name='kuvat',
+            field=models.ManyToManyField(blank=True, related_name='havainnot', to='garden.kuva', verbose_name='Kuvat'),
+        ),
+        migrations.RunPython(luo_triggerit, poista_triggerit),
+    ]
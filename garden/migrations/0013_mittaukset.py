@@ -0,0 +1,183 @@
+# Generated by Django 6.0.2 on 2026-10-18 13:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# garden.mittaukset- ja garden.versiot-moduulien tuottamat lauseet tällä versiolla (jäädytetty)
+LUO = [
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_mittauskooste_ai AFTER INSERT ON garden_mittaus BEGIN "
+        "INSERT INTO garden_mittauskooste(viljely_id, suure, taso, alku, maara, summa, pienin, "
+        "suurin) VALUES (new.viljely_id, new.suure, 1, new.paivamaara, 1, new.arvo, new.arvo, "
+        "new.arvo) ON CONFLICT(viljely_id, suure, taso, alku) DO UPDATE SET maara = maara + 1, summa "
+        "= summa + excluded.summa, pienin = min(pienin, excluded.pienin), suurin = max(suurin, "
+        "excluded.suurin); INSERT INTO garden_mittauskooste(viljely_id, suure, taso, alku, maara, "
+        "summa, pienin, suurin) VALUES (new.viljely_id, new.suure, 2, date(new.paivamaara, '-' || "
+        "((CAST(strftime('%w', new.paivamaara) AS INTEGER) + 6) % 7) || ' days'), 1, new.arvo, "
+        "new.arvo, new.arvo) ON CONFLICT(viljely_id, suure, taso, alku) DO UPDATE SET maara = maara +"
+        " 1, summa = summa + excluded.summa, pienin = min(pienin, excluded.pienin), suurin = "
+        "max(suurin, excluded.suurin); INSERT INTO garden_mittauskooste(viljely_id, suure, taso, "
+        "alku, maara, summa, pienin, suurin) VALUES (new.viljely_id, new.suure, 3, "
+        "strftime('%Y-01-01', new.paivamaara), 1, new.arvo, new.arvo, new.arvo) ON "
+        "CONFLICT(viljely_id, suure, taso, alku) DO UPDATE SET maara = maara + 1, summa = summa + "
+        "excluded.summa, pienin = min(pienin, excluded.pienin), suurin = max(suurin, "
+        "excluded.suurin); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_mittauskooste_ad AFTER DELETE ON garden_mittaus BEGIN "
+        "DELETE FROM garden_mittauskooste WHERE viljely_id = old.viljely_id AND suure = old.suure AND"
+        " taso = 1 AND alku = old.paivamaara; INSERT INTO garden_mittauskooste(viljely_id, suure, "
+        "taso, alku, maara, summa, pienin, suurin) SELECT viljely_id, suure, 1, paivamaara, COUNT(*),"
+        " SUM(arvo), MIN(arvo), MAX(arvo) FROM garden_mittaus WHERE viljely_id = old.viljely_id AND "
+        "suure = old.suure AND paivamaara BETWEEN old.paivamaara AND old.paivamaara GROUP BY "
+        "viljely_id, suure; DELETE FROM garden_mittauskooste WHERE viljely_id = old.viljely_id AND "
+        "suure = old.suure AND taso = 2 AND alku = date(old.paivamaara, '-' || ((CAST(strftime('%w', "
+        "old.paivamaara) AS INTEGER) + 6) % 7) || ' days'); INSERT INTO "
+        "garden_mittauskooste(viljely_id, suure, taso, alku, maara, summa, pienin, suurin) SELECT "
+        "viljely_id, suure, 2, date(paivamaara, '-' || ((CAST(strftime('%w', paivamaara) AS INTEGER) "
+        "+ 6) % 7) || ' days'), COUNT(*), SUM(arvo), MIN(arvo), MAX(arvo) FROM garden_mittaus WHERE "
+        "viljely_id = old.viljely_id AND suure = old.suure AND paivamaara BETWEEN "
+        "date(old.paivamaara, '-' || ((CAST(strftime('%w', old.paivamaara) AS INTEGER) + 6) % 7) || '"
+        " days') AND date(date(old.paivamaara, '-' || ((CAST(strftime('%w', old.paivamaara) AS "
+        "INTEGER) + 6) % 7) || ' days'), '+6 days') GROUP BY viljely_id, suure; DELETE FROM "
+        "garden_mittauskooste WHERE viljely_id = old.viljely_id AND suure = old.suure AND taso = 3 "
+        "AND alku = strftime('%Y-01-01', old.paivamaara); INSERT INTO "
+        "garden_mittauskooste(viljely_id, suure, taso, alku, maara, summa, pienin, suurin) SELECT "
+        "viljely_id, suure, 3, strftime('%Y-01-01', paivamaara), COUNT(*), SUM(arvo), MIN(arvo), "
+        "MAX(arvo) FROM garden_mittaus WHERE viljely_id = old.viljely_id AND suure = old.suure AND "
+        "paivamaara BETWEEN strftime('%Y-01-01', old.paivamaara) AND strftime('%Y-12-31', "
+        "old.paivamaara) GROUP BY viljely_id, suure; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_mittauskooste_au AFTER UPDATE ON garden_mittaus BEGIN "
+        "DELETE FROM garden_mittauskooste WHERE viljely_id = old.viljely_id AND suure = old.suure AND"
+        " taso = 1 AND alku = old.paivamaara; INSERT INTO garden_mittauskooste(viljely_id, suure, "
+        "taso, alku, maara, summa, pienin, suurin) SELECT viljely_id, suure, 1, paivamaara, COUNT(*),"
+        " SUM(arvo), MIN(arvo), MAX(arvo) FROM garden_mittaus WHERE viljely_id = old.viljely_id AND "
+        "suure = old.suure AND paivamaara BETWEEN old.paivamaara AND old.paivamaara GROUP BY "
+        "viljely_id, suure; DELETE FROM garden_mittauskooste WHERE viljely_id = old.viljely_id AND "
+        "suure = old.suure AND taso = 2 AND alku = date(old.paivamaara, '-' || ((CAST(strftime('%w', "
+        "old.paivamaara) AS INTEGER) + 6) % 7) || ' days'); INSERT INTO "
+        "garden_mittauskooste(viljely_id, suure, taso, alku, maara, summa, pienin, suurin) SELECT "
+        "viljely_id, suure, 2, date(paivamaara, '-' || ((CAST(strftime('%w', paivamaara) AS INTEGER) "
+        "+ 6) % 7) || ' days'), COUNT(*), SUM(arvo), MIN(arvo), MAX(arvo) FROM garden_mittaus WHERE "
+        "viljely_id = old.viljely_id AND suure = old.suure AND paivamaara BETWEEN "
+        "date(old.paivamaara, '-' || ((CAST(strftime('%w', old.paivamaara) AS INTEGER) + 6) % 7) || '"
+        " days') AND date(date(old.paivamaara, '-' || ((CAST(strftime('%w', old.paivamaara) AS "
+        "INTEGER) + 6) % 7) || ' days'), '+6 days') GROUP BY viljely_id, suure; DELETE FROM "
+        "garden_mittauskooste WHERE viljely_id = old.viljely_id AND suure = old.suure AND taso = 3 "
+        "AND alku = strftime('%Y-01-01', old.paivamaara); INSERT INTO "
+        "garden_mittauskooste(viljely_id, suure, taso, alku, maara, summa, pienin, suurin) SELECT "
+        "viljely_id, suure, 3, strftime('%Y-01-01', paivamaara), COUNT(*), SUM(arvo), MIN(arvo), "
+        "MAX(arvo) FROM garden_mittaus WHERE viljely_id = old.viljely_id AND suure = old.suure AND "
+        "paivamaara BETWEEN strftime('%Y-01-01', old.paivamaara) AND strftime('%Y-12-31', "
+        "old.paivamaara) GROUP BY viljely_id, suure; DELETE FROM garden_mittauskooste WHERE "
+        "viljely_id = new.viljely_id AND suure = new.suure AND taso = 1 AND alku = new.paivamaara; "
+        "INSERT INTO garden_mittauskooste(viljely_id, suure, taso, alku, maara, summa, pienin, "
+        "suurin) SELECT viljely_id, suure, 1, paivamaara, COUNT(*), SUM(arvo), MIN(arvo), MAX(arvo) "
+        "FROM garden_mittaus WHERE viljely_id = new.viljely_id AND suure = new.suure AND paivamaara "
+        "BETWEEN new.paivamaara AND new.paivamaara GROUP BY viljely_id, suure; DELETE FROM "
+        "garden_mittauskooste WHERE viljely_id = new.viljely_id AND suure = new.suure AND taso = 2 "
+        "AND alku = date(new.paivamaara, '-' || ((CAST(strftime('%w', new.paivamaara) AS INTEGER) + "
+        "6) % 7) || ' days'); INSERT INTO garden_mittauskooste(viljely_id, suure, taso, alku, maara, "
+        "summa, pienin, suurin) SELECT viljely_id, suure, 2, date(paivamaara, '-' || "
+        "((CAST(strftime('%w', paivamaara) AS INTEGER) + 6) % 7) || ' days'), COUNT(*), SUM(arvo), "
+        "MIN(arvo), MAX(arvo) FROM garden_mittaus WHERE viljely_id = new.viljely_id AND suure = "
+        "new.suure AND paivamaara BETWEEN date(new.paivamaara, '-' || ((CAST(strftime('%w', "
+        "new.paivamaara) AS INTEGER) + 6) % 7) || ' days') AND date(date(new.paivamaara, '-' || "
+        "((CAST(strftime('%w', new.paivamaara) AS INTEGER) + 6) % 7) || ' days'), '+6 days') GROUP BY"
+        " viljely_id, suure; DELETE FROM garden_mittauskooste WHERE viljely_id = new.viljely_id AND "
+        "suure = new.suure AND taso = 3 AND alku = strftime('%Y-01-01', new.paivamaara); INSERT INTO "
+        "garden_mittauskooste(viljely_id, suure, taso, alku, maara, summa, pienin, suurin) SELECT "
+        "viljely_id, suure, 3, strftime('%Y-01-01', paivamaara), COUNT(*), SUM(arvo), MIN(arvo), "
+        "MAX(arvo) FROM garden_mittaus WHERE viljely_id = new.viljely_id AND suure = new.suure AND "
+        "paivamaara BETWEEN strftime('%Y-01-01', new.paivamaara) AND strftime('%Y-12-31', "
+        "new.paivamaara) GROUP BY viljely_id, suure; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_mittaus_versio_ai AFTER INSERT ON garden_mittaus BEGIN "
+        "INSERT INTO garden_tietoversio(taulu, versio, muutettu) VALUES ('garden_mittaus', 1, "
+        "CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = versio + 1, muutettu = "
+        "CURRENT_TIMESTAMP; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_mittaus_versio_au AFTER UPDATE ON garden_mittaus BEGIN "
+        "INSERT INTO garden_tietoversio(taulu, versio, muutettu) VALUES ('garden_mittaus', 1, "
+        "CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = versio + 1, muutettu = "
+        "CURRENT_TIMESTAMP; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_mittaus_versio_ad AFTER DELETE ON garden_mittaus BEGIN "
+        "INSERT INTO garden_tietoversio(taulu, versio, muutettu) VALUES ('garden_mittaus', 1, "
+        "CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = versio + 1, muutettu = "
+        "CURRENT_TIMESTAMP; END"
+    ),
+]
+
+POISTA = [
+    "DROP TRIGGER IF EXISTS garden_mittauskooste_ai",
+    "DROP TRIGGER IF EXISTS garden_mittauskooste_ad",
+    "DROP TRIGGER IF EXISTS garden_mittauskooste_au",
+    "DROP TRIGGER IF EXISTS garden_mittaus_versio_ai",
+    "DROP TRIGGER IF EXISTS garden_mittaus_versio_au",
+    "DROP TRIGGER IF EXISTS garden_mittaus_versio_ad",
+]
+
+
+def luo_triggerit(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for lause in LUO:
+        schema_editor.execute(lause)
+
+
+def poista_triggerit(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for lause in POISTA:
+        schema_editor.execute(lause)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garden', '0012_havaintokuvat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Mittaus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('suure', models.PositiveSmallIntegerField(choices=[(1, 'Korkeus (cm)'), (2, 'Hedelmiä (kpl)'), (3, 'Sato (g)')], verbose_name='Suure')),
+                ('paivamaara', models.DateField(verbose_name='Päivämäärä')),
+                ('arvo', models.FloatField(verbose_name='Arvo')),
+                ('viljely', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mittaukset', to='garden.mygarden', verbose_name='Viljelymerkintä')),
+            ],
+            options={
+                'verbose_name': 'Mittaus',
+                'verbose_name_plural': 'Mittaukset',
+                'indexes': [models.Index(fields=['viljely', 'suure', 'paivamaara'], name='mittaus_sarja_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='MittausKooste',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('suure', models.PositiveSmallIntegerField(choices=[(1, 'Korkeus (cm)'), (2, 'Hedelmiä (kpl)'), (3, 'Sato (g)')], verbose_name='Suure')),
+                ('taso', models.PositiveSmallIntegerField(choices=[(1, 'Päivä'), (2, 'Viikko'), (3, 'Kausi')], verbose_name='Taso')),
+                ('alku', models.DateField(verbose_name='Jakson alku')),
+                ('maara', models.PositiveIntegerField(verbose_name='Mittauksia')),
+                ('summa', models.FloatField(verbose_name='Summa')),
+                ('pienin', models.FloatField(verbose_name='Pienin')),
+                ('suurin', models.FloatField(verbose_name='Suurin')),
+                ('viljely', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mittauskoosteet', to='garden.mygarden', verbose_name='Viljelymerkintä')),
+            ],
+            options={
+                'verbose_name': 'Mittauskooste',
+                'verbose_name_plural': 'Mittauskoosteet',
+                'constraints': [models.UniqueConstraint(fields=('viljely', 'suure', 'taso', 'alku'), name='mittauskooste_jakso_uniq')],
+            },
+        ),
+        migrations.RunPython(luo_triggerit, poista_triggerit),
+    ]
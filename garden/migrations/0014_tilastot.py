@@ -0,0 +1,168 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+# garden.tilastot- ja garden.versiot-moduulien tuottamat lauseet tällä versiolla (jäädytetty)
+LUO = [
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_viljelytilasto_ai AFTER INSERT ON garden_mygarden BEGIN "
+        "INSERT INTO garden_viljelytilasto(vuosi, kategoria, kasvupaikka, viljelyja, korjattuja, "
+        "epaonnistuneita, kasvuaikoja, kasvupaivia) VALUES (CAST(strftime('%Y', "
+        "coalesce(new.kylvopaiva, new.lisatty)) AS INTEGER), (SELECT kategoria FROM "
+        "garden_plantspecies WHERE id = new.kasvilaji_id), new.kasvupaikka, 1, (new.sadonkorjuu_alkoi"
+        " IS NOT NULL OR new.tila = 'sadonkorjuu'), (new.tila = 'paattynyt' AND new.sadonkorjuu_alkoi"
+        " IS NULL), (new.kylvopaiva IS NOT NULL AND new.sadonkorjuu_alkoi IS NOT NULL), "
+        "coalesce(CAST(julianday(new.sadonkorjuu_alkoi) - julianday(new.kylvopaiva) AS INTEGER), 0)) "
+        "ON CONFLICT(vuosi, kategoria, kasvupaikka) DO UPDATE SET viljelyja = viljelyja + "
+        "excluded.viljelyja, korjattuja = korjattuja + excluded.korjattuja, epaonnistuneita = "
+        "epaonnistuneita + excluded.epaonnistuneita, kasvuaikoja = kasvuaikoja + "
+        "excluded.kasvuaikoja, kasvupaivia = kasvupaivia + excluded.kasvupaivia; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_viljelytilasto_ad AFTER DELETE ON garden_mygarden BEGIN "
+        "UPDATE garden_viljelytilasto SET viljelyja = viljelyja - 1, korjattuja = korjattuja - "
+        "(old.sadonkorjuu_alkoi IS NOT NULL OR old.tila = 'sadonkorjuu'), epaonnistuneita = "
+        "epaonnistuneita - (old.tila = 'paattynyt' AND old.sadonkorjuu_alkoi IS NULL), kasvuaikoja = "
+        "kasvuaikoja - (old.kylvopaiva IS NOT NULL AND old.sadonkorjuu_alkoi IS NOT NULL), "
+        "kasvupaivia = kasvupaivia - coalesce(CAST(julianday(old.sadonkorjuu_alkoi) - "
+        "julianday(old.kylvopaiva) AS INTEGER), 0) WHERE vuosi = CAST(strftime('%Y', "
+        "coalesce(old.kylvopaiva, old.lisatty)) AS INTEGER) AND kategoria = (SELECT kategoria FROM "
+        "garden_plantspecies WHERE id = old.kasvilaji_id) AND kasvupaikka = old.kasvupaikka; DELETE "
+        "FROM garden_viljelytilasto WHERE vuosi = CAST(strftime('%Y', coalesce(old.kylvopaiva, "
+        "old.lisatty)) AS INTEGER) AND kategoria = (SELECT kategoria FROM garden_plantspecies WHERE "
+        "id = old.kasvilaji_id) AND kasvupaikka = old.kasvupaikka AND viljelyja = 0; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_viljelytilasto_au AFTER UPDATE OF tila, kylvopaiva, "
+        "kasvilaji_id, kasvupaikka, sadonkorjuu_alkoi ON garden_mygarden WHEN old.tila IS NOT "
+        "new.tila OR old.kylvopaiva IS NOT new.kylvopaiva OR old.kasvilaji_id IS NOT new.kasvilaji_id"
+        " OR old.kasvupaikka IS NOT new.kasvupaikka OR old.sadonkorjuu_alkoi IS NOT "
+        "new.sadonkorjuu_alkoi BEGIN UPDATE garden_viljelytilasto SET viljelyja = viljelyja - 1, "
+        "korjattuja = korjattuja - (old.sadonkorjuu_alkoi IS NOT NULL OR old.tila = 'sadonkorjuu'), "
+        "epaonnistuneita = epaonnistuneita - (old.tila = 'paattynyt' AND old.sadonkorjuu_alkoi IS "
+        "NULL), kasvuaikoja = kasvuaikoja - (old.kylvopaiva IS NOT NULL AND old.sadonkorjuu_alkoi IS "
+        "NOT NULL), kasvupaivia = kasvupaivia - coalesce(CAST(julianday(old.sadonkorjuu_alkoi) - "
+        "julianday(old.kylvopaiva) AS INTEGER), 0) WHERE vuosi = CAST(strftime('%Y', "
+        "coalesce(old.kylvopaiva, old.lisatty)) AS INTEGER) AND kategoria = (SELECT kategoria FROM "
+        "garden_plantspecies WHERE id = old.kasvilaji_id) AND kasvupaikka = old.kasvupaikka; DELETE "
+        "FROM garden_viljelytilasto WHERE vuosi = CAST(strftime('%Y', coalesce(old.kylvopaiva, "
+        "old.lisatty)) AS INTEGER) AND kategoria = (SELECT kategoria FROM garden_plantspecies WHERE "
+        "id = old.kasvilaji_id) AND kasvupaikka = old.kasvupaikka AND viljelyja = 0; INSERT INTO "
+        "garden_viljelytilasto(vuosi, kategoria, kasvupaikka, viljelyja, korjattuja, epaonnistuneita,"
+        " kasvuaikoja, kasvupaivia) VALUES (CAST(strftime('%Y', coalesce(new.kylvopaiva, "
+        "new.lisatty)) AS INTEGER), (SELECT kategoria FROM garden_plantspecies WHERE id = "
+        "new.kasvilaji_id), new.kasvupaikka, 1, (new.sadonkorjuu_alkoi IS NOT NULL OR new.tila = "
+        "'sadonkorjuu'), (new.tila = 'paattynyt' AND new.sadonkorjuu_alkoi IS NULL), (new.kylvopaiva "
+        "IS NOT NULL AND new.sadonkorjuu_alkoi IS NOT NULL), "
+        "coalesce(CAST(julianday(new.sadonkorjuu_alkoi) - julianday(new.kylvopaiva) AS INTEGER), 0)) "
+        "ON CONFLICT(vuosi, kategoria, kasvupaikka) DO UPDATE SET viljelyja = viljelyja + "
+        "excluded.viljelyja, korjattuja = korjattuja + excluded.korjattuja, epaonnistuneita = "
+        "epaonnistuneita + excluded.epaonnistuneita, kasvuaikoja = kasvuaikoja + "
+        "excluded.kasvuaikoja, kasvupaivia = kasvupaivia + excluded.kasvupaivia; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_viljelytilasto_lu AFTER UPDATE OF kategoria ON "
+        "garden_plantspecies WHEN old.kategoria IS NOT new.kategoria BEGIN DELETE FROM "
+        "garden_viljelytilasto WHERE kategoria IN (old.kategoria, new.kategoria); INSERT INTO "
+        "garden_viljelytilasto(vuosi, kategoria, kasvupaikka, viljelyja, korjattuja, epaonnistuneita,"
+        " kasvuaikoja, kasvupaivia) SELECT CAST(strftime('%Y', coalesce(v.kylvopaiva, v.lisatty)) AS "
+        "INTEGER), l.kategoria, v.kasvupaikka, SUM(1), SUM((v.sadonkorjuu_alkoi IS NOT NULL OR v.tila"
+        " = 'sadonkorjuu')), SUM((v.tila = 'paattynyt' AND v.sadonkorjuu_alkoi IS NULL)), "
+        "SUM((v.kylvopaiva IS NOT NULL AND v.sadonkorjuu_alkoi IS NOT NULL)), "
+        "SUM(coalesce(CAST(julianday(v.sadonkorjuu_alkoi) - julianday(v.kylvopaiva) AS INTEGER), 0)) "
+        "FROM garden_mygarden v JOIN garden_plantspecies l ON l.id = v.kasvilaji_id WHERE l.kategoria"
+        " IN (old.kategoria, new.kategoria) GROUP BY 1, 2, 3; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_viljelytilasto_versio_ai AFTER INSERT ON "
+        "garden_viljelytilasto BEGIN INSERT INTO garden_tietoversio(taulu, versio, muutettu) VALUES "
+        "('garden_viljelytilasto', 1, CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = "
+        "versio + 1, muutettu = CURRENT_TIMESTAMP; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_viljelytilasto_versio_au AFTER UPDATE ON "
+        "garden_viljelytilasto BEGIN INSERT INTO garden_tietoversio(taulu, versio, muutettu) VALUES "
+        "('garden_viljelytilasto', 1, CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = "
+        "versio + 1, muutettu = CURRENT_TIMESTAMP; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS garden_viljelytilasto_versio_ad AFTER DELETE ON "
+        "garden_viljelytilasto BEGIN INSERT INTO garden_tietoversio(taulu, versio, muutettu) VALUES "
+        "('garden_viljelytilasto', 1, CURRENT_TIMESTAMP) ON CONFLICT(taulu) DO UPDATE SET versio = "
+        "versio + 1, muutettu = CURRENT_TIMESTAMP; END"
+    ),
+]
+
+POISTA = [
+    "DROP TRIGGER IF EXISTS garden_viljelytilasto_ai",
+    "DROP TRIGGER IF EXISTS garden_viljelytilasto_ad",
+    "DROP TRIGGER IF EXISTS garden_viljelytilasto_au",
+    "DROP TRIGGER IF EXISTS garden_viljelytilasto_lu",
+    "DROP TRIGGER IF EXISTS garden_viljelytilasto_versio_ai",
+    "DROP TRIGGER IF EXISTS garden_viljelytilasto_versio_au",
+    "DROP TRIGGER IF EXISTS garden_viljelytilasto_versio_ad",
+]
+
+# Yhteenvetotaulun täyttö olemassa olevista viljelyistä
+TAYTA = [
+    "DELETE FROM garden_viljelytilasto",
+    (
+        "INSERT INTO garden_viljelytilasto(vuosi, kategoria, kasvupaikka, viljelyja, korjattuja, "
+        "epaonnistuneita, kasvuaikoja, kasvupaivia) SELECT CAST(strftime('%Y', coalesce(v.kylvopaiva,"
+        " v.lisatty)) AS INTEGER), l.kategoria, v.kasvupaikka, SUM(1), SUM((v.sadonkorjuu_alkoi IS "
+        "NOT NULL OR v.tila = 'sadonkorjuu')), SUM((v.tila = 'paattynyt' AND v.sadonkorjuu_alkoi IS "
+        "NULL)), SUM((v.kylvopaiva IS NOT NULL AND v.sadonkorjuu_alkoi IS NOT NULL)), "
+        "SUM(coalesce(CAST(julianday(v.sadonkorjuu_alkoi) - julianday(v.kylvopaiva) AS INTEGER), 0)) "
+        "FROM garden_mygarden v JOIN garden_plantspecies l ON l.id = v.kasvilaji_id WHERE 1 GROUP BY "
+        "1, 2, 3"
+    ),
+]
+
+
+def luo_triggerit(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for lause in LUO + TAYTA:
+        schema_editor.execute(lause)
+
+
+def poista_triggerit(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for lause in POISTA:
+        schema_editor.execute(lause)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garden', '0013_mittaukset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mygarden',
+            name='sadonkorjuu_alkoi',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Sadonkorjuu alkoi'),
+        ),
+        migrations.CreateModel(
+            name='ViljelyTilasto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vuosi', models.PositiveSmallIntegerField(verbose_name='Kausi')),
+                ('kategoria', models.CharField(max_length=50, verbose_name='Kategoria')),
+                ('kasvupaikka', models.CharField(max_length=100, verbose_name='Kasvupaikka')),
+                ('viljelyja', models.PositiveIntegerField(verbose_name='Viljelyjä')),
+                ('korjattuja', models.PositiveIntegerField(verbose_name='Korjattuja')),
+                ('epaonnistuneita', models.PositiveIntegerField(verbose_name='Epäonnistuneita')),
+                ('kasvuaikoja', models.PositiveIntegerField(verbose_name='Kasvuaikoja')),
+                ('kasvupaivia', models.IntegerField(verbose_name='Kasvupäiviä')),
+            ],
+            options={
+                'verbose_name': 'Viljelytilasto',
+                'verbose_name_plural': 'Viljelytilastot',
+                'constraints': [models.UniqueConstraint(fields=('vuosi', 'kategoria', 'kasvupaikka'), name='viljelytilasto_uniq')],
+            },
+        ),
+        migrations.RunPython(luo_triggerit, poista_triggerit),
+    ]
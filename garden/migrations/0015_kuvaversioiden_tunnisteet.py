@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+
+def tee_versiot_uudelleen(apps, schema_editor):
+    """Vanhojen versioiden nimissä ei ole tiivistettä: tehdään ne uudelleen."""
+    Kuva = apps.get_model('garden', 'Kuva')
+    Tyo = apps.get_model('garden', 'Tyo')
+    if Kuva.objects.filter(tila='valmis').update(tila='kasittelematta'):
+        Tyo.objects.create(tehtava='tee_kuvaversiot', parametrit={})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garden', '0014_tilastot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kuva',
+            name='versiot',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Versiot'),
+        ),
+        migrations.RunPython(tee_versiot_uudelleen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:30
+
+from django.db import migrations
+
+LUO = [
+    "CREATE TRIGGER IF NOT EXISTS garden_gardennote_laskurit_ad AFTER DELETE ON garden_gardennote "
+    "BEGIN UPDATE garden_mygarden SET havaintoja = havaintoja - 1, viimeisin_havainto = ("
+    "SELECT MAX(paivamaara) FROM garden_gardennote WHERE kasvi_id = old.kasvi_id"
+    ") WHERE id = old.kasvi_id; END",
+]
+POISTA = ['DROP TRIGGER IF EXISTS garden_gardennote_laskurit_ad']
+
+
+def luo_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for lause in LUO:
+        schema_editor.execute(lause)
+
+
+def poista_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for lause in POISTA:
+        schema_editor.execute(lause)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garden', '0015_kuvaversioiden_tunnisteet'),
+    ]
+
+    operations = [
+        migrations.RunPython(luo_trigger, poista_trigger),
+    ]
@@ -0,0 +1,181 @@
+"""Mittausten päivä-, viikko- ja kausikoosteet kaavioita varten.
+
+``Mittaus``-rivit ovat raakapisteitä. Jokaisesta lisäyksestä päivitetään
+SQLite-triggereillä kolme ``MittausKooste``-riviä (päivä, viikko, kausi)
+``ON CONFLICT``-päivityksellä; muutos ja poisto laskevat vanhan ja uuden
+jakson uudelleen indeksin (viljely, suure, päivä) väliltä. Triggerit
+kattavat myös ``bulk_create``-, ``update``- ja ``delete``-polut.
+
+Kaavio luetaan aina koosteista: taso valitaan aikavälin pituuden mukaan ja
+liian pitkä sarja yhdistetään vierekkäisistä jaksoista, joten monen
+vuoden kaaviokaan ei lue raakapisteitä.
+"""
+import math
+from datetime import date, timedelta
+
+from django.db import connection, transaction
+
+from .models import Mittaus, MittausKooste
+
+# Rajapinnan suureet: tunniste → (suure, yksikkö, kaavion arvo jaksolle)
+SUUREET = {
+    'korkeus': (Mittaus.KORKEUS, 'cm', 'keskiarvo'),
+    'hedelmat': (Mittaus.HEDELMAT, 'kpl', 'suurin'),
+    'sato': (Mittaus.SATO, 'g', 'summa'),
+}
+# Kaavion valitsin: (tunniste, suure, nimi)
+SUUREVALINNAT = [
+    (tunniste, suure, dict(Mittaus.SUURE_CHOICES)[suure])
+    for tunniste, (suure, _, _) in SUUREET.items()
+]
+TASOT = {
+    MittausKooste.PAIVA: 'paiva',
+    MittausKooste.VIIKKO: 'viikko',
+    MittausKooste.KAUSI: 'kausi',
+}
+
+PISTEITA = 200
+PISTEITA_MAX = 1000
+
+
+def _taulut():
+    return Mittaus._meta.db_table, MittausKooste._meta.db_table
+
+
+def jakso_sql(taso, paiva):
+    """SQL-lausekkeet jakson ensimmäiselle ja viimeiselle päivälle."""
+    if taso == MittausKooste.PAIVA:
+        return paiva, paiva
+    if taso == MittausKooste.VIIKKO:
+        alku = (
+            f"date({paiva}, '-' || ((CAST(strftime('%w', {paiva}) AS INTEGER) + 6) % 7) "
+            f"|| ' days')"
+        )
+        return alku, f"date({alku}, '+6 days')"
+    return f"strftime('%Y-01-01', {paiva})", f"strftime('%Y-12-31', {paiva})"
+
+
+def jakson_alku(taso, paiva):
+    """Kuten ``jakso_sql``, mutta Pythonin päivämäärälle."""
+    if taso == MittausKooste.PAIVA:
+        return paiva
+    if taso == MittausKooste.VIIKKO:
+        return paiva - timedelta(days=paiva.weekday())
+    return date(paiva.year, 1, 1)
+
+
+def _koosta_sql(taso, ehto, ryhmittely):
+    """INSERT ... SELECT, joka koostaa ehdon mukaiset mittaukset tasolle."""
+    mittaus, kooste = _taulut()
+    alku, _ = jakso_sql(taso, 'paivamaara')
+    return (
+        f"INSERT INTO {kooste}(viljely_id, suure, taso, alku, maara, summa, pienin, suurin) "
+        f"SELECT viljely_id, suure, {taso}, {alku}, COUNT(*), SUM(arvo), MIN(arvo), MAX(arvo) "
+        f"FROM {mittaus} WHERE {ehto} GROUP BY {ryhmittely}"
+    )
+
+
+def _laske_jaksot_uudelleen(rivi):
+    """Trigger-lauseet, jotka laskevat rivin (old/new) jaksot uudelleen."""
+    _, kooste = _taulut()
+    lauseet = []
+    for taso in TASOT:
+        alku, loppu = jakso_sql(taso, f'{rivi}.paivamaara')
+        sarja = f'viljely_id = {rivi}.viljely_id AND suure = {rivi}.suure'
+        lauseet += [
+            f"DELETE FROM {kooste} WHERE {sarja} AND taso = {taso} AND alku = {alku};",
+            _koosta_sql(
+                taso, f'{sarja} AND paivamaara BETWEEN {alku} AND {loppu}',
+                'viljely_id, suure',
+            ) + ';',
+        ]
+    return ' '.join(lauseet)
+
+
+def luo_triggerit_sql():
+    """Palauttaa koosteiden ylläpitotriggerien luontilauseet (idempotentit)."""
+    mittaus, kooste = _taulut()
+    lisays = []
+    for taso in TASOT:
+        alku, _ = jakso_sql(taso, 'new.paivamaara')
+        lisays.append(
+            f"INSERT INTO {kooste}(viljely_id, suure, taso, alku, maara, summa, pienin, suurin) "
+            f"VALUES (new.viljely_id, new.suure, {taso}, {alku}, 1, new.arvo, new.arvo, new.arvo) "
+            f"ON CONFLICT(viljely_id, suure, taso, alku) DO UPDATE SET "
+            f"maara = maara + 1, summa = summa + excluded.summa, "
+            f"pienin = min(pienin, excluded.pienin), suurin = max(suurin, excluded.suurin);"
+        )
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {kooste}_ai AFTER INSERT ON {mittaus} BEGIN "
+        f"{' '.join(lisays)} END",
+        f"CREATE TRIGGER IF NOT EXISTS {kooste}_ad AFTER DELETE ON {mittaus} BEGIN "
+        f"{_laske_jaksot_uudelleen('old')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {kooste}_au AFTER UPDATE ON {mittaus} BEGIN "
+        f"{_laske_jaksot_uudelleen('old')} {_laske_jaksot_uudelleen('new')} END",
+    ]
+
+
+def poista_triggerit_sql():
+    _, kooste = _taulut()
+    return [f'DROP TRIGGER IF EXISTS {kooste}_{t}' for t in ('ai', 'ad', 'au')]
+
+
+def rakenna_koosteet():
+    """Laskee kaikki koosteet raakapisteistä; palauttaa koosterivien määrän."""
+    _, kooste = _taulut()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {kooste}')
+        for taso in TASOT:
+            alku, _ = jakso_sql(taso, 'paivamaara')
+            cursor.execute(_koosta_sql(taso, '1', f'viljely_id, suure, {alku}'))
+    return MittausKooste.objects.count()
+
+
+def _yhdista(rivit):
+    """Yhdistää vierekkäisten jaksojen koosteet yhdeksi."""
+    return {
+        'alku': rivit[0]['alku'],
+        'maara': sum(r['maara'] for r in rivit),
+        'summa': sum(r['summa'] for r in rivit),
+        'pienin': min(r['pienin'] for r in rivit),
+        'suurin': max(r['suurin'] for r in rivit),
+    }
+
+
+def _valitse_taso(alku, loppu, pisteita):
+    """Tarkin taso, jolla välin jaksoja on enintään ``pisteita``."""
+    for taso in (MittausKooste.PAIVA, MittausKooste.VIIKKO):
+        jaksoja = (jakson_alku(taso, loppu) - jakson_alku(taso, alku)).days
+        if taso == MittausKooste.VIIKKO:
+            jaksoja //= 7
+        if jaksoja + 1 <= pisteita:
+            return taso
+    return MittausKooste.KAUSI
+
+
+def kaaviodata(viljely_id, suure, alku=None, loppu=None, pisteita=PISTEITA):
+    """Palauttaa sarjan (taso, pisteet) enintään ``pisteita`` pisteenä.
+
+    Taso on tarkin, jolla välin jaksot mahtuvat pistemäärään; puuttuva
+    ``alku``/``loppu`` otetaan sarjan ensimmäisestä/viimeisestä päivästä.
+    Jokainen piste kattaa ``maara``, ``summa``, ``pienin``, ``suurin`` ja
+    ``keskiarvo``-arvot jaksoltaan.
+    """
+    sarja = MittausKooste.objects.filter(viljely_id=viljely_id, suure=suure)
+    paivat = sarja.filter(taso=MittausKooste.PAIVA).values_list('alku', flat=True)
+    alku = alku or paivat.order_by('alku').first()
+    loppu = loppu or paivat.order_by('-alku').first()
+    if alku is None or loppu is None or alku > loppu:
+        return MittausKooste.PAIVA, []
+
+    taso = _valitse_taso(alku, loppu, pisteita)
+    rivit = list(
+        sarja.filter(taso=taso, alku__gte=jakson_alku(taso, alku), alku__lte=loppu)
+        .order_by('alku').values('alku', 'maara', 'summa', 'pienin', 'suurin')
+    )
+    if len(rivit) > pisteita:
+        koko = math.ceil(len(rivit) / pisteita)
+        rivit = [_yhdista(rivit[i:i + koko]) for i in range(0, len(rivit), koko)]
+    for rivi in rivit:
+        rivi['keskiarvo'] = rivi['summa'] / rivi['maara']
+    return taso, rivit
@@ -1,5 +1,67 @@
 """Puutarhapäiväkirjan tietomallit."""
+from datetime import timedelta
+
 from django.db import models
+from django.db.models import Case, Count, F, Max, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce, Collate
+from django.db.models.lookups import GreaterThan
+from django.urls import reverse
+from django.utils import timezone
+
+
+def kuukausimaski(alku, loppu):
+    """Palauttaa kuukausivälin 12-bittisenä maskina (bitti 0 = tammikuu).
+
+    Vuodenvaihteen yli menevä väli (esim. 11–2) kiertää tammikuuhun.
+    """
+    if not alku or not loppu:
+        return 0
+    if alku <= loppu:
+        kuukaudet = range(alku, loppu + 1)
+    else:
+        kuukaudet = list(range(alku, 13)) + list(range(1, loppu + 1))
+    maski = 0
+    for kk in kuukaudet:
+        maski |= 1 << (kk - 1)
+    return maski
+
+
+def kasvumaski(kylvo_loppu, sato_alku):
+    """Palauttaa kylvön ja sadon väliin jäävien kasvukuukausien maskin."""
+    if not kylvo_loppu or not sato_alku or kylvo_loppu + 1 >= sato_alku:
+        return 0
+    return kuukausimaski(kylvo_loppu + 1, sato_alku - 1)
+
+
+def kasvuaika(kylvo_alku, sato_alku):
+    """Arvioitu kasvuaika kylvöstä sadon alkuun (30 pv/kk, oletus 90 pv)."""
+    if not kylvo_alku or not sato_alku or sato_alku <= kylvo_alku:
+        return timedelta(days=90)
+    return timedelta(days=(sato_alku - kylvo_alku) * 30)
+
+
+def kk_bitti(kk):
+    """Palauttaa kuukauden (1-12) bitin maskissa."""
+    return 1 << (int(kk) - 1)
+
+
+class PlantSpeciesQuerySet(models.QuerySet):
+    """Kasvilajien kuukausihaut bittimaskeilla tietokannan puolella."""
+
+    def _kuukaudessa(self, kentta, kk):
+        return self.filter(GreaterThan(F(kentta).bitand(kk_bitti(kk)), 0))
+
+    def kylvettavissa(self, kk):
+        """Lajit, joita voi kylvää kuukaudessa kk."""
+        return self._kuukaudessa('kylvo_maski', kk)
+
+    def kasvussa(self, kk):
+        """Lajit, jotka ovat kuukaudessa kk kylvön ja sadon välissä."""
+        return self._kuukaudessa('kasvu_maski', kk)
+
+    def korjattavissa(self, kk):
+        """Lajit, joiden satoa voi korjata kuukaudessa kk."""
+        return self._kuukaudessa('sato_maski', kk)
 
 
 class PlantSpecies(models.Model):
@@ -38,16 +100,72 @@ class PlantSpecies(models.Model):
     )
     nelson_garden_url = models.URLField('Nelson Garden URL', blank=True, default='')
 
+    # Kuukausimaskit (bitti 0 = tammikuu), lasketaan aikataulukentistä tallennettaessa
+    kylvo_maski = models.PositiveSmallIntegerField('Kylvökuukaudet', default=0, editable=False)
+    kasvu_maski = models.PositiveSmallIntegerField('Kasvukuukaudet', default=0, editable=False)
+    sato_maski = models.PositiveSmallIntegerField('Satokuukaudet', default=0, editable=False)
+    kasvuaika = models.DurationField('Kasvuaika', default=timedelta(days=90), editable=False)
+    # Viimeksi synkronoidun tuotesyötteen rivin tiiviste (garden.luettelo);
+    # paikallinen tallennus tyhjentää sen, jolloin syöte kirjoitetaan uudelleen
+    sisalto_tiiviste = models.CharField(
+        'Sisällön tiiviste', max_length=64, blank=True, default='', editable=False,
+    )
+
+    objects = PlantSpeciesQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Kasvilaji'
         verbose_name_plural = 'Kasvilajit'
         ordering = ['kategoria', 'nimi']
+        indexes = [
+            # Kasvilistan järjestys ja kategoriasuodatus sekä distinct-kategoriat
+            models.Index(fields=['kategoria', 'nimi', 'id'], name='kasvilaji_kategoria_idx'),
+            # Adminin etuliitehaut (istartswith = LIKE 'x%', kirjainkoosta riippumaton)
+            models.Index(Collate('nimi', 'NOCASE'), name='kasvilaji_nimi_nocase_idx'),
+            models.Index(Collate('lajike', 'NOCASE'), name='kasvilaji_lajike_nocase_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['nimi', 'lajike'], name='kasvilaji_nimi_lajike_uniq'),
+            # Luettelon synkronoinnin avain
+            models.UniqueConstraint(
+                fields=['nelson_garden_id'], name='kasvilaji_nelson_garden_id_uniq',
+                condition=~models.Q(nelson_garden_id=''),
+            ),
+        ]
 
     def __str__(self):
         if self.lajike:
             return f"{self.nimi} '{self.lajike}'"
         return self.nimi
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        laji = super().from_db(db, field_names, values)
+        # Tallennettaessa verrataan, muuttuiko kasvuaika (→ satoarviot)
+        laji._tallennettu_kasvuaika = laji.__dict__.get('kasvuaika')
+        return laji
+
+    def save(self, *args, **kwargs):
+        self.paivita_maskit()
+        self.sisalto_tiiviste = ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {
+                'kylvo_maski', 'kasvu_maski', 'sato_maski', 'kasvuaika', 'sisalto_tiiviste',
+            }
+        uusi = self._state.adding
+        super().save(*args, **kwargs)
+        if not uusi and getattr(self, '_tallennettu_kasvuaika', None) != self.kasvuaika:
+            self.viljelyt.paivita_satoarviot()
+        self._tallennettu_kasvuaika = self.kasvuaika
+
+    def paivita_maskit(self):
+        """Laskee kuukausimaskit ja kasvuajan aikataulukentistä."""
+        self.kylvo_maski = kuukausimaski(self.kylvo_alku_kk, self.kylvo_loppu_kk)
+        self.kasvu_maski = kasvumaski(self.kylvo_loppu_kk, self.sato_alku_kk)
+        self.sato_maski = kuukausimaski(self.sato_alku_kk, self.sato_loppu_kk)
+        self.kasvuaika = kasvuaika(self.kylvo_alku_kk, self.sato_alku_kk)
+
     def kylvo_kuukaudet(self):
         """Palauttaa listan kylvökuukausista."""
         if self.kylvo_alku_kk <= self.kylvo_loppu_kk:
@@ -61,6 +179,80 @@ class PlantSpecies(models.Model):
         return list(range(self.sato_alku_kk, 13)) + list(range(1, self.sato_loppu_kk + 1))
 
 
+def satoarvio(kylvopaiva, lajin_kasvuaika):
+    """Arvioitu sadon alkamispäivä tai None, jos kylvöpäivä puuttuu."""
+    if kylvopaiva is None:
+        return None
+    return kylvopaiva + lajin_kasvuaika
+
+
+def satoarvio_lauseke():
+    """``satoarvio`` SQL-lausekkeena: kylvöpäivä + lajin kasvuaika."""
+    lajin_kasvuaika = Subquery(
+        PlantSpecies.objects.filter(pk=OuterRef('kasvilaji_id')).values('kasvuaika')
+    )
+    return Cast(F('kylvopaiva') + lajin_kasvuaika, models.DateField())
+
+
+class MyGardenQuerySet(models.QuerySet):
+    """Viljelyjen kyselyt, satoarviot ja havaintolaskurien ylläpito."""
+
+    def tulevat_sadot(self, alku, loppu):
+        """Käynnissä olevat viljelyt, joiden arvioitu sato osuu väliin."""
+        return (
+            self.exclude(tila='paattynyt')
+            .filter(arvioitu_sato__range=(alku, loppu))
+            .order_by('arvioitu_sato', 'id')
+        )
+
+    def paivita_satoarviot(self):
+        """Laskee arvioidun sadon uudelleen yhdellä UPDATElla."""
+        return self.update(arvioitu_sato=satoarvio_lauseke())
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Massalisäys, joka laskee satoarviot lajien kasvuajoista."""
+        objs = list(objs)
+        laji_idt = {obj.kasvilaji_id for obj in objs if obj.kylvopaiva}
+        kasvuajat = dict(
+            PlantSpecies.objects.filter(pk__in=laji_idt).values_list('pk', 'kasvuaika')
+        ) if laji_idt else {}
+        tanaan = timezone.localdate()
+        for obj in objs:
+            obj.arvioitu_sato = satoarvio(obj.kylvopaiva, kasvuajat.get(obj.kasvilaji_id))
+            if obj.tila == 'sadonkorjuu' and obj.sadonkorjuu_alkoi is None:
+                obj.sadonkorjuu_alkoi = tanaan
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def tasaa_havaintolaskurit(self):
+        """Laskee havaintomäärän ja viimeisimmän päivän havainnoista uudelleen.
+
+        Yksi UPDATE korreloiduilla alikyselyillä; palauttaa rivimäärän.
+        """
+        havainnot = GardenNote.objects.filter(kasvi=OuterRef('pk')).order_by()
+        return self.update(
+            havaintoja=Coalesce(
+                Subquery(havainnot.values('kasvi').annotate(n=Count('pk')).values('n')),
+                0,
+            ),
+            viimeisin_havainto=Subquery(
+                havainnot.values('kasvi').annotate(m=Max('paivamaara')).values('m')
+            ),
+        )
+
+    def havainto_lisatty(self, paivamaara, maara=1):
+        """Kasvattaa laskuria atomisesti ja siirtää viimeisintä päivää eteenpäin."""
+        return self.update(
+            havaintoja=F('havaintoja') + maara,
+            viimeisin_havainto=Case(
+                When(
+                    Q(viimeisin_havainto__isnull=True) | Q(viimeisin_havainto__lt=paivamaara),
+                    then=Value(paivamaara),
+                ),
+                default=F('viimeisin_havainto'),
+            ),
+        )
+
+
 class MyGarden(models.Model):
     """Oma viljelymerkintä."""
 
@@ -88,23 +280,86 @@ class MyGarden(models.Model):
     muistiinpanot = models.TextField('Muistiinpanot', blank=True, default='')
     lisatty = models.DateTimeField('Lisätty', auto_now_add=True)
 
+    # Kylvöpäivästä ja lajin kasvuajasta laskettu; ylläpidetään save()issa,
+    # bulk_createssa ja lajin aikataulun muuttuessa (paivita_satoarviot)
+    arvioitu_sato = models.DateField(
+        'Arvioitu sato', blank=True, null=True, editable=False
+    )
+
+    # Päivä, jona tila ensimmäisen kerran vaihtui sadonkorjuuksi; ylläpidetään
+    # save()issa, bulk_createssa ja massatilamuutoksessa (views.paivita_tilat)
+    sadonkorjuu_alkoi = models.DateField(
+        'Sadonkorjuu alkoi', blank=True, null=True, editable=False
+    )
+
+    # Havaintojen denormalisoidut laskurit; ylläpidetään F()-päivityksillä ja
+    # poistotriggerillä (garden.signals) eikä niitä koskaan kirjoiteta instanssista
+    havaintoja = models.PositiveIntegerField('Havaintoja', default=0, editable=False)
+    viimeisin_havainto = models.DateField(
+        'Viimeisin havainto', blank=True, null=True, editable=False
+    )
+
+    objects = MyGardenQuerySet.as_manager()
+
+    LASKURIT = ('havaintoja', 'viimeisin_havainto')
+
     class Meta:
         verbose_name = 'Viljelymerkintä'
         verbose_name_plural = 'Viljelymerkinnät'
         ordering = ['-lisatty']
+        indexes = [
+            # Etusivun lista: käynnissä olevat viljelyt uusimmasta alkaen
+            models.Index(
+                fields=['-lisatty', '-id'], name='viljely_aktiiviset_idx',
+                condition=~models.Q(tila='paattynyt'),
+            ),
+            # Aktiivisuusjärjestys: viimeksi havainnoidut ensin
+            models.Index(fields=['-viimeisin_havainto', '-id'], name='viljely_aktiivisuus_idx'),
+            # Tulevat sadot: käynnissä olevat viljelyt arvioidun sadon mukaan
+            models.Index(
+                fields=['arvioitu_sato', 'id'], name='viljely_satoarvio_idx',
+                condition=~models.Q(tila='paattynyt'),
+            ),
+            # Adminin muutoslista kaikista viljelyistä ja kasvupaikan etuliitehaku
+            models.Index(fields=['-lisatty', '-id'], name='viljely_lisatty_idx'),
+            models.Index(Collate('kasvupaikka', 'NOCASE'), name='viljely_kasvupaikka_idx'),
+        ]
 
     def __str__(self):
         return f"{self.kasvilaji} — {self.get_tila_display()}"
 
-    def arvioitu_sato(self):
-        """Laskee arvioidun sadon alkamispäivän kylvöpäivästä."""
-        if self.kylvopaiva and self.kasvilaji:
-            from datetime import timedelta
-            kasvuaika = (self.kasvilaji.sato_alku_kk - self.kasvilaji.kylvo_alku_kk) * 30
-            if kasvuaika <= 0:
-                kasvuaika = 90  # oletusarvo
-            return self.kylvopaiva + timedelta(days=kasvuaika)
-        return None
+    def save(self, *args, **kwargs):
+        # Olemassa olevan rivin tallennus ei saa ylikirjoittaa laskureita
+        # muistissa olevilla, mahdollisesti vanhentuneilla arvoilla.
+        update_fields = kwargs.get('update_fields')
+        if not self._state.adding and update_fields is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.LASKURIT
+            ]
+        if update_fields is None or {'kylvopaiva', 'kasvilaji'} & set(update_fields):
+            self.arvioitu_sato = satoarvio(
+                self.kylvopaiva, self.kasvilaji.kasvuaika if self.kylvopaiva else None,
+            )
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'arvioitu_sato'}
+        if self.tila == 'sadonkorjuu' and self.sadonkorjuu_alkoi is None:
+            self.sadonkorjuu_alkoi = timezone.localdate()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'sadonkorjuu_alkoi'}
+        super().save(*args, **kwargs)
+
+
+class GardenNoteQuerySet(models.QuerySet):
+    """Havaintojen kyselyt."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Massalisäys, joka päivittää viljelyjen havaintolaskurit perään."""
+        objs = super().bulk_create(objs, *args, **kwargs)
+        kasvi_idt = {obj.kasvi_id for obj in objs}
+        if kasvi_idt:
+            MyGarden.objects.filter(pk__in=kasvi_idt).tasaa_havaintolaskurit()
+        return objs
 
 
 class GardenNote(models.Model):
@@ -116,11 +371,267 @@ class GardenNote(models.Model):
     )
     paivamaara = models.DateField('Päivämäärä')
     havainto = models.TextField('Havainto')
+    kuvat = models.ManyToManyField(
+        'Kuva', blank=True, verbose_name='Kuvat', related_name='havainnot',
+    )
+
+    objects = GardenNoteQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Havainto'
         verbose_name_plural = 'Havainnot'
         ordering = ['-paivamaara']
+        indexes = [
+            models.Index(fields=['kasvi', '-paivamaara', '-id'], name='havainto_kasvi_pvm_idx'),
+            # Adminin muutoslista kaikista havainnoista
+            models.Index(fields=['-paivamaara', '-id'], name='havainto_pvm_idx'),
+        ]
 
     def __str__(self):
         return f"{self.paivamaara} — {self.havainto[:50]}"
+
+
+class Kuva(models.Model):
+    """Havaintoon liitetty kuva, tallennettu sisältönsä tiivisteellä.
+
+    Sama tiedosto tallennetaan vain kerran, vaikka se liitettäisiin moneen
+    havaintoon. Sivuilla näytetään vain valmiiksi pienennetyt versiot
+    (ks. ``garden.kuvat``), jotka taustatyö tekee lisäyksen jälkeen.
+    """
+
+    KASITTELEMATTA = 'kasittelematta'
+    VALMIS = 'valmis'
+    VIRHEELLINEN = 'virheellinen'
+    TILA_CHOICES = [
+        (KASITTELEMATTA, 'Käsittelemättä'),
+        (VALMIS, 'Valmis'),
+        (VIRHEELLINEN, 'Virheellinen'),
+    ]
+
+    tiiviste = models.CharField('SHA-256-tiiviste', max_length=64, unique=True)
+    muoto = models.CharField('Muoto', max_length=10)
+    koko = models.PositiveIntegerField('Koko (tavua)')
+    leveys = models.PositiveIntegerField('Leveys', blank=True, null=True)
+    korkeus = models.PositiveIntegerField('Korkeus', blank=True, null=True)
+    tila = models.CharField('Tila', max_length=20, choices=TILA_CHOICES, default=KASITTELEMATTA)
+    # Versio → version sisällön tiivisteen alku; kuuluu tiedoston nimeen ja
+    # osoitteeseen, joten uudelleen tehty versio saa uuden osoitteen
+    versiot = models.JSONField('Versiot', default=dict, blank=True, editable=False)
+    luotu = models.DateTimeField('Luotu', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Kuva'
+        verbose_name_plural = 'Kuvat'
+
+    def __str__(self):
+        return f"{self.tiiviste[:12]}.{self.muoto}"
+
+    @property
+    def valmis(self):
+        return self.tila == self.VALMIS
+
+    def versio_url(self, versio):
+        tunniste = self.versiot.get(versio)
+        return reverse('kuva', args=[self.tiiviste, versio, tunniste]) if tunniste else None
+
+    @property
+    def pikkukuva_url(self):
+        return self.versio_url('pikku')
+
+    @property
+    def esikatselu_url(self):
+        return self.versio_url('esikatselu')
+
+
+class Mittaus(models.Model):
+    """Viljelyn mitattu arvo, esim. korkeus tai sadon paino.
+
+    Rivi on kapea (viljely, suure, päivä, arvo). Kaaviot luetaan
+    ``MittausKooste``-taulusta, jota triggerit päivittävät jokaisen
+    lisäyksen, muutoksen ja poiston yhteydessä (ks. ``garden.mittaukset``).
+    """
+
+    KORKEUS = 1
+    HEDELMAT = 2
+    SATO = 3
+    SUURE_CHOICES = [
+        (KORKEUS, 'Korkeus (cm)'),
+        (HEDELMAT, 'Hedelmiä (kpl)'),
+        (SATO, 'Sato (g)'),
+    ]
+
+    viljely = models.ForeignKey(
+        MyGarden, on_delete=models.CASCADE,
+        verbose_name='Viljelymerkintä', related_name='mittaukset'
+    )
+    suure = models.PositiveSmallIntegerField('Suure', choices=SUURE_CHOICES)
+    paivamaara = models.DateField('Päivämäärä')
+    arvo = models.FloatField('Arvo')
+
+    class Meta:
+        verbose_name = 'Mittaus'
+        verbose_name_plural = 'Mittaukset'
+        indexes = [
+            # Koosteen uudelleenlaskenta lukee yhden jakson väliltä
+            models.Index(fields=['viljely', 'suure', 'paivamaara'], name='mittaus_sarja_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.paivamaara} {self.get_suure_display()}: {self.arvo:g}"
+
+
+class MittausKooste(models.Model):
+    """Mittausten päivä-, viikko- tai kausikooste (ks. ``garden.mittaukset``).
+
+    ``alku`` on jakson ensimmäinen päivä: viikko alkaa maanantaina ja kausi
+    on kalenterivuosi. Rivejä ei kirjoiteta sovelluksesta vaan triggereillä.
+    """
+
+    PAIVA = 1
+    VIIKKO = 2
+    KAUSI = 3
+    TASO_CHOICES = [
+        (PAIVA, 'Päivä'),
+        (VIIKKO, 'Viikko'),
+        (KAUSI, 'Kausi'),
+    ]
+
+    viljely = models.ForeignKey(
+        MyGarden, on_delete=models.CASCADE,
+        verbose_name='Viljelymerkintä', related_name='mittauskoosteet'
+    )
+    suure = models.PositiveSmallIntegerField('Suure', choices=Mittaus.SUURE_CHOICES)
+    taso = models.PositiveSmallIntegerField('Taso', choices=TASO_CHOICES)
+    alku = models.DateField('Jakson alku')
+    maara = models.PositiveIntegerField('Mittauksia')
+    summa = models.FloatField('Summa')
+    pienin = models.FloatField('Pienin')
+    suurin = models.FloatField('Suurin')
+
+    class Meta:
+        verbose_name = 'Mittauskooste'
+        verbose_name_plural = 'Mittauskoosteet'
+        constraints = [
+            # Triggerien ON CONFLICT -avain ja kaavion hakuindeksi
+            models.UniqueConstraint(
+                fields=['viljely', 'suure', 'taso', 'alku'], name='mittauskooste_jakso_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_taso_display()} {self.alku}: {self.maara} mittausta"
+
+
+class ViljelyTilasto(models.Model):
+    """Viljelyjen yhteenveto kausittain, kategorioittain ja kasvupaikoittain.
+
+    Tilastosivu luetaan tästä taulusta (ks. ``garden.tilastot``). Kausi on
+    kylvöpäivän vuosi tai, jos kylvöpäivää ei ole, lisäysvuosi. Rivejä ei
+    kirjoiteta sovelluksesta vaan triggereillä.
+    """
+
+    vuosi = models.PositiveSmallIntegerField('Kausi')
+    kategoria = models.CharField('Kategoria', max_length=50)
+    kasvupaikka = models.CharField('Kasvupaikka', max_length=100)
+    viljelyja = models.PositiveIntegerField('Viljelyjä')
+    # Sadonkorjuuseen asti ehtineet ja ilman satoa päättyneet
+    korjattuja = models.PositiveIntegerField('Korjattuja')
+    epaonnistuneita = models.PositiveIntegerField('Epäonnistuneita')
+    # Kylvöstä sadonkorjuuseen: päivien summa ja viljelyt, joilla molemmat päivät
+    kasvuaikoja = models.PositiveIntegerField('Kasvuaikoja')
+    kasvupaivia = models.IntegerField('Kasvupäiviä')
+
+    class Meta:
+        verbose_name = 'Viljelytilasto'
+        verbose_name_plural = 'Viljelytilastot'
+        constraints = [
+            # Triggerien ON CONFLICT -avain
+            models.UniqueConstraint(
+                fields=['vuosi', 'kategoria', 'kasvupaikka'], name='viljelytilasto_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.vuosi} {self.kategoria} / {self.kasvupaikka or '–'}: {self.viljelyja}"
+
+
+class TietoVersio(models.Model):
+    """Taulukohtainen muutoslaskuri ja viimeisin muutosaika.
+
+    Tietokantatriggerit kasvattavat laskuria jokaisessa taulun lisäyksessä,
+    muutoksessa ja poistossa (ks. ``garden.versiot``). Laskureista
+    johdetaan ETagit ja Last-Modified-otsakkeet ilman raskaita kyselyitä.
+    """
+
+    taulu = models.CharField('Taulu', max_length=100, primary_key=True)
+    versio = models.PositiveBigIntegerField('Versio', default=0)
+    muutettu = models.DateTimeField('Muutettu', blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Tietoversio'
+        verbose_name_plural = 'Tietoversiot'
+
+    def __str__(self):
+        return f"{self.taulu} v{self.versio}"
+
+
+class Tyo(models.Model):
+    """Taustatyö tietokantajonossa (ks. ``garden.tyot``)."""
+
+    JONOSSA = 'jonossa'
+    KAYNNISSA = 'kaynnissa'
+    VALMIS = 'valmis'
+    EPAONNISTUI = 'epaonnistui'
+    TILA_CHOICES = [
+        (JONOSSA, 'Jonossa'),
+        (KAYNNISSA, 'Käynnissä'),
+        (VALMIS, 'Valmis'),
+        (EPAONNISTUI, 'Epäonnistui'),
+    ]
+
+    tehtava = models.CharField('Tehtävä', max_length=100)
+    parametrit = models.JSONField('Parametrit', default=dict, blank=True)
+    tila = models.CharField('Tila', max_length=20, choices=TILA_CHOICES, default=JONOSSA)
+    ajoaika = models.DateTimeField('Ajetaan aikaisintaan', default=timezone.now)
+    yritykset = models.PositiveSmallIntegerField('Yrityksiä', default=0)
+    enimmaisyritykset = models.PositiveSmallIntegerField('Yrityksiä enintään', default=3)
+
+    edistyminen = models.PositiveIntegerField('Tehty', default=0)
+    kokonaismaara = models.PositiveIntegerField('Yhteensä', blank=True, null=True)
+    viesti = models.CharField('Viesti', max_length=255, blank=True, default='')
+    tulos = models.JSONField('Tulos', blank=True, null=True)
+    virhe = models.TextField('Virhe', blank=True, default='')
+
+    tyontekija = models.CharField('Työntekijä', max_length=100, blank=True, default='')
+    luotu = models.DateTimeField('Luotu', auto_now_add=True)
+    aloitettu = models.DateTimeField('Aloitettu', blank=True, null=True)
+    valmistunut = models.DateTimeField('Valmistunut', blank=True, null=True)
+    # Työntekijä päivittää käynnissä olevien töidensä leiman; vanha leima
+    # tarkoittaa kaatunutta työntekijää (palauta_jumittuneet)
+    elossa = models.DateTimeField('Viimeksi elossa', blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Taustatyö'
+        verbose_name_plural = 'Taustatyöt'
+        ordering = ['-id']
+        indexes = [
+            # Seuraavan työn varaus: jonossa olevat ajoajan mukaan
+            models.Index(
+                fields=['ajoaika', 'id'], name='tyo_jono_idx',
+                condition=models.Q(tila='jonossa'),
+            ),
+            models.Index(
+                fields=['elossa'], name='tyo_kaynnissa_idx',
+                condition=models.Q(tila='kaynnissa'),
+            ),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.tehtava} ({self.get_tila_display()})"
+
+    @property
+    def prosentti(self):
+        """Valmiusaste prosentteina tai None, jos kokonaismäärää ei tiedetä."""
+        if not self.kokonaismaara:
+            return None
+        return min(100, round(100 * self.edistyminen / self.kokonaismaara))
@@ -0,0 +1,164 @@
+"""Keyset- eli seek-sivutus.
+
+Sivu haetaan järjestysavainten perusteella (``WHERE (a, b, id) > (...)``)
+OFFSETin sijaan, joten syvänkin sivun hinta pysyy samana ja kursori
+osoittaa samaan kohtaan, vaikka väliin lisättäisiin rivejä.
+
+Adminin sivunumerosivutukselle ``ArvioivaPaginator`` korvaa suurten
+taulujen ``COUNT(*)``in rivimäärän arviolla.
+"""
+import base64
+import json
+from datetime import date, datetime
+
+from django.core.paginator import Paginator
+from django.db.models import Max, Q, QuerySet
+from django.http import Http404
+from django.utils.functional import cached_property
+
+# Tätä pienemmät taulut lasketaan tarkasti
+ARVIO_RAJA = 10000
+
+
+def _arvo_jsoniksi(arvo):
+    if isinstance(arvo, (date, datetime)):
+        return arvo.isoformat()
+    return arvo
+
+
+def koodaa_kursori(arvot):
+    """Koodaa järjestysavainten arvot URL-turvalliseksi kursoriksi."""
+    data = json.dumps([_arvo_jsoniksi(a) for a in arvot], separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def pura_kursori(kursori, avainten_maara):
+    """Purkaa kursorin arvolistaksi. Virheellinen kursori antaa 404:n."""
+    try:
+        tayte = '=' * (-len(kursori) % 4)
+        arvot = json.loads(base64.urlsafe_b64decode(kursori + tayte))
+    except (ValueError, TypeError):
+        raise Http404('Virheellinen sivukursori.')
+    if not isinstance(arvot, list) or len(arvot) != avainten_maara:
+        raise Http404('Virheellinen sivukursori.')
+    return arvot
+
+
+def _avain_ehto(jarjestys, arvot, eteenpain):
+    """Rakentaa ehdon "rivi tulee kursorin jälkeen (tai ennen)"."""
+    ehto = Q()
+    yhtasuuret = {}
+    for kentta, arvo in zip(jarjestys, arvot):
+        laskeva = kentta.startswith('-')
+        nimi = kentta.lstrip('-')
+        suurempi = laskeva != eteenpain
+        ehto |= Q(**yhtasuuret, **{f"{nimi}__{'gt' if suurempi else 'lt'}": arvo})
+        yhtasuuret[nimi] = arvo
+    return ehto
+
+
+def _avaimen_arvo(rivi, kentta):
+    nimi = kentta.lstrip('-')
+    if isinstance(rivi, dict):
+        return rivi[nimi]
+    return getattr(rivi, nimi)
+
+
+def _kaanna(jarjestys):
+    return [k[1:] if k.startswith('-') else f'-{k}' for k in jarjestys]
+
+
+class KeysetSivu:
+    """Yksi sivu keyset-sivutettua kyselyä."""
+
+    def __init__(self, rivit, seuraava, edellinen):
+        self.rivit = rivit
+        self.seuraava = seuraava
+        self.edellinen = edellinen
+
+    def __iter__(self):
+        return iter(self.rivit)
+
+    def __len__(self):
+        return len(self.rivit)
+
+    @property
+    def on_muita_sivuja(self):
+        return bool(self.seuraava or self.edellinen)
+
+
+def _sivukysely(qs, jarjestys, koko, jalkeen, ennen):
+    """Palauttaa rajatun sivukyselyn ja tiedon, haetaanko taaksepäin."""
+    if ennen:
+        arvot = pura_kursori(ennen, len(jarjestys))
+        qs = qs.filter(_avain_ehto(jarjestys, arvot, eteenpain=False))
+        return qs.order_by(*_kaanna(jarjestys))[:koko + 1], True
+    qs = qs.order_by(*jarjestys)
+    if jalkeen:
+        arvot = pura_kursori(jalkeen, len(jarjestys))
+        qs = qs.filter(_avain_ehto(jarjestys, arvot, eteenpain=True))
+    return qs[:koko + 1], False
+
+
+def _kokoa_sivu(rivit, jarjestys, koko, jalkeen, taaksepain):
+    def kursori(rivi):
+        return koodaa_kursori([_avaimen_arvo(rivi, k) for k in jarjestys])
+
+    lisaa = len(rivit) > koko
+    rivit = rivit[:koko]
+    if taaksepain:
+        rivit = rivit[::-1]
+        return KeysetSivu(
+            rivit,
+            seuraava=kursori(rivit[-1]) if rivit else None,
+            edellinen=kursori(rivit[0]) if lisaa else None,
+        )
+    return KeysetSivu(
+        rivit,
+        seuraava=kursori(rivit[-1]) if lisaa else None,
+        edellinen=kursori(rivit[0]) if jalkeen and rivit else None,
+    )
+
+
+def keyset_sivu(qs, jarjestys, koko, jalkeen=None, ennen=None):
+    """Hakee sivun kyselystä ``qs`` järjestyksessä ``jarjestys``.
+
+    ``jarjestys`` on lista kenttiä (``-`` = laskeva), jonka viimeisen
+    kentän on oltava yksikäsitteinen (tyypillisesti ``id``). ``jalkeen``
+    ja ``ennen`` ovat edellisen sivun palauttamia kursoreita. Rivit voivat
+    olla malli-instansseja tai ``values()``-sanakirjoja.
+    """
+    sivukysely, taaksepain = _sivukysely(qs, jarjestys, koko, jalkeen, ennen)
+    return _kokoa_sivu(list(sivukysely), jarjestys, koko, jalkeen, taaksepain)
+
+
+async def akeyset_sivu(qs, jarjestys, koko, jalkeen=None, ennen=None):
+    """Asynkroninen ``keyset_sivu`` (``async for`` -haku)."""
+    sivukysely, taaksepain = _sivukysely(qs, jarjestys, koko, jalkeen, ennen)
+    rivit = [rivi async for rivi in sivukysely]
+    return _kokoa_sivu(rivit, jarjestys, koko, jalkeen, taaksepain)
+
+
+def arvioitu_maara(malli):
+    """Arvioi taulun rivimäärän suurimmasta pääavaimesta.
+
+    ``MAX(id)`` luetaan rowid-puun reunasta, joten se ei riipu taulun
+    koosta. Poistetut rivit tekevät arviosta yläarvion.
+    """
+    return malli._default_manager.aggregate(suurin=Max('pk'))['suurin'] or 0
+
+
+class ArvioivaPaginator(Paginator):
+    """Paginator, joka suodattamattomalle suurelle taululle käyttää arviota.
+
+    Suodatettu tai haettu lista lasketaan aina tarkasti.
+    """
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if isinstance(qs, QuerySet) and not qs.query.where:
+            arvio = arvioitu_maara(qs.model)
+            if arvio >= ARVIO_RAJA:
+                return arvio
+        return super().count
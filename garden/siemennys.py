@@ -0,0 +1,70 @@
+"""Deterministinen testidatan generointi suorituskykymittauksiin.
+
+Kasvilajit johdetaan ``esimerkkikasvit``-moduulin kasveista, joten
+kenttien muodot ja aikataulut vastaavat oikeaa luetteloa.
+"""
+import random
+from datetime import date, timedelta
+
+from .esimerkkikasvit import KASVIT
+from .models import GardenNote, MyGarden, PlantSpecies
+
+ERAKOKO = 2000
+
+HAVAINNOT = [
+    'Ensimmäiset versot näkyvissä.',
+    'Kastelin ja lannoitin.',
+    'Koulin taimet isompiin ruukkuihin.',
+    'Kasvu tasaista, lehdet terveen vihreitä.',
+    'Ensimmäiset kukat auenneet.',
+    'Korjasin satoa.',
+]
+
+
+def siemenna(lajit, viljelyt, havainnot, siemen=0):
+    """Luo ``lajit`` kasvilajia, ``viljelyt`` viljelyä ja ``havainnot`` havaintoa.
+
+    Sama siemen tuottaa aina saman datan. Havainnot jaetaan viljelyille
+    tasaisesti, ja viljelyt ja havainnot viittaavat vain tällä kerralla
+    luotuihin riveihin. Palauttaa luotujen viljelyjen id:t.
+    """
+    satunnainen = random.Random(siemen)
+
+    lajilista = []
+    for i in range(lajit):
+        pohja = dict(KASVIT[i % len(KASVIT)])
+        pohja.pop('nelson_garden_id', None)
+        laji = PlantSpecies(**{
+            **pohja,
+            'nimi': f"{pohja['nimi']} {i // len(KASVIT)}",
+            'kategoria': f"{pohja['kategoria']} {i % 7}",
+        })
+        laji.paivita_maskit()
+        lajilista.append(laji)
+    PlantSpecies.objects.bulk_create(lajilista, batch_size=ERAKOKO)
+    laji_idt = [laji.pk for laji in lajilista]
+
+    tilat = [tila for tila, _ in MyGarden.TILA_CHOICES]
+    alku = date(2024, 1, 1)
+    viljelylista = MyGarden.objects.bulk_create([
+        MyGarden(
+            kasvilaji_id=satunnainen.choice(laji_idt),
+            tila=satunnainen.choice(tilat),
+            kasvupaikka=satunnainen.choice(['parveke', 'kasvihuone', 'palsta', '']),
+            kylvopaiva=alku + timedelta(days=satunnainen.randrange(3 * 365)),
+        )
+        for _ in range(viljelyt)
+    ], batch_size=ERAKOKO)
+    viljely_idt = [viljely.pk for viljely in viljelylista]
+
+    if viljely_idt:
+        for era_alku in range(0, havainnot, ERAKOKO):
+            GardenNote.objects.bulk_create([
+                GardenNote(
+                    kasvi_id=viljely_idt[i % len(viljely_idt)],
+                    paivamaara=alku + timedelta(days=satunnainen.randrange(3 * 365)),
+                    havainto=satunnainen.choice(HAVAINNOT),
+                )
+                for i in range(era_alku, min(era_alku + ERAKOKO, havainnot))
+            ])
+    return viljely_idt
@@ -0,0 +1,127 @@
+"""Signaalit: havaintolaskurit, tietokantatriggerit ja SQLite-asetukset."""
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models.signals import post_migrate, post_save, pre_migrate, pre_save
+from django.dispatch import receiver
+
+from . import haku, mittaukset, tilastot, versiot
+from .models import GardenNote, MittausKooste, MyGarden, TietoVersio, ViljelyTilasto
+
+
+@receiver(pre_save, sender=GardenNote)
+def muista_vanha_viljely(sender, instance, raw=False, **kwargs):
+    """Muokattaessa talletetaan alkuperäinen viljely, jos havainto siirtyy."""
+    if raw or instance._state.adding:
+        return
+    instance._vanha_kasvi_id = (
+        GardenNote.objects.filter(pk=instance.pk).values_list('kasvi_id', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=GardenNote)
+def havainto_tallennettu(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        MyGarden.objects.filter(pk=instance.kasvi_id).havainto_lisatty(instance.paivamaara)
+        return
+    # Päivämäärä tai viljely on voinut muuttua: lasketaan molemmat uudelleen
+    kasvi_idt = {instance.kasvi_id, getattr(instance, '_vanha_kasvi_id', None)} - {None}
+    MyGarden.objects.filter(pk__in=kasvi_idt).tasaa_havaintolaskurit()
+
+
+# Migraatio, joka luo havaintojen poistotriggerin; ennen sitä laskurit
+# päivitti ``post_delete``-vastaanotin
+LASKURIMIGRAATIO = ('garden', '0016_havaintolaskurin_poistotrigger')
+
+
+def laskuritriggerit_sql():
+    """Havainnon poisto päivittää viljelyn laskurit triggerillä.
+
+    ``post_delete``-vastaanotin estäisi Djangon nopean poiston: viljelyn
+    poisto lataisi jokaisen havainnon ja ajaisi niille oman UPDATEn.
+    Trigger kattaa myös ``QuerySet.delete()``n ilman lisäkyselyitä.
+    """
+    havainto, viljely = GardenNote._meta.db_table, MyGarden._meta.db_table
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {havainto}_laskurit_ad AFTER DELETE ON {havainto} BEGIN "
+        f"UPDATE {viljely} SET havaintoja = havaintoja - 1, viimeisin_havainto = ("
+        f"SELECT MAX(paivamaara) FROM {havainto} WHERE kasvi_id = old.kasvi_id"
+        f") WHERE id = old.kasvi_id; END",
+    ]
+
+
+def poista_laskuritriggerit_sql():
+    return [f'DROP TRIGGER IF EXISTS {GardenNote._meta.db_table}_laskurit_ad']
+
+
+def _garden_migraatioita(plan):
+    return any(migraatio.app_label == 'garden' for migraatio, _ in plan or ())
+
+
+@receiver(pre_migrate)
+def pudota_triggerit(sender, using, plan=None, **kwargs):
+    """Pudottaa toisiin tauluihin kirjoittavat triggerit ennen garden-migraatioita.
+
+    SQLite ei anna nimetä uudelleen rakennettua taulua, jos toisen taulun
+    trigger viittaa siihen, joten esimerkiksi viljelyn ``AddField``
+    kaatuisi havaintojen laskuritriggeriin ja lajin ``AddField``
+    tilastotriggeriin. ``palauta_triggerit`` luo ne takaisin migraatioiden
+    jälkeen.
+    """
+    if sender.name != 'garden' or not _garden_migraatioita(plan):
+        return
+    yhteys = connections[using]
+    if yhteys.vendor != 'sqlite':
+        return
+    with yhteys.cursor() as cursor:
+        for lause in poista_laskuritriggerit_sql() + tilastot.poista_triggerit_sql():
+            cursor.execute(lause)
+
+
+@receiver(post_migrate)
+def palauta_triggerit(sender, using, plan=None, **kwargs):
+    """Luo laskurien, hakuindeksien, koosteiden, tilastojen ja versioiden triggerit.
+
+    SQLite pudottaa triggerit, kun ``AlterField``/``AddField`` rakentaa
+    taulun uudelleen, joten ne varmistetaan jokaisen migraation jälkeen.
+    """
+    if sender.name != 'garden':
+        return
+    yhteys = connections[using]
+    if yhteys.vendor != 'sqlite':
+        return
+    taulut = set(yhteys.introspection.table_names())
+    lauseet = []
+    if LASKURIMIGRAATIO in MigrationRecorder(yhteys).applied_migrations():
+        lauseet += laskuritriggerit_sql()
+    if set(haku.INDEKSIT) <= taulut:
+        lauseet += haku.luo_triggerit_sql()
+    if MittausKooste._meta.db_table in taulut:
+        lauseet += mittaukset.luo_triggerit_sql()
+    if ViljelyTilasto._meta.db_table in taulut:
+        lauseet += tilastot.luo_triggerit_sql()
+        if _garden_migraatioita(plan):
+            # Triggerit olivat poissa migraatioiden ajan
+            lauseet += tilastot.rakenna_sql()
+    if TietoVersio._meta.db_table in taulut:
+        lauseet += versiot.luo_triggerit_sql([
+            malli._meta.db_table for malli in versiot.SEURATUT_MALLIT
+            if malli._meta.db_table in taulut
+        ])
+    with yhteys.cursor() as cursor:
+        for lause in lauseet:
+            cursor.execute(lause)
+
+
+@receiver(connection_created)
+def aseta_pragmat(sender, connection, **kwargs):
+    """Asettaa ``GARDEN_SQLITE_PRAGMAT``in jokaiselle uudelle SQLite-yhteydelle."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmat = getattr(settings, 'GARDEN_SQLITE_PRAGMAT', None) or {}
+    with connection.cursor() as cursor:
+        for nimi, arvo in pragmat.items():
+            cursor.execute(f'PRAGMA {nimi} = {arvo}')
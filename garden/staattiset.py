@@ -0,0 +1,69 @@
+"""Sormenjäljitetyt ja valmiiksi pakatut staattiset tiedostot.
+
+``collectstatic`` kirjoittaa tiedostot sisällön tiivisteen sisältävillä
+nimillä (``garden.3f2a9c1b7e4d.css``) ja tekee pakattaville tyypeille
+valmiit ``.gz``-versiot, joten palvelun ei tarvitse pakata pyynnön aikana.
+Tiivisteellinen nimi muuttuu aina sisällön muuttuessa, joten selain saa
+pitää tiedoston välimuistissa vuoden ajan.
+"""
+import gzip
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+
+# Tyypit, joille tehdään .gz-versio; kuvat ja fontit on jo pakattu
+PAKATTAVAT = {'.css', '.js', '.svg', '.json', '.txt', '.map'}
+
+# Pienempiä tiedostoja ei kannata pakata
+PAKKAUS_RAJA = 256
+
+# ManifestStaticFilesStorage lisää nimeen 12 merkin MD5-tiivisteen
+_TIIVISTE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+VUOSI = 365 * 24 * 60 * 60
+MUUTTUVAN_IKA = 5 * 60
+
+
+def on_tiivisteellinen(nimi):
+    """Onko tiedostonimessä sisällön tiiviste (ja siis muuttumaton sisältö)."""
+    return bool(_TIIVISTE.search(nimi))
+
+
+def julkaisutunniste():
+    """Julkaisun tunniste sivujen ETageihin.
+
+    Uusi julkaisu muuttaa HTML:ää ja sen viittaamia tiivisteellisiä
+    tiedostonimiä, joten vanhan julkaisun ETag ei saa täsmätä. Tunniste on
+    ``GARDEN_JULKAISU``-asetus ja staticfiles-manifestin tiiviste (tyhjä
+    ilman ManifestStaticFilesStoragea).
+    """
+    return settings.GARDEN_JULKAISU, getattr(staticfiles_storage, 'manifest_hash', '')
+
+
+def pakkaa(polku):
+    """Kirjoittaa ``polku.gz``:n, jos pakkaus pienentää tiedostoa."""
+    polku = Path(polku)
+    if polku.suffix not in PAKATTAVAT:
+        return False
+    sisalto = polku.read_bytes()
+    if len(sisalto) < PAKKAUS_RAJA:
+        return False
+    # mtime=0: sama sisältö tuottaa aina saman .gz-tiedoston
+    pakattu = gzip.compress(sisalto, compresslevel=9, mtime=0)
+    if len(pakattu) >= len(sisalto):
+        return False
+    polku.with_name(polku.name + '.gz').write_bytes(pakattu)
+    return True
+
+
+class PakattuManifestStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage, joka tekee tiivisteellisistä tiedostoista .gz-versiot."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for nimi in set(self.hashed_files.values()):
+            pakkaa(self.path(nimi))
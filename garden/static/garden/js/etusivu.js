@@ -0,0 +1,11 @@
+// Tilan vaihto taustalla: palvelin vastaa 204, sivua ei ladata uudelleen
+document.querySelectorAll('[data-vaihda-tila]').forEach(function (valinta) {
+    valinta.addEventListener('change', async function () {
+        const lomake = valinta.form;
+        const vastaus = await fetch(lomake.action, {
+            method: 'POST', body: new FormData(lomake),
+            headers: {'X-Requested-With': 'fetch'},
+        });
+        if (!vastaus.ok) lomake.submit();
+    });
+});
@@ -0,0 +1,118 @@
+// Kasvilajin hakukenttä: ehdotukset haetaan kirjoitettaessa ja
+// ryhmitellään kategorioittain; valinta tallentuu piilokenttään
+document.querySelectorAll('[data-lajihaku]').forEach(function (haku) {
+    const arvo = haku.querySelector('[data-lajihaku-arvo]');
+    const teksti = haku.querySelector('[data-lajihaku-teksti]');
+    const lista = haku.querySelector('[role="listbox"]');
+    let ajastin = null;
+    let pyynto = null;
+    let aktiivinen = -1;
+
+    function vaihtoehdot() {
+        return Array.from(lista.querySelectorAll('[role="option"]'));
+    }
+
+    function sulje() {
+        lista.hidden = true;
+        teksti.setAttribute('aria-expanded', 'false');
+        teksti.removeAttribute('aria-activedescendant');
+        aktiivinen = -1;
+    }
+
+    function korosta(indeksi) {
+        const kaikki = vaihtoehdot();
+        if (!kaikki.length) return;
+        aktiivinen = (indeksi + kaikki.length) % kaikki.length;
+        kaikki.forEach(function (v, i) { v.setAttribute('aria-selected', String(i === aktiivinen)); });
+        teksti.setAttribute('aria-activedescendant', kaikki[aktiivinen].id);
+        kaikki[aktiivinen].scrollIntoView({block: 'nearest'});
+    }
+
+    function valitse(vaihtoehto) {
+        arvo.value = vaihtoehto.dataset.id;
+        teksti.value = vaihtoehto.textContent;
+        teksti.setCustomValidity('');
+        sulje();
+    }
+
+    function nayta(ryhmat) {
+        lista.replaceChildren();
+        ryhmat.forEach(function (ryhma, r) {
+            const osio = document.createElement('div');
+            osio.setAttribute('role', 'group');
+            const otsikko = document.createElement('div');
+            otsikko.className = 'lajihaku-kategoria';
+            otsikko.id = lista.id + '_r' + r;
+            otsikko.textContent = ryhma.kategoria;
+            osio.setAttribute('aria-labelledby', otsikko.id);
+            osio.appendChild(otsikko);
+            ryhma.lajit.forEach(function (laji) {
+                const vaihtoehto = document.createElement('div');
+                vaihtoehto.id = lista.id + '_' + laji.id;
+                vaihtoehto.setAttribute('role', 'option');
+                vaihtoehto.dataset.id = laji.id;
+                vaihtoehto.textContent = laji.teksti;
+                osio.appendChild(vaihtoehto);
+            });
+            lista.appendChild(osio);
+        });
+        if (!ryhmat.length) {
+            const tyhja = document.createElement('div');
+            tyhja.className = 'lajihaku-tyhja';
+            tyhja.textContent = 'Ei osumia';
+            lista.appendChild(tyhja);
+        }
+        lista.hidden = false;
+        teksti.setAttribute('aria-expanded', 'true');
+        aktiivinen = -1;
+    }
+
+    async function hae(kysely) {
+        if (pyynto) pyynto.abort();
+        pyynto = new AbortController();
+        try {
+            const vastaus = await fetch(
+                haku.dataset.lajihaku + '?q=' + encodeURIComponent(kysely),
+                {signal: pyynto.signal},
+            );
+            if (vastaus.ok) nayta((await vastaus.json()).ryhmat);
+        } catch (virhe) {
+            if (virhe.name !== 'AbortError') throw virhe;
+        }
+    }
+
+    teksti.addEventListener('input', function () {
+        // Muokattu teksti ei enää vastaa valittua lajia
+        arvo.value = '';
+        clearTimeout(ajastin);
+        const kysely = teksti.value.trim();
+        if (!kysely) { sulje(); return; }
+        ajastin = setTimeout(function () { hae(kysely); }, 150);
+    });
+
+    teksti.addEventListener('keydown', function (e) {
+        if (lista.hidden) return;
+        if (e.key === 'ArrowDown') { e.preventDefault(); korosta(aktiivinen + 1); }
+        else if (e.key === 'ArrowUp') { e.preventDefault(); korosta(aktiivinen - 1); }
+        else if (e.key === 'Enter' && aktiivinen >= 0) {
+            e.preventDefault();
+            valitse(vaihtoehdot()[aktiivinen]);
+        } else if (e.key === 'Escape') { sulje(); }
+    });
+
+    // mousedown ennen blur-tapahtumaa, jotta valinta ehtii tallentua
+    lista.addEventListener('mousedown', function (e) {
+        const vaihtoehto = e.target.closest('[role="option"]');
+        if (vaihtoehto) { e.preventDefault(); valitse(vaihtoehto); }
+    });
+
+    teksti.addEventListener('blur', sulje);
+
+    teksti.form.addEventListener('submit', function (e) {
+        if (!arvo.value) {
+            teksti.setCustomValidity('Valitse kasvilaji ehdotuksista.');
+            teksti.reportValidity();
+            e.preventDefault();
+        }
+    });
+});
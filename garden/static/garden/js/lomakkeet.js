@@ -0,0 +1,6 @@
+// Valinnan muutos lähettää lomakkeen ilman erillistä painiketta
+document.querySelectorAll('[data-laheta]').forEach(function (valinta) {
+    valinta.addEventListener('change', function () {
+        valinta.form.submit();
+    });
+});
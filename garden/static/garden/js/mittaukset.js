@@ -0,0 +1,67 @@
+// Mittauskaavio: pisteet haetaan koosteista rajapinnasta ja piirretään SVG:nä
+(function () {
+    const kaavio = document.getElementById('mittauskaavio');
+    const valinta = document.getElementById('mittaussuure');
+    const lomake = document.getElementById('mittauslomake');
+    const SVG = 'http://www.w3.org/2000/svg';
+    const LEVEYS = 600, KORKEUS = 200, REUNA = 24;
+
+    function elementti(nimi, ominaisuudet) {
+        const e = document.createElementNS(SVG, nimi);
+        for (const [avain, arvo] of Object.entries(ominaisuudet)) e.setAttribute(avain, arvo);
+        return e;
+    }
+
+    function piirra(data) {
+        kaavio.replaceChildren();
+        if (!data.pisteet.length) {
+            kaavio.textContent = 'Ei mittauksia.';
+            return;
+        }
+        const arvot = data.pisteet.map(p => p.arvo);
+        const pienin = Math.min(0, ...arvot), suurin = Math.max(...arvot) || 1;
+        const n = data.pisteet.length;
+        const x = i => REUNA + (n === 1 ? 0.5 : i / (n - 1)) * (LEVEYS - 2 * REUNA);
+        const y = a => KORKEUS - REUNA - (a - pienin) / (suurin - pienin) * (KORKEUS - 2 * REUNA);
+        const svg = elementti('svg', {viewBox: `0 0 ${LEVEYS} ${KORKEUS}`, role: 'img'});
+        svg.append(elementti('polyline', {
+            points: arvot.map((a, i) => `${x(i)},${y(a)}`).join(' '), fill: 'none',
+        }));
+        const tekstit = [
+            [REUNA, KORKEUS - 4, data.pisteet[0].alku, 'start'],
+            [LEVEYS - REUNA, KORKEUS - 4, data.pisteet[n - 1].alku, 'end'],
+            [REUNA, REUNA - 8, `${suurin} ${data.yksikko}`, 'start'],
+        ];
+        for (const [tx, ty, teksti, ankkuri] of tekstit) {
+            const t = elementti('text', {x: tx, y: ty, 'text-anchor': ankkuri});
+            t.textContent = teksti;
+            svg.append(t);
+        }
+        kaavio.append(svg);
+    }
+
+    async function lataa() {
+        const url = `${kaavio.dataset.url}?suure=${valinta.value}`;
+        const vastaus = await fetch(url);
+        if (vastaus.ok) piirra(await vastaus.json());
+    }
+
+    valinta.addEventListener('change', lataa);
+
+    lomake.addEventListener('submit', async function (e) {
+        e.preventDefault();
+        const vastaus = await fetch(lomake.action, {
+            method: 'POST', body: new FormData(lomake), headers: {'X-Requested-With': 'fetch'},
+        });
+        if (!vastaus.ok) {
+            alert('Tarkista mittauksen tiedot.');
+            return;
+        }
+        const suure = lomake.elements['mittaus-suure'].value;
+        valinta.querySelector(`[data-suure="${suure}"]`).selected = true;
+        lomake.elements['mittaus-arvo'].value = '';
+        lataa();
+    });
+
+    lataa();
+})();
@@ -0,0 +1,49 @@
+// Havainnot ladataan ja lisätään HTML-paloina ilman koko sivun uudelleenlatausta
+(function () {
+    const lista = document.getElementById('havainnot');
+    const lomake = document.getElementById('havaintolomake');
+    const otsakkeet = {'X-Requested-With': 'fetch'};
+
+    // Uusi havainto sivutuksen järjestykseen (päivämäärä, id; uusin ensin)
+    function lisaaJarjestykseen(html) {
+        const pohja = document.createElement('template');
+        pohja.innerHTML = html.trim();
+        const uusi = pohja.content.firstElementChild;
+        const paivamaara = uusi.dataset.paivamaara;
+        const id = Number(uusi.dataset.id);
+        const seuraava = Array.from(lista.querySelectorAll('.timeline-item')).find(function (h) {
+            return h.dataset.paivamaara < paivamaara
+                || (h.dataset.paivamaara === paivamaara && Number(h.dataset.id) < id);
+        });
+        if (seuraava) {
+            seuraava.before(uusi);
+        } else if (!lista.querySelector('[data-lataa-lisaa]')) {
+            lista.append(uusi);
+        }
+        // Muuten havainto kuuluu vanhemmille sivuille ja tulee niiden mukana
+    }
+
+    lista.addEventListener('click', async function (e) {
+        const linkki = e.target.closest('[data-lataa-lisaa]');
+        if (!linkki) return;
+        e.preventDefault();
+        const vastaus = await fetch(linkki.href, {headers: otsakkeet});
+        if (vastaus.ok) linkki.outerHTML = await vastaus.text();
+    });
+
+    lomake.addEventListener('submit', async function (e) {
+        e.preventDefault();
+        const vastaus = await fetch(lomake.action, {
+            method: 'POST', body: new FormData(lomake), headers: otsakkeet,
+        });
+        if (!vastaus.ok) {
+            alert(await vastaus.text());
+            return;
+        }
+        lisaaJarjestykseen(await vastaus.text());
+        lomake.querySelector('textarea').value = '';
+        lomake.querySelector('input[type=file]').value = '';
+        const tyhja = document.getElementById('ei-havaintoja');
+        if (tyhja) tyhja.remove();
+    });
+})();
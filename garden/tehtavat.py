@@ -0,0 +1,103 @@
+"""Taustajonon tehtävät (ks. ``garden.tyot``).
+
+Raskaat ylläpitotoimet ajetaan työntekijässä pyynnön tai komennon sijaan.
+Komentoja käärivät tehtävät välittävät komennon tulosteen rivit työn
+viestiksi, joten edistyminen näkyy adminissa.
+"""
+from django.core.management import call_command
+
+from . import haku, kuvat, luettelo, vienti
+from .models import Kuva, MyGarden
+from .tyot import tehtava
+
+
+class _Loki:
+    """Komennon stdout, joka kirjaa jokaisen rivin työn viestiksi."""
+
+    def __init__(self, edistyminen):
+        self.edistyminen = edistyminen
+        self.rivit = []
+
+    def write(self, teksti):
+        for rivi in teksti.splitlines():
+            if rivi.strip():
+                self.rivit.append(rivi)
+                self.edistyminen(viesti=rivi.strip())
+
+    def flush(self):
+        pass
+
+
+@tehtava('lataa_kasvit')
+def lataa_kasvit(edistyminen, tiedostot=(), batch_size=2000, dry_run=False):
+    """Kasvilajien tuonti (``manage.py lataa_kasvit``)."""
+    loki = _Loki(edistyminen)
+    call_command(
+        'lataa_kasvit', *tiedostot, batch_size=batch_size, dry_run=dry_run,
+        stdout=loki, stderr=loki,
+    )
+    return {'tuloste': loki.rivit[-20:]}
+
+
+@tehtava('synkronoi_luettelo')
+def synkronoi_luettelo(edistyminen, lahde, **asetukset):
+    """Tuotesyötteen synkronointi (``manage.py synkronoi_luettelo``)."""
+    synkronointi = luettelo.synkronoi(
+        lahde, raportoi=lambda viesti: edistyminen(viesti=viesti), **asetukset,
+    )
+    return {**synkronointi.tilasto, 'virheet': synkronointi.virheet[:20]}
+
+
+@tehtava('tee_kuvaversiot')
+def tee_kuvaversiot(edistyminen, kuva=None, kaikki=False):
+    """Kuvien pienennetyt versiot (``kuvat.tee_versiot``).
+
+    Ilman ``kuva``a käsitellään kaikki käsittelemättömät kuvat, ``kaikki``lla
+    kaikki kuvat (esim. kun ``kuvat.VERSIOT`` muuttuu).
+    """
+    if kuva is not None:
+        kasiteltavat = Kuva.objects.filter(pk=kuva)
+    elif kaikki:
+        kasiteltavat = Kuva.objects.all()
+    else:
+        kasiteltavat = Kuva.objects.filter(tila=Kuva.KASITTELEMATTA)
+    tilat = {}
+    yhteensa = kasiteltavat.count()
+    for tehty, rivi in enumerate(kasiteltavat.order_by('pk').iterator(), start=1):
+        tila = kuvat.tee_versiot(rivi)
+        tilat[tila] = tilat.get(tila, 0) + 1
+        edistyminen(tehty, yhteensa)
+    return tilat
+
+
+@tehtava('vie')
+def vie(edistyminen, laji, muoto, polku, **suodattimet):
+    """Kirjoittaa viennin tiedostoon ``polku``."""
+    palat = vienti.vie(laji, muoto, **suodattimet)
+    riveja = -vienti.OTSIKKORIVIT[muoto]
+    with open(polku, 'w', encoding='utf-8', newline='') as tiedosto:
+        for pala in palat:
+            tiedosto.write(pala)
+            riveja += 1
+            if riveja % vienti.ERAKOKO == 0:
+                edistyminen(riveja)
+    edistyminen(riveja)
+    return {'polku': polku, 'riveja': riveja}
+
+
+@tehtava('rakenna_hakuindeksi')
+def rakenna_hakuindeksi(edistyminen):
+    haku.rakenna_indeksit()
+    return {'indekseja': len(haku.INDEKSIT)}
+
+
+@tehtava('paivita_satoarviot')
+def paivita_satoarviot(edistyminen):
+    return {'viljelyja': MyGarden.objects.exclude(kylvopaiva=None).paivita_satoarviot()}
+
+
+@tehtava('tasaa_havaintolaskurit')
+def tasaa_havaintolaskurit(edistyminen):
+    loki = _Loki(edistyminen)
+    call_command('tasaa_havaintolaskurit', stdout=loki)
+    return {'tuloste': loki.rivit[-20:]}
@@ -0,0 +1,183 @@
+"""Tilastosivun yhteenvetotaulu ``ViljelyTilasto``.
+
+Taulussa on rivi jokaista (kausi, kategoria, kasvupaikka) -yhdistelmää
+kohden, joten sivu lukee muutama sata valmista riviä eikä koostele
+viljelyjä ja lajeja joka kerta. SQLite-triggerit pitävät taulun ajan
+tasalla muutoksina: viljelyn lisäys lisää sen osuudet riville, poisto
+vähentää ne ja tilan, kylvöpäivän, lajin tai kasvupaikan muutos siirtää
+ne vanhalta riviltä uudelle. Lajin kategorian vaihtuessa kummankin
+kategorian rivit lasketaan uudelleen. Triggerit kattavat myös
+``bulk_create``-, ``update``- ja ``delete``-polut.
+"""
+from django.db import connection, transaction
+
+from .models import MyGarden, PlantSpecies, ViljelyTilasto
+
+AVAIN = ('vuosi', 'kategoria', 'kasvupaikka')
+MAARAT = ('viljelyja', 'korjattuja', 'epaonnistuneita', 'kasvuaikoja', 'kasvupaivia')
+
+# Viljelyn sarakkeet, joiden muutos siirtää sen osuudet toiselle riville
+_SEURATTAVAT = ('tila', 'kylvopaiva', 'kasvilaji_id', 'kasvupaikka', 'sadonkorjuu_alkoi')
+
+
+def _taulut():
+    return (
+        MyGarden._meta.db_table, PlantSpecies._meta.db_table, ViljelyTilasto._meta.db_table,
+    )
+
+
+def _osuudet(rivi, kategoria):
+    """Viljelyrivin ``rivi`` avain ja osuudet SQL-lausekkeina."""
+    return {
+        'vuosi': f"CAST(strftime('%Y', coalesce({rivi}.kylvopaiva, {rivi}.lisatty)) AS INTEGER)",
+        'kategoria': kategoria,
+        'kasvupaikka': f'{rivi}.kasvupaikka',
+        'viljelyja': '1',
+        'korjattuja': f"({rivi}.sadonkorjuu_alkoi IS NOT NULL OR {rivi}.tila = 'sadonkorjuu')",
+        'epaonnistuneita': f"({rivi}.tila = 'paattynyt' AND {rivi}.sadonkorjuu_alkoi IS NULL)",
+        'kasvuaikoja': f'({rivi}.kylvopaiva IS NOT NULL AND {rivi}.sadonkorjuu_alkoi IS NOT NULL)',
+        'kasvupaivia': (
+            f'coalesce(CAST(julianday({rivi}.sadonkorjuu_alkoi) '
+            f'- julianday({rivi}.kylvopaiva) AS INTEGER), 0)'
+        ),
+    }
+
+
+def _rivin_osuudet(rivi):
+    """Triggerin old/new-rivin osuudet; kategoria haetaan lajilta."""
+    _, laji, _ = _taulut()
+    return _osuudet(rivi, f'(SELECT kategoria FROM {laji} WHERE id = {rivi}.kasvilaji_id)')
+
+
+def _lisaa_sql(rivi):
+    _, _, tilasto = _taulut()
+    osuudet = _rivin_osuudet(rivi)
+    return (
+        f"INSERT INTO {tilasto}({', '.join(osuudet)}) VALUES ({', '.join(osuudet.values())}) "
+        f"ON CONFLICT({', '.join(AVAIN)}) DO UPDATE SET "
+        + ', '.join(f'{m} = {m} + excluded.{m}' for m in MAARAT) + ';'
+    )
+
+
+def _vahenna_sql(rivi):
+    _, _, tilasto = _taulut()
+    osuudet = _rivin_osuudet(rivi)
+    ehto = ' AND '.join(f'{a} = {osuudet[a]}' for a in AVAIN)
+    return (
+        f"UPDATE {tilasto} SET " + ', '.join(f'{m} = {m} - {osuudet[m]}' for m in MAARAT)
+        + f" WHERE {ehto}; DELETE FROM {tilasto} WHERE {ehto} AND viljelyja = 0;"
+    )
+
+
+def _koosta_sql(ehto):
+    """INSERT ... SELECT, joka koostaa ehdon mukaiset viljelyt tauluun."""
+    viljely, laji, tilasto = _taulut()
+    osuudet = _osuudet('v', 'l.kategoria')
+    sarakkeet = [osuudet[a] for a in AVAIN] + [f'SUM({osuudet[m]})' for m in MAARAT]
+    return (
+        f"INSERT INTO {tilasto}({', '.join(osuudet)}) SELECT {', '.join(sarakkeet)} "
+        f"FROM {viljely} v JOIN {laji} l ON l.id = v.kasvilaji_id WHERE {ehto} "
+        f"GROUP BY 1, 2, 3"
+    )
+
+
+def luo_triggerit_sql():
+    """Palauttaa yhteenvetotaulun ylläpitotriggerien luontilauseet (idempotentit)."""
+    viljely, laji, tilasto = _taulut()
+    muuttui = ' OR '.join(f'old.{s} IS NOT new.{s}' for s in _SEURATTAVAT)
+    kategoriat = 'kategoria IN (old.kategoria, new.kategoria)'
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {tilasto}_ai AFTER INSERT ON {viljely} BEGIN "
+        f"{_lisaa_sql('new')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {tilasto}_ad AFTER DELETE ON {viljely} BEGIN "
+        f"{_vahenna_sql('old')} END",
+        # Laskurien ja satoarvion päivitykset eivät koske tilastoa
+        f"CREATE TRIGGER IF NOT EXISTS {tilasto}_au "
+        f"AFTER UPDATE OF {', '.join(_SEURATTAVAT)} ON {viljely} WHEN {muuttui} BEGIN "
+        f"{_vahenna_sql('old')} {_lisaa_sql('new')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {tilasto}_lu AFTER UPDATE OF kategoria ON {laji} "
+        f"WHEN old.kategoria IS NOT new.kategoria BEGIN "
+        f"DELETE FROM {tilasto} WHERE {kategoriat}; {_koosta_sql(f'l.{kategoriat}')}; END",
+    ]
+
+
+def poista_triggerit_sql():
+    _, _, tilasto = _taulut()
+    return [f'DROP TRIGGER IF EXISTS {tilasto}_{t}' for t in ('ai', 'ad', 'au', 'lu')]
+
+
+def rakenna_sql():
+    _, _, tilasto = _taulut()
+    return [f'DELETE FROM {tilasto}', _koosta_sql('1')]
+
+
+def rakenna_tilastot():
+    """Laskee yhteenvedon viljelyistä uudelleen; palauttaa rivien määrän."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        for lause in rakenna_sql():
+            cursor.execute(lause)
+    return ViljelyTilasto.objects.count()
+
+
+def _osuus(osa, kaikki):
+    return round(100 * osa / kaikki) if kaikki else None
+
+
+def yhteenveto():
+    """Tilastosivun taulukot yhteenvetotaulun riveistä.
+
+    * ``kategoriat``: viljelyjä kategorioittain kausille ``vuodet``
+    * ``kasvuajat``: keskimääräinen kasvuaika kylvöstä sadonkorjuuseen
+    * ``kasvupaikat``: onnistumisprosentti kasvupaikoittain (sadonkorjuuseen
+      ehtineet kaikista ratkenneista, eli korjatuista ja ilman satoa päättyneistä)
+    """
+    vuodet, kategoriat, kasvupaikat = set(), {}, {}
+    for rivi in ViljelyTilasto.objects.values(*AVAIN, *MAARAT):
+        vuodet.add(rivi['vuosi'])
+        kategoria = kategoriat.setdefault(
+            rivi['kategoria'], {'vuodet': {}, 'kasvuaikoja': 0, 'kasvupaivia': 0},
+        )
+        kategoria['vuodet'][rivi['vuosi']] = (
+            kategoria['vuodet'].get(rivi['vuosi'], 0) + rivi['viljelyja']
+        )
+        kategoria['kasvuaikoja'] += rivi['kasvuaikoja']
+        kategoria['kasvupaivia'] += rivi['kasvupaivia']
+        paikka = kasvupaikat.setdefault(
+            rivi['kasvupaikka'], {'viljelyja': 0, 'korjattuja': 0, 'epaonnistuneita': 0},
+        )
+        for kentta in paikka:
+            paikka[kentta] += rivi[kentta]
+
+    vuodet = sorted(vuodet)
+    return {
+        'vuodet': vuodet,
+        'kategoriat': [
+            {
+                'kategoria': nimi,
+                'maarat': [tiedot['vuodet'].get(vuosi, 0) for vuosi in vuodet],
+                'yhteensa': sum(tiedot['vuodet'].values()),
+            }
+            for nimi, tiedot in sorted(kategoriat.items())
+        ],
+        'kasvuajat': [
+            {
+                'kategoria': nimi,
+                'viljelyja': tiedot['kasvuaikoja'],
+                'keskiarvo': round(tiedot['kasvupaivia'] / tiedot['kasvuaikoja']),
+            }
+            for nimi, tiedot in sorted(kategoriat.items()) if tiedot['kasvuaikoja']
+        ],
+        'kasvupaikat': sorted(
+            (
+                {
+                    'kasvupaikka': nimi,
+                    **tiedot,
+                    'onnistuminen': _osuus(
+                        tiedot['korjattuja'], tiedot['korjattuja'] + tiedot['epaonnistuneita'],
+                    ),
+                }
+                for nimi, tiedot in kasvupaikat.items()
+            ),
+            key=lambda paikka: (-paikka['viljelyja'], paikka['kasvupaikka']),
+        ),
+    }
@@ -0,0 +1,58 @@
+"""Kasvilajirivien validointi tuontia varten.
+
+``lataa_kasvit``-komento ja luettelon synkronointi (``garden.luettelo``)
+muuntavat syötteen rivit ``PlantSpecies``-olioiksi ``rakenna_laji``lla ja
+kirjoittavat samat kentät.
+"""
+from django.core.exceptions import ValidationError
+
+from .models import PlantSpecies
+
+TUONTIKENTAT = [
+    f for f in PlantSpecies._meta.concrete_fields
+    if f.editable and not f.primary_key
+]
+AVAINKENTAT = ['nimi', 'lajike']
+# Aikataulukentistä lasketut kentät; tuonti tyhjentää myös syötteen tiivisteen
+JOHDETUT = ['kylvo_maski', 'kasvu_maski', 'sato_maski', 'kasvuaika', 'sisalto_tiiviste']
+PAIVITETTAVAT = [f.name for f in TUONTIKENTAT if f.name not in AVAINKENTAT] + JOHDETUT
+
+
+def paivitettavat(kentat):
+    """Olemassa olevalle lajille kirjoitettavat kentät, kun rivillä on sarakkeet ``kentat``.
+
+    Rivistä puuttuvat sarakkeet saavat ``rakenna_laji``ssa oletusarvonsa,
+    joilla ei saa ylikirjoittaa tallennettuja tietoja.
+    """
+    return [kentta for kentta in PAIVITETTAVAT if kentta in kentat or kentta in JOHDETUT]
+
+
+def rakenna_laji(data):
+    """Muuntaa rivin validoiduksi PlantSpecies-olioksi.
+
+    Tarkistaa kenttien tyypit, pituudet ja valinnat (``clean_fields``)
+    ilman tietokantakyselyitä. Virheestä nostetaan ValidationError.
+    """
+    if not isinstance(data, dict):
+        raise ValidationError('Rivi ei ole olio.')
+    if None in data:
+        # csv.DictReader kerää otsikkoa pidemmän rivin ylimääräiset solut avaimelle None
+        raise ValidationError('Rivillä on ylimääräisiä sarakkeita.')
+    tuntemattomat = set(data) - {f.name for f in TUONTIKENTAT}
+    if tuntemattomat:
+        raise ValidationError(f"Tuntemattomat kentät: {', '.join(sorted(tuntemattomat))}")
+    arvot = {}
+    for kentta in TUONTIKENTAT:
+        if kentta.name not in data:
+            continue
+        arvo = data[kentta.name]
+        if arvo == '' and kentta.null:
+            arvo = None
+        arvot[kentta.name] = arvo
+    laji = PlantSpecies(**arvot)
+    # Puuttuvat kentät saavat oletusarvonsa, joita ei tarvitse validoida
+    laji.clean_fields(exclude=[
+        f.name for f in TUONTIKENTAT if f.name not in arvot and f.has_default()
+    ])
+    laji.paivita_maskit()
+    return laji
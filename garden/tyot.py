@@ -0,0 +1,156 @@
+"""Tietokantapohjainen taustatyöjono.
+
+Työt ovat ``Tyo``-rivejä, joten erillistä välittäjää ei tarvita: jono on
+sama tietokanta kuin muukin data. ``lisaa_jonoon`` lisää työn ja
+``manage.py tyojono`` varaa ja ajaa töitä prosessi- tai säiepoolissa.
+
+Varaus on vertaa-ja-vaihda-päivitys (``UPDATE ... WHERE tila = 'jonossa'``),
+joten kaksi työntekijää ei voi saada samaa työtä. Epäonnistunut työ palaa
+jonoon kasvavalla viiveellä, kunnes yritykset loppuvat. Tehtävät
+rekisteröidään ``@tehtava``-koristeella (ks. ``garden.tehtavat``).
+"""
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Tyo
+
+TEHTAVAT = {}
+
+# Uudelleenyrityksen viive: 30 s, 60 s, 120 s, ... enintään tunti
+VIIVE_ALKU = 30
+VIIVE_ENINTAAN = 60 * 60
+
+# Näin kauan ilman elonmerkkiä ollut käynnissä oleva työ on jumissa
+ELOSSA_RAJA = timedelta(minutes=5)
+
+
+class TyoVirhe(ValueError):
+    """Tuntematon tehtävä."""
+
+
+def tehtava(nimi):
+    """Rekisteröi funktion taustatehtäväksi nimellä ``nimi``.
+
+    Funktio saa ensimmäisenä argumenttinaan ``Edistyminen``-raportoijan ja
+    loput työn parametreista avainsana-argumentteina. Paluuarvo
+    tallennetaan työn tulokseksi, joten sen on oltava JSON-muotoinen.
+    """
+    def rekisteroi(funktio):
+        TEHTAVAT[nimi] = funktio
+        return funktio
+    return rekisteroi
+
+
+def lisaa_jonoon(nimi, *, ajoaika=None, enimmaisyritykset=3, **parametrit):
+    """Lisää tehtävän ``nimi`` jonoon ja palauttaa ``Tyo``-rivin."""
+    if nimi not in TEHTAVAT:
+        raise TyoVirhe(f'Tuntematon tehtävä: {nimi}')
+    return Tyo.objects.create(
+        tehtava=nimi, parametrit=parametrit,
+        ajoaika=ajoaika or timezone.now(), enimmaisyritykset=enimmaisyritykset,
+    )
+
+
+def tyontekijan_nimi():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def varaa_seuraava(tyontekija):
+    """Varaa vanhimman ajettavissa olevan työn; palauttaa sen id:n tai None."""
+    while True:
+        nyt = timezone.now()
+        pk = (
+            Tyo.objects.filter(tila=Tyo.JONOSSA, ajoaika__lte=nyt)
+            .order_by('ajoaika', 'id').values_list('pk', flat=True).first()
+        )
+        if pk is None:
+            return None
+        varattu = Tyo.objects.filter(pk=pk, tila=Tyo.JONOSSA).update(
+            tila=Tyo.KAYNNISSA, tyontekija=tyontekija, aloitettu=nyt, elossa=nyt,
+            valmistunut=None, yritykset=F('yritykset') + 1,
+        )
+        if varattu:
+            return pk
+        # Toinen työntekijä ehti ensin; yritetään seuraavaa
+
+
+def pidetaan_elossa(pkt):
+    """Päivittää käynnissä olevien töiden elonmerkin."""
+    if pkt:
+        Tyo.objects.filter(pk__in=pkt, tila=Tyo.KAYNNISSA).update(elossa=timezone.now())
+
+
+def palauta_jumittuneet(raja=ELOSSA_RAJA):
+    """Palauttaa kaatuneen työntekijän työt jonoon (tai epäonnistuneiksi).
+
+    Palauttaa käsiteltyjen töiden määrän.
+    """
+    nyt = timezone.now()
+    jumissa = Tyo.objects.filter(tila=Tyo.KAYNNISSA, elossa__lt=nyt - raja)
+    virhe = 'Työntekijä lakkasi vastaamasta kesken työn.'
+    palautettu = jumissa.filter(yritykset__lt=F('enimmaisyritykset')).update(
+        tila=Tyo.JONOSSA, ajoaika=nyt, virhe=virhe,
+    )
+    return palautettu + jumissa.update(tila=Tyo.EPAONNISTUI, valmistunut=nyt, virhe=virhe)
+
+
+def viive(yritys):
+    """Odotusaika ennen yritystä ``yritys + 1``."""
+    return timedelta(seconds=min(VIIVE_ALKU * 2 ** (yritys - 1), VIIVE_ENINTAAN))
+
+
+class Edistyminen:
+    """Tehtävälle annettava raportoija, joka päivittää työn rivin."""
+
+    def __init__(self, pk):
+        self.pk = pk
+
+    def __call__(self, tehty=None, yhteensa=None, viesti=None):
+        muutokset = {}
+        if tehty is not None:
+            muutokset['edistyminen'] = tehty
+        if yhteensa is not None:
+            muutokset['kokonaismaara'] = yhteensa
+        if viesti is not None:
+            muutokset['viesti'] = viesti[:255]
+        if muutokset:
+            Tyo.objects.filter(pk=self.pk).update(**muutokset)
+
+
+def kirjaa_virhe(tyo, virhe, uusittava=True):
+    """Palauttaa epäonnistuneen työn jonoon viiveellä tai merkitsee sen epäonnistuneeksi.
+
+    Vain käynnissä olevaa työtä muutetaan. Uutta yritystä ei tehdä, jos
+    ``uusittava`` on epätosi tai yritykset ovat lopussa.
+    """
+    nyt = timezone.now()
+    kaynnissa = Tyo.objects.filter(pk=tyo.pk, tila=Tyo.KAYNNISSA)
+    if uusittava and tyo.yritykset < tyo.enimmaisyritykset:
+        kaynnissa.update(tila=Tyo.JONOSSA, virhe=virhe, ajoaika=nyt + viive(tyo.yritykset))
+    else:
+        kaynnissa.update(tila=Tyo.EPAONNISTUI, virhe=virhe, valmistunut=nyt)
+
+
+def suorita(pk):
+    """Ajaa varatun työn ja tallentaa tuloksen tai virheen.
+
+    Ajetaan työntekijän poolissa. Palauttaa True, jos työ onnistui.
+    """
+    tyo = Tyo.objects.get(pk=pk)
+    funktio = TEHTAVAT.get(tyo.tehtava)
+    try:
+        if funktio is None:
+            raise TyoVirhe(f'Tuntematon tehtävä: {tyo.tehtava}')
+        tulos = funktio(Edistyminen(pk), **tyo.parametrit)
+    except Exception:
+        kirjaa_virhe(tyo, traceback.format_exc(), uusittava=funktio is not None)
+        return False
+    Tyo.objects.filter(pk=pk).update(
+        tila=Tyo.VALMIS, tulos=tulos, virhe='', valmistunut=timezone.now(),
+    )
+    return True
@@ -1,12 +1,33 @@
 """Puutarhapäiväkirjan URL-reitit."""
 from django.urls import path
-from . import views
+from . import api, async_views, views
 
 urlpatterns = [
     path('', views.EtusivuView.as_view(), name='etusivu'),
     path('kasvit/', views.KasvilistaView.as_view(), name='kasvilista'),
+    path('haku/', views.HakuView.as_view(), name='haku'),
+    path('sadot/', views.TulevatSadotView.as_view(), name='tulevat_sadot'),
+    path('tilastot/', views.TilastotView.as_view(), name='tilastot'),
+    path('kalenteri.ics', views.KalenteriView.as_view(), name='kalenteri'),
+    path('vienti/<slug:laji>.<slug:muoto>', views.VientiView.as_view(), name='vienti'),
     path('kasvit/lisaa/', views.LisaaKasvilajiView.as_view(), name='lisaa_kasvilaji'),
     path('puutarha/lisaa/', views.LisaaViljelyView.as_view(), name='lisaa_viljely'),
     path('puutarha/<int:pk>/', views.ViljelyDetailView.as_view(), name='viljely_detail'),
     path('puutarha/<int:pk>/tila/', views.VaihdaTilaView.as_view(), name='vaihda_tila'),
+    path('puutarha/tila/', views.VaihdaTilatView.as_view(), name='vaihda_tilat'),
+    path('puutarha/<int:pk>/havainnot/', views.HavainnotView.as_view(), name='havainnot'),
+    path('kuvat/<slug:tiiviste>/<slug:versio>.<slug:tunniste>.jpg', views.KuvaView.as_view(),
+         name='kuva'),
+    # Asynkroniset versiot ASGI-palvelimelle
+    path('async/', async_views.EtusivuView.as_view(), name='async_etusivu'),
+    path('async/kasvit/', async_views.KasvilistaView.as_view(), name='async_kasvilista'),
+    path('async/puutarha/<int:pk>/', async_views.ViljelyDetailView.as_view(), name='async_viljely_detail'),
+    path('async/puutarha/<int:pk>/tila/', async_views.VaihdaTilaView.as_view(), name='async_vaihda_tila'),
+    path('api/kasvilajit/', api.KasvilajiApiView.as_view(), name='api_kasvilajit'),
+    path('api/kasvilajit/ehdotukset/', api.KasvilajiEhdotusView.as_view(),
+         name='api_kasvilaji_ehdotukset'),
+    path('api/viljelyt/', api.ViljelyApiView.as_view(), name='api_viljelyt'),
+    path('api/havainnot/', api.HavaintoApiView.as_view(), name='api_havainnot'),
+    path('api/viljelyt/<int:pk>/mittaukset/', api.MittauskaavioView.as_view(),
+         name='api_mittaukset'),
 ]
@@ -0,0 +1,71 @@
+"""Taulukohtaiset muutoslaskurit ETagien ja välimuistien validointiin.
+
+Laskuria kasvatetaan ja muutosaika päivitetään SQLite-triggereillä,
+joten ne kattavat myös ``bulk_create``-, ``update``- ja ``delete``-polut
+eikä vaadi signaaleja. Versioiden luku on yksi pääavainhaku.
+"""
+import hashlib
+
+from .models import (
+    GardenNote, Kuva, Mittaus, MyGarden, PlantSpecies, TietoVersio, ViljelyTilasto,
+)
+
+SEURATUT_MALLIT = [PlantSpecies, MyGarden, GardenNote, Kuva, Mittaus, ViljelyTilasto]
+TAPAHTUMAT = {'ai': 'INSERT', 'au': 'UPDATE', 'ad': 'DELETE'}
+
+
+def _versiotaulu():
+    return TietoVersio._meta.db_table
+
+
+def luo_triggerit_sql(taulut):
+    """Palauttaa versiolaskurien triggerien luontilauseet."""
+    versiotaulu = _versiotaulu()
+    lauseet = []
+    for taulu in taulut:
+        for lyhenne, tapahtuma in TAPAHTUMAT.items():
+            lauseet.append(
+                f"CREATE TRIGGER IF NOT EXISTS {taulu}_versio_{lyhenne} AFTER {tapahtuma} ON {taulu} BEGIN "
+                f"INSERT INTO {versiotaulu}(taulu, versio, muutettu) "
+                f"VALUES ('{taulu}', 1, CURRENT_TIMESTAMP) "
+                f"ON CONFLICT(taulu) DO UPDATE SET versio = versio + 1, "
+                f"muutettu = CURRENT_TIMESTAMP; END"
+            )
+    return lauseet
+
+
+def poista_triggerit_sql(taulut):
+    """Palauttaa versiolaskurien triggerien poistolauseet."""
+    return [
+        f'DROP TRIGGER IF EXISTS {taulu}_versio_{lyhenne}'
+        for taulu in taulut for lyhenne in TAPAHTUMAT
+    ]
+
+
+def tietoversiot(*mallit):
+    """Palauttaa mallien muutoslaskurit samassa järjestyksessä."""
+    taulut = [malli._meta.db_table for malli in mallit]
+    versiot = dict(
+        TietoVersio.objects.filter(taulu__in=taulut).values_list('taulu', 'versio')
+    )
+    return tuple(versiot.get(taulu, 0) for taulu in taulut)
+
+
+def versiotiedot(*mallit):
+    """Palauttaa mallien muutoslaskurit ja viimeisimmän muutosajan.
+
+    Yksi kysely; muutosaika on None, jos tauluja ei ole vielä muutettu.
+    """
+    taulut = [malli._meta.db_table for malli in mallit]
+    rivit = {
+        taulu: (versio, muutettu) for taulu, versio, muutettu in
+        TietoVersio.objects.filter(taulu__in=taulut).values_list('taulu', 'versio', 'muutettu')
+    }
+    versiot = tuple(rivit.get(taulu, (0, None))[0] for taulu in taulut)
+    ajat = [muutettu for _, muutettu in rivit.values() if muutettu]
+    return versiot, max(ajat, default=None)
+
+
+def versio_etag(*osat):
+    """Muodostaa vahvan ETagin (ilman lainausmerkkejä) annetuista osista."""
+    return hashlib.sha1(repr(osat).encode()).hexdigest()
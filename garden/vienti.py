@@ -0,0 +1,129 @@
+"""Viljelyjen ja havaintojen vienti CSV- tai JSONL-muodossa.
+
+Rivit luetaan ``values_list()``-tupleina ``iterator()``illa ja
+kirjoitetaan rivi kerrallaan, joten muistinkäyttö pysyy vakiona viennin
+koosta riippumatta. Suodattimet (kausi, kategoria, tila) tehdään SQL:ssä.
+"""
+import csv
+import json
+from datetime import date, datetime
+
+from .models import GardenNote, MyGarden
+
+ERAKOKO = 2000
+
+VIENNIT = {
+    'viljelyt': {
+        'malli': MyGarden,
+        'kentat': [
+            ('id', 'id'),
+            ('kasvilaji', 'kasvilaji__nimi'),
+            ('lajike', 'kasvilaji__lajike'),
+            ('kategoria', 'kasvilaji__kategoria'),
+            ('kasvupaikka', 'kasvupaikka'),
+            ('tila', 'tila'),
+            ('kylvopaiva', 'kylvopaiva'),
+            ('arvioitu_sato', 'arvioitu_sato'),
+            ('havaintoja', 'havaintoja'),
+            ('viimeisin_havainto', 'viimeisin_havainto'),
+            ('muistiinpanot', 'muistiinpanot'),
+            ('lisatty', 'lisatty'),
+        ],
+        'suodattimet': {
+            'kausi': 'kylvopaiva__year',
+            'kategoria': 'kasvilaji__kategoria',
+            'tila': 'tila',
+        },
+    },
+    'havainnot': {
+        'malli': GardenNote,
+        'kentat': [
+            ('id', 'id'),
+            ('viljely', 'kasvi_id'),
+            ('kasvilaji', 'kasvi__kasvilaji__nimi'),
+            ('lajike', 'kasvi__kasvilaji__lajike'),
+            ('paivamaara', 'paivamaara'),
+            ('havainto', 'havainto'),
+        ],
+        'suodattimet': {
+            'kausi': 'paivamaara__year',
+            'kategoria': 'kasvi__kasvilaji__kategoria',
+            'tila': 'kasvi__tila',
+        },
+    },
+}
+
+MUODOT = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+
+class VientiVirhe(ValueError):
+    """Tuntematon vienti, muoto tai virheellinen suodatin."""
+
+
+def vientikysely(laji, kausi=None, kategoria=None, tila=None):
+    """Palauttaa (otsikot, rivi-iteraattori) viennille ``laji``."""
+    if laji not in VIENNIT:
+        raise VientiVirhe(f'Tuntematon vienti: {laji}')
+    maaritys = VIENNIT[laji]
+    ehdot = {}
+    for nimi, arvo in (('kausi', kausi), ('kategoria', kategoria), ('tila', tila)):
+        if arvo in (None, ''):
+            continue
+        if nimi == 'kausi':
+            try:
+                arvo = int(arvo)
+            except (TypeError, ValueError):
+                raise VientiVirhe(f'Virheellinen kausi: {arvo}')
+        ehdot[maaritys['suodattimet'][nimi]] = arvo
+    otsikot = [otsikko for otsikko, _ in maaritys['kentat']]
+    rivit = (
+        maaritys['malli'].objects.filter(**ehdot).order_by('pk')
+        .values_list(*[kentta for _, kentta in maaritys['kentat']])
+        .iterator(chunk_size=ERAKOKO)
+    )
+    return otsikot, rivit
+
+
+class _Kaiku:
+    """csv.writerin "tiedosto", joka palauttaa kirjoitetun rivin."""
+
+    def write(self, arvo):
+        return arvo
+
+
+def _arvo(arvo):
+    if isinstance(arvo, (date, datetime)):
+        return arvo.isoformat()
+    return arvo
+
+
+def csv_rivit(otsikot, rivit):
+    """Tuottaa CSV:n rivi kerrallaan otsikkoriveineen."""
+    kirjoittaja = csv.writer(_Kaiku())
+    yield kirjoittaja.writerow(otsikot)
+    for rivi in rivit:
+        yield kirjoittaja.writerow([_arvo(a) for a in rivi])
+
+
+def jsonl_rivit(otsikot, rivit):
+    """Tuottaa yhden JSON-objektin riviä kohden."""
+    for rivi in rivit:
+        yield json.dumps(
+            dict(zip(otsikot, (_arvo(a) for a in rivi))), ensure_ascii=False,
+        ) + '\n'
+
+
+KIRJOITTAJAT = {'csv': csv_rivit, 'jsonl': jsonl_rivit}
+# Otsikkorivien määrä muodon alussa; ne eivät ole vietyjä rivejä
+OTSIKKORIVIT = {'csv': 1, 'jsonl': 0}
+
+
+def vie(laji, muoto, **suodattimet):
+    """Palauttaa viennin merkkijonopaloina (generaattori)."""
+    if muoto not in KIRJOITTAJAT:
+        raise VientiVirhe(f'Tuntematon muoto: {muoto}')
+    otsikot, rivit = vientikysely(laji, **suodattimet)
+    return KIRJOITTAJAT[muoto](otsikot, rivit)
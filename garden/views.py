@@ -1,11 +1,33 @@
 """Puutarhapäiväkirjan näkymät."""
-from datetime import date
+import json
+import mimetypes
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotModified, JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views import View
 from django.views.generic import ListView, CreateView
 from django.urls import reverse
-from .models import PlantSpecies, MyGarden, GardenNote
-from .forms import MyGardenForm, TilaForm, GardenNoteForm, PlantSpeciesForm
+from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, quote_etag
+from django.views.static import was_modified_since
+from . import haku, kalenteri, kuvat, mittaukset, staattiset, tilastot, vienti
+from .models import PlantSpecies, MyGarden, GardenNote, Kuva, ViljelyTilasto, kk_bitti
+from .forms import MyGardenForm, TilaForm, GardenNoteForm, MittausForm, PlantSpeciesForm
+from .pagination import keyset_sivu
+from .versiot import versio_etag, versiotiedot
 
 
 # Kuukausien nimet suomeksi
@@ -15,88 +37,195 @@ KUUKAUDET = [
 ]
 
 
-class EtusivuView(View):
-    """Etusivu: kasvukalenteri (omat viljelyt) ja viljelylista."""
-
-    def get(self, request):
-        tama_kk = date.today().month
-        omat_viljelyt = MyGarden.objects.exclude(tila='paattynyt').select_related('kasvilaji')
-
-        # Kasvukalenteri: ryhmitellään omat viljelyt kategorioittain
-        kategoriat_dict = {}
-        for v in omat_viljelyt:
-            laji = v.kasvilaji
-            kat = laji.kategoria
-            if kat not in kategoriat_dict:
-                kategoriat_dict[kat] = []
-
-            kylvo_kk = set(laji.kylvo_kuukaudet())
-            sato_kk = set(laji.sato_kuukaudet())
-
-            # Kasvukuukaudet = kylvön jälkeen, ennen satoa
-            if laji.kylvo_loppu_kk < laji.sato_alku_kk:
-                kasvu_kk = set(range(laji.kylvo_loppu_kk + 1, laji.sato_alku_kk))
+def rakenna_kasvukalenteri(viljelyt, tama_kk):
+    """Ryhmittelee viljelyt kategorioittain ja merkitsee kuukausien tyypit."""
+    kategoriat_dict = {}
+    for v in viljelyt:
+        laji = v.kasvilaji
+        kat = laji.kategoria
+        if kat not in kategoriat_dict:
+            kategoriat_dict[kat] = []
+
+        kuukaudet = []
+        for kk in range(1, 13):
+            bitti = kk_bitti(kk)
+            if laji.kylvo_maski & bitti:
+                tyyppi = 'kylvo'
+            elif laji.kasvu_maski & bitti:
+                tyyppi = 'kasvu'
+            elif laji.sato_maski & bitti:
+                tyyppi = 'sato'
             else:
-                kasvu_kk = set()
-
-            kuukaudet = []
-            for kk in range(1, 13):
-                if kk in kylvo_kk:
-                    tyyppi = 'kylvo'
-                elif kk in kasvu_kk:
-                    tyyppi = 'kasvu'
-                elif kk in sato_kk:
-                    tyyppi = 'sato'
-                else:
-                    tyyppi = ''
-                kuukaudet.append({
-                    'kk': kk,
-                    'nimi': KUUKAUDET[kk],
-                    'tyyppi': tyyppi,
-                    'nykyinen': kk == tama_kk,
-                })
-
-            kategoriat_dict[kat].append({
-                'viljely': v,
-                'nimi': str(laji),
-                'kuukaudet': kuukaudet,
+                tyyppi = ''
+            kuukaudet.append({
+                'kk': kk,
+                'nimi': KUUKAUDET[kk],
+                'tyyppi': tyyppi,
+                'nykyinen': kk == tama_kk,
             })
 
-        kasvukalenteri = [
-            {'kategoria': kat, 'kasvit': kasvit}
-            for kat, kasvit in kategoriat_dict.items()
-        ]
+        kategoriat_dict[kat].append({
+            'viljely': v,
+            'nimi': str(laji),
+            'kuukaudet': kuukaudet,
+        })
 
-        kk_otsikot = [KUUKAUDET[kk] for kk in range(1, 13)]
+    return [
+        {'kategoria': kat, 'kasvit': kasvit}
+        for kat, kasvit in kategoriat_dict.items()
+    ]
+
+
+def etusivu_konteksti(omat_viljelyt, tama_kk, jarjestys='lisatty'):
+    """Etusivun templaten konteksti jo haetuista viljelyistä."""
+    return {
+        'omat_viljelyt': omat_viljelyt,
+        'jarjestys': jarjestys,
+        'kasvukalenteri': rakenna_kasvukalenteri(omat_viljelyt, tama_kk),
+        'kk_otsikot': [KUUKAUDET[kk] for kk in range(1, 13)],
+        'tama_kk': tama_kk,
+        'tila_valinnat': MyGarden.TILA_CHOICES,
+    }
+
+
+class EhdollinenGetMixin:
+    """Vastaa GET-pyyntöön 304:llä ennen sivun kyselyitä ja renderöintiä.
+
+    ETag lasketaan ``validaattorimallit``-taulujen muutoslaskureista,
+    polusta, parametreista, päivämäärästä, CSRF-evästeestä (sivun
+    lomakkeet) ja julkaisun tunnisteesta (``staattiset.julkaisutunniste``). Last-Modified on taulujen viimeisin muutos, kuitenkin
+    vähintään kuluvan päivän alku, koska sivut riippuvat päivämäärästä.
+    """
+    validaattorimallit = (PlantSpecies, MyGarden, GardenNote)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        tanaan = date.today()
+        versiot, muutettu = versiotiedot(*self.validaattorimallit)
+        etag = quote_etag(versio_etag(
+            request.path, sorted(request.GET.lists()), tanaan, versiot,
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME), staattiset.julkaisutunniste(),
+        ))
+        paivan_alku = timezone.make_aware(datetime.combine(tanaan, time.min))
+        last_modified = int(max(filter(None, [muutettu, paivan_alku])).timestamp())
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(last_modified)
+        # Selain saa säilyttää sivun, mutta sen on aina tarkistettava se
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+def aktiiviset_viljelyt():
+    """Käynnissä olevat viljelyt lajeineen (osittaisindeksi)."""
+    return MyGarden.objects.exclude(tila='paattynyt').select_related('kasvilaji')
+
+
+# Etusivun järjestykset: ?jarjestys=havainnot näyttää viimeksi havainnoidut
+# viljelyt (vain ne, joilla on havaintoja) aktiivisuusindeksin kautta.
+ETUSIVU_JARJESTYKSET = {
+    'lisatty': ['-lisatty', '-id'],
+    'havainnot': ['-viimeisin_havainto', '-id'],
+}
+
+
+def etusivun_viljelyt(request):
+    """Palauttaa etusivun kyselyn, järjestyskentät ja valitun järjestyksen."""
+    valittu = request.GET.get('jarjestys')
+    if valittu not in ETUSIVU_JARJESTYKSET:
+        valittu = 'lisatty'
+    qs = aktiiviset_viljelyt()
+    if valittu == 'havainnot':
+        qs = qs.filter(viimeisin_havainto__isnull=False)
+    return qs, ETUSIVU_JARJESTYKSET[valittu], valittu
+
+
+class EtusivuView(EhdollinenGetMixin, View):
+    """Etusivu: kasvukalenteri (omat viljelyt) ja viljelylista."""
+    sivun_koko = 25
+    validaattorimallit = (PlantSpecies, MyGarden)
 
-        return render(request, 'garden/etusivu.html', {
-            'omat_viljelyt': omat_viljelyt,
-            'kasvukalenteri': kasvukalenteri,
-            'kk_otsikot': kk_otsikot,
-            'tama_kk': tama_kk,
-        })
+    def get(self, request):
+        qs, jarjestys, valittu = etusivun_viljelyt(request)
+        omat_viljelyt = keyset_sivu(
+            qs, jarjestys, self.sivun_koko,
+            jalkeen=request.GET.get('jalkeen'), ennen=request.GET.get('ennen'),
+        )
+        return render(
+            request, 'garden/etusivu.html',
+            etusivu_konteksti(omat_viljelyt, date.today().month, valittu),
+        )
 
 
-class KasvilistaView(ListView):
-    """Kasvilista: kaikki lajit, suodatus kategorian mukaan."""
+def _kuukausi_param(request, nimi):
+    """Palauttaa GET-parametrin kuukautena (1-12) tai None."""
+    try:
+        kk = int(request.GET.get(nimi, ''))
+    except ValueError:
+        return None
+    return kk if 1 <= kk <= 12 else None
+
+
+def suodata_kasvilajit(qs, request):
+    """Rajaa kasvilajit kategorian sekä kylvö- ja satokuukauden mukaan."""
+    kategoria = request.GET.get('kategoria')
+    if kategoria:
+        qs = qs.filter(kategoria=kategoria)
+    kylvo_kk = _kuukausi_param(request, 'kylvo')
+    if kylvo_kk:
+        qs = qs.kylvettavissa(kylvo_kk)
+    sato_kk = _kuukausi_param(request, 'sato')
+    if sato_kk:
+        qs = qs.korjattavissa(sato_kk)
+    return qs
+
+
+def kategoriat_kysely():
+    """Kaikki kategoriat aakkosjärjestyksessä (kattava indeksihaku)."""
+    return (
+        PlantSpecies.objects.values_list('kategoria', flat=True)
+        .distinct().order_by('kategoria')
+    )
+
+
+def kasvilista_suodattimet(request):
+    """Kasvilistan suodatinvalintojen konteksti."""
+    return {
+        'valittu_kategoria': request.GET.get('kategoria', ''),
+        'kuukaudet': [(kk, KUUKAUDET[kk]) for kk in range(1, 13)],
+        'valittu_kylvo': _kuukausi_param(request, 'kylvo'),
+        'valittu_sato': _kuukausi_param(request, 'sato'),
+    }
+
+
+class KasvilistaView(EhdollinenGetMixin, ListView):
+    """Kasvilista: kaikki lajit, suodatus kategorian ja kuukauden mukaan."""
+    validaattorimallit = (PlantSpecies,)
     model = PlantSpecies
     template_name = 'garden/kasvilista.html'
     context_object_name = 'kasvit'
+    sivun_koko = 24
+    jarjestys = ['kategoria', 'nimi', 'id']
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        kategoria = self.request.GET.get('kategoria')
-        if kategoria:
-            qs = qs.filter(kategoria=kategoria)
-        return qs
+        return suodata_kasvilajit(super().get_queryset(), self.request)
 
     def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['kategoriat'] = (
-            PlantSpecies.objects.values_list('kategoria', flat=True)
-            .distinct().order_by('kategoria')
+        sivu = keyset_sivu(
+            self.object_list, self.jarjestys, self.sivun_koko,
+            jalkeen=self.request.GET.get('jalkeen'),
+            ennen=self.request.GET.get('ennen'),
         )
-        context['valittu_kategoria'] = self.request.GET.get('kategoria', '')
+        context = super().get_context_data(object_list=sivu.rivit, **kwargs)
+        context['sivu'] = sivu
+        context['kategoriat'] = kategoriat_kysely()
+        context.update(kasvilista_suodattimet(self.request))
         return context
 
 
@@ -127,14 +256,28 @@ class LisaaKasvilajiView(CreateView):
         return reverse('kasvilista')
 
 
-class ViljelyDetailView(View):
-    """Viljelymerkinnän yksityiskohdat + havainnot."""
+# Havainnot sivutetaan uusimmasta alkaen (paivamaara, id) -avaimella
+HAVAINNOT_JARJESTYS = ['-paivamaara', '-id']
+HAVAINNOT_SIVU = 20
+
+
+def on_fragmenttipyynto(request):
+    """Pyytääkö selaimen skripti pelkkää HTML-palaa koko sivun sijaan."""
+    return request.headers.get('X-Requested-With') == 'fetch'
+
+
+class ViljelyDetailView(EhdollinenGetMixin, View):
+    """Viljelymerkinnän yksityiskohdat + uusimmat havainnot."""
+    # Kuvan valmistuminen taustatyössä vaihtaa odotusviestin pikkukuvaksi
+    validaattorimallit = (PlantSpecies, MyGarden, GardenNote, Kuva)
 
     def get(self, request, pk):
         viljely = get_object_or_404(
             MyGarden.objects.select_related('kasvilaji'), pk=pk
         )
-        havainnot = viljely.havainnot.all()
+        havainnot = keyset_sivu(
+            viljely.havainnot.prefetch_related('kuvat'), HAVAINNOT_JARJESTYS, HAVAINNOT_SIVU
+        )
         note_form = GardenNoteForm(initial={'paivamaara': date.today()})
         tila_form = TilaForm(instance=viljely)
 
@@ -143,36 +286,321 @@ class ViljelyDetailView(View):
             'havainnot': havainnot,
             'note_form': note_form,
             'tila_form': tila_form,
+            'mittaus_form': MittausForm(prefix='mittaus', initial={'paivamaara': date.today()}),
+            'mittaussuureet': mittaukset.SUUREVALINNAT,
         })
 
     def post(self, request, pk):
-        viljely = get_object_or_404(MyGarden, pk=pk)
+        return viljelyn_lomake(request, pk)
+
+
+def viljelyn_lomake(request, pk, paluu='viljely_detail'):
+    """Viljelysivun lomakkeet: tilan vaihto, uusi havainto ja uusi mittaus.
+
+    Yhteinen sync- ja async-näkymälle; ``paluu`` on uudelleenohjauksen
+    reitin nimi.
+    """
+    viljely = get_object_or_404(MyGarden, pk=pk)
 
-        # Tilan vaihto
-        if 'vaihda_tila' in request.POST:
-            tila_form = TilaForm(request.POST, instance=viljely)
-            if tila_form.is_valid():
-                tila_form.save()
-            return redirect('viljely_detail', pk=pk)
-
-        # Uusi havainto
-        if 'lisaa_havainto' in request.POST:
-            note_form = GardenNoteForm(request.POST)
-            if note_form.is_valid():
-                note = note_form.save(commit=False)
-                note.kasvi = viljely
+    # Tilan vaihto
+    if 'vaihda_tila' in request.POST:
+        tila_form = TilaForm(request.POST, instance=viljely)
+        if tila_form.is_valid():
+            tila_form.save()
+        return redirect(paluu, pk=pk)
+
+    # Uusi havainto
+    if 'lisaa_havainto' in request.POST:
+        note_form = GardenNoteForm(request.POST, request.FILES)
+        if note_form.is_valid():
+            note = note_form.save(commit=False)
+            note.kasvi = viljely
+            # Havainto, kuvat ja viljelyn laskurit tallentuvat yhdessä
+            with transaction.atomic():
                 note.save()
-            return redirect('viljely_detail', pk=pk)
+                note.kuvat.add(*[
+                    kuvat.tallenna(tiedosto) for tiedosto in note_form.cleaned_data['kuvat']
+                ])
+            if on_fragmenttipyynto(request):
+                return render(request, 'garden/havainto.html', {'h': note})
+        elif on_fragmenttipyynto(request):
+            return HttpResponse(
+                ' '.join(e for virheet in note_form.errors.values() for e in virheet),
+                status=400, content_type='text/plain; charset=utf-8',
+            )
+        return redirect(paluu, pk=pk)
+
+    # Uusi mittaus; kaavio päivittyy koosteista
+    if 'lisaa_mittaus' in request.POST:
+        mittaus_form = MittausForm(request.POST, prefix='mittaus')
+        kelvollinen = mittaus_form.is_valid()
+        if kelvollinen:
+            mittaus = mittaus_form.save(commit=False)
+            mittaus.viljely = viljely
+            mittaus.save()
+        if on_fragmenttipyynto(request):
+            return HttpResponse(status=204 if kelvollinen else 400)
+        return redirect(paluu, pk=pk)
+
+    return redirect(paluu, pk=pk)
+
+
+class HavainnotView(View):
+    """Vanhempien havaintojen sivu HTML-palana ("Näytä vanhemmat")."""
 
-        return redirect('viljely_detail', pk=pk)
+    def get(self, request, pk):
+        get_object_or_404(MyGarden.objects.only('pk'), pk=pk)
+        havainnot = keyset_sivu(
+            GardenNote.objects.filter(kasvi_id=pk).prefetch_related('kuvat'),
+            HAVAINNOT_JARJESTYS, HAVAINNOT_SIVU,
+            jalkeen=request.GET.get('jalkeen'),
+        )
+        return render(request, 'garden/havainnot_sivu.html', {
+            'havainnot': havainnot,
+            'viljely_id': pk,
+        })
 
 
 class VaihdaTilaView(View):
-    """Tilan vaihto etusivulta (AJAX-tyylinen POST)."""
+    """Tilan vaihto etusivulta (AJAX-tyylinen POST).
+
+    Skriptin pyynnölle (``X-Requested-With: fetch``) vastataan 204:llä
+    ilman uudelleenohjausta ja etusivun uudelleenpiirtoa.
+    """
 
     def post(self, request, pk):
         viljely = get_object_or_404(MyGarden, pk=pk)
         tila_form = TilaForm(request.POST, instance=viljely)
-        if tila_form.is_valid():
-            tila_form.save()
+        kelvollinen = tila_form.is_valid()
+        if kelvollinen:
+            viljely.save(update_fields=['tila'])
+        if on_fragmenttipyynto(request):
+            return HttpResponse(status=204 if kelvollinen else 400)
+        return redirect('etusivu')
+
+
+def paivita_tilat(muutokset):
+    """Päivittää viljelyjen tilat yhdellä UPDATE ... CASE -lauseella.
+
+    ``muutokset`` on sanakirja pk -> tila. Sadonkorjuuseen siirtyville
+    merkitään samalla sadonkorjuun alkamispäivä, ellei sitä jo ole.
+    Palauttaa päivitettyjen rivien määrän.
+    """
+    ryhmat = {}
+    for pk, tila in muutokset.items():
+        ryhmat.setdefault(tila, []).append(pk)
+    with transaction.atomic():
+        return MyGarden.objects.filter(pk__in=list(muutokset)).update(
+            tila=Case(
+                *[When(pk__in=pkt, then=Value(tila)) for tila, pkt in ryhmat.items()],
+                default=F('tila'),
+            ),
+            sadonkorjuu_alkoi=Case(
+                When(
+                    pk__in=ryhmat.get('sadonkorjuu', []), sadonkorjuu_alkoi__isnull=True,
+                    then=Value(timezone.localdate()),
+                ),
+                default=F('sadonkorjuu_alkoi'),
+            ),
+        )
+
+
+class VaihdaTilatView(View):
+    """Usean viljelyn tilan vaihto kerralla.
+
+    Hyväksyy joko JSON-rungon ``{"<pk>": "<tila>", ...}`` tai lomakkeen,
+    jossa ``valitut`` (pk:t) ja yhteinen ``tila``. JSON-pyyntöön vastataan
+    ``{"paivitetty": n}``, lomakkeeseen uudelleenohjauksella etusivulle.
+    """
+
+    def post(self, request):
+        sallitut = {tila for tila, _ in MyGarden.TILA_CHOICES}
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body)
+                muutokset = {int(pk): str(tila) for pk, tila in data.items()}
+            except (ValueError, AttributeError):
+                return JsonResponse({'virhe': 'Virheellinen JSON.'}, status=400)
+        else:
+            tila = request.POST.get('tila')
+            if not tila:
+                return JsonResponse({'virhe': 'Tila puuttuu.'}, status=400)
+            try:
+                muutokset = {int(pk): tila for pk in request.POST.getlist('valitut')}
+            except ValueError:
+                return JsonResponse({'virhe': 'Virheellinen viljely.'}, status=400)
+
+        virheelliset = sorted(set(muutokset.values()) - sallitut)
+        if virheelliset:
+            return JsonResponse(
+                {'virhe': f"Tuntematon tila: {', '.join(virheelliset)}"}, status=400,
+            )
+
+        paivitetty = paivita_tilat(muutokset) if muutokset else 0
+        if request.content_type == 'application/json':
+            return JsonResponse({'paivitetty': paivitetty})
         return redirect('etusivu')
+
+
+class TulevatSadotView(View):
+    """Viljelyt, joiden arvioitu sato alkaa lähipäivinä (``?paivia=``)."""
+    oletus_paivia = 21
+
+    def get(self, request):
+        try:
+            paivia = min(max(int(request.GET.get('paivia', '')), 1), 365)
+        except ValueError:
+            paivia = self.oletus_paivia
+        tanaan = date.today()
+        viljelyt = (
+            MyGarden.objects.tulevat_sadot(tanaan, tanaan + timedelta(days=paivia))
+            .select_related('kasvilaji')
+        )
+        return render(request, 'garden/tulevat_sadot.html', {
+            'viljelyt': viljelyt,
+            'paivia': paivia,
+        })
+
+
+class TilastotView(EhdollinenGetMixin, View):
+    """Kausi- ja kategoriatilastot valmiista yhteenvetotaulusta."""
+    validaattorimallit = (ViljelyTilasto,)
+
+    def get(self, request):
+        return render(request, 'garden/tilastot.html', tilastot.yhteenveto())
+
+
+class KalenteriView(View):
+    """Käynnissä olevien viljelyjen kylvö-, itämis- ja satoikkunat .ics-syötteenä.
+
+    Kalenterisovellukset kyselevät syötettä tiheään, joten ETag ja
+    Last-Modified lasketaan muutoslaskureista ja muuttumaton syöte saa
+    304-vastauksen ilman listakyselyä. Rivit luetaan ``iterator()``illa
+    ``values()``-muodossa ja kalenteri suoratoistetaan.
+    """
+    erakoko = 500
+    mallit = (PlantSpecies, MyGarden)
+
+    def get(self, request):
+        vuosi = date.today().year
+        versiot, muutettu = versiotiedot(*self.mallit)
+        etag = quote_etag(versio_etag(request.path, vuosi, versiot))
+        last_modified = int(muutettu.timestamp()) if muutettu else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified,
+        )
+        if response is None:
+            viljelyt = (
+                MyGarden.objects.exclude(tila='paattynyt').order_by('pk')
+                .values(*kalenteri.KENTAT).iterator(chunk_size=self.erakoko)
+            )
+            response = StreamingHttpResponse(
+                kalenteri.kalenteri(viljelyt, vuosi, muutettu or timezone.now()),
+                content_type='text/calendar; charset=utf-8',
+            )
+            response.headers['Content-Disposition'] = 'inline; filename="puutarha.ics"'
+        response.headers['ETag'] = etag
+        if last_modified:
+            response.headers['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class VientiView(View):
+    """Viljelyt tai havainnot CSV/JSONL-tiedostona (suoratoistona).
+
+    Suodattimet ``?kausi=``, ``?kategoria=`` ja ``?tila=``.
+    """
+
+    def get(self, request, laji, muoto):
+        if laji not in vienti.VIENNIT or muoto not in vienti.MUODOT:
+            raise Http404('Tuntematon vienti.')
+        try:
+            palat = vienti.vie(
+                laji, muoto,
+                kausi=request.GET.get('kausi'),
+                kategoria=request.GET.get('kategoria'),
+                tila=request.GET.get('tila'),
+            )
+        except vienti.VientiVirhe as e:
+            return HttpResponse(str(e), status=400, content_type='text/plain; charset=utf-8')
+        response = StreamingHttpResponse(palat, content_type=vienti.MUODOT[muoto])
+        response.headers['Content-Disposition'] = f'attachment; filename="{laji}.{muoto}"'
+        return response
+
+
+class StaattinenView(View):
+    """Palvelee ``collectstatic``in tuottamat tiedostot ``STATIC_ROOT``ista.
+
+    Tiivisteelliset nimet saavat vuoden ``immutable``-välimuistin, muut
+    lyhyen. Valmiiksi pakattu ``.gz``-versio lähetetään, kun selain
+    hyväksyy gzipin.
+    """
+
+    def get(self, request, polku):
+        try:
+            tiedosto = Path(safe_join(settings.STATIC_ROOT, polku))
+        except SuspiciousFileOperation:
+            raise Http404('Tiedostoa ei löydy.')
+        if not tiedosto.is_file():
+            raise Http404('Tiedostoa ei löydy.')
+
+        tila = tiedosto.stat()
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), tila.st_mtime):
+            response = HttpResponseNotModified()
+        else:
+            content_type, _ = mimetypes.guess_type(tiedosto.name)
+            pakattu = tiedosto.with_name(tiedosto.name + '.gz')
+            hyvaksyy_gzipin = 'gzip' in request.headers.get('Accept-Encoding', '')
+            if hyvaksyy_gzipin and pakattu.is_file():
+                response = FileResponse(
+                    pakattu.open('rb'), content_type=content_type or 'application/octet-stream',
+                )
+                response.headers['Content-Encoding'] = 'gzip'
+            else:
+                response = FileResponse(
+                    tiedosto.open('rb'), content_type=content_type or 'application/octet-stream',
+                )
+            response.headers['Last-Modified'] = http_date(tila.st_mtime)
+        if tiedosto.suffix in staattiset.PAKATTAVAT:
+            patch_vary_headers(response, ['Accept-Encoding'])
+        if staattiset.on_tiivisteellinen(tiedosto.name):
+            patch_cache_control(response, public=True, max_age=staattiset.VUOSI, immutable=True)
+        else:
+            patch_cache_control(response, public=True, max_age=staattiset.MUUTTUVAN_IKA)
+        return response
+
+
+class KuvaView(View):
+    """Palvelee havaintokuvan pienennetyn version (ks. ``garden.kuvat``).
+
+    Osoitteessa on version oman sisällön tiiviste, joten vastaus saa
+    vuoden ``immutable``-välimuistin. Alkuperäisiä tiedostoja ei palvella.
+    """
+
+    def get(self, request, tiiviste, versio, tunniste):
+        if versio not in kuvat.VERSIOT:
+            raise Http404('Tuntematon kuvaversio.')
+        etag = quote_etag(f'{versio}-{tunniste}')
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            try:
+                tiedosto = default_storage.open(kuvat.tallennusnimi(tiiviste, versio, tunniste))
+            except FileNotFoundError:
+                raise Http404('Kuvaa ei löydy.')
+            response = FileResponse(tiedosto, content_type='image/jpeg')
+        response.headers['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=staattiset.VUOSI, immutable=True)
+        return response
+
+
+class HakuView(View):
+    """Kokotekstihaku kasvilajeista ja havainnoista."""
+    tulosten_maara = 20
+
+    def get(self, request):
+        kysely = request.GET.get('q', '').strip()
+        return render(request, 'garden/haku.html', {
+            'kysely': kysely,
+            'kasvilajit': haku.hae_kasvilajit(kysely, self.tulosten_maara) if kysely else [],
+            'havainnot': haku.hae_havainnot(kysely, self.tulosten_maara) if kysely else [],
+        })
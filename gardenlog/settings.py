@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'garden.middleware.KyselyBudjettiMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -50,6 +52,10 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Pyyntökohtainen kyselyseuranta (X-Kyselyt-otsakkeet ja garden.kyselyt-loki)
+GARDEN_KYSELYSEURANTA = False
+GARDEN_KYSELYBUDJETTI = None
+
 ROOT_URLCONF = 'gardenlog.urls'
 
 TEMPLATES = [
@@ -76,10 +82,14 @@ WSGI_APPLICATION = 'gardenlog.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('GARDENLOG_DB', BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# SQLite-PRAGMAt, jotka asetetaan jokaiselle uudelle yhteydelle
+# (garden.signals). Tuotantoprofiili: gardenlog/settings_tuotanto.py.
+GARDEN_SQLITE_PRAGMAT = {}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -116,3 +126,16 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = os.environ.get('GARDENLOG_STATIC_ROOT', BASE_DIR / 'staticfiles')
+
+# Palveleeko sovellus itse STATIC_ROOTin (ks. garden.views.StaattinenView)
+GARDEN_PALVELE_STAATTISET = False
+
+# Julkaisun tunniste (esim. git-tiiviste); kuuluu sivujen ETageihin, joten
+# uusi julkaisu ei saa vanhan HTML:n 304-vastausta (ks. garden.staattiset)
+GARDEN_JULKAISU = os.environ.get('GARDENLOG_JULKAISU', '')
+
+# Havaintojen kuvat (ks. garden.kuvat); pienennetyt versiot palvelee
+# garden.views.KuvaView
+MEDIA_ROOT = os.environ.get('GARDENLOG_MEDIA_ROOT', BASE_DIR / 'media')
+MEDIA_URL = 'media/'
@@ -0,0 +1,65 @@
+"""Tuotantoprofiili gardenlog-projektille.
+
+Käyttö: ``DJANGO_SETTINGS_MODULE=gardenlog.settings_tuotanto``. Salaisuudet
+ja sallitut palvelimet luetaan ympäristömuuttujista:
+
+- ``DJANGO_SECRET_KEY`` (pakollinen)
+- ``DJANGO_ALLOWED_HOSTS`` (pilkuilla eroteltu lista)
+- ``GARDENLOG_DB`` (tietokantatiedoston polku, oletus ``db.sqlite3``)
+- ``GARDENLOG_STATIC_ROOT`` (``collectstatic``in kohde, oletus ``staticfiles``)
+- ``GARDENLOG_MEDIA_ROOT`` (havaintojen kuvat, oletus ``media``)
+- ``GARDENLOG_JULKAISU`` (julkaisun tunniste sivujen ETageihin, esim. git-tiiviste)
+
+SQLite on säädetty rinnakkaisille kirjoittajille: WAL-loki (lukijat eivät
+estä kirjoittajaa), ``BEGIN IMMEDIATE`` -transaktiot (kirjoituslukko
+otetaan heti eikä lukulukon korotus voi kaatua "database is locked"
+-virheeseen), odotusaika lukolle ja pysyvät yhteydet.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES as _KEHITYS_DATABASES
+
+DEBUG = os.environ.get('DJANGO_DEBUG') == '1'
+
+try:
+    SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+except KeyError:
+    raise ImproperlyConfigured('Aseta DJANGO_SECRET_KEY tuotantoprofiilia varten.')
+
+ALLOWED_HOSTS = [
+    nimi.strip() for nimi in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',')
+    if nimi.strip()
+]
+
+DATABASES = {
+    'default': {
+        **_KEHITYS_DATABASES['default'],
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+}
+
+GARDEN_SQLITE_PRAGMAT = {
+    'journal_mode': 'WAL',
+    # WAL-tilassa NORMAL on turvallinen: commit voi hävitä vain sähkökatkossa
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -32000,  # KiB, eli noin 32 Mt
+    'mmap_size': 134217728,  # 128 Mt
+    'temp_store': 'MEMORY',
+}
+
+# collectstatic tuottaa tiivisteelliset nimet ja .gz-versiot; sovellus
+# palvelee ne itse vuoden immutable-välimuistilla
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'garden.staattiset.PakattuManifestStorage'},
+}
+
+GARDEN_PALVELE_STAATTISET = True
@@ -14,10 +14,20 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
+from garden.views import StaattinenView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('garden.urls')),
 ]
+
+if settings.GARDEN_PALVELE_STAATTISET:
+    # Paikallinen palvelu ilman erillistä www-palvelinta tai CDN:ää
+    urlpatterns.append(
+        path(f"{settings.STATIC_URL.strip('/')}/<path:polku>", StaattinenView.as_view(),
+             name='staattinen'),
+    )